@@ -0,0 +1,913 @@
+import argparse
+import ast
+import json
+import os
+import random
+import re
+import shutil
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+from cmd_stats import CommandStats
+from fake_gdb import ENV_LATENCY as FAKE_GDB_LATENCY_ENV
+from fake_gdbstub import PTE_NX, PTE_P, PTE_W, FakeGdbStub, FakeQMPServer, build_demo_guest
+from gdb_mi_client import GdbMIClient
+from gdb_rsp_client import GdbRSPClient
+from headless import HeadlessSession
+from mi_parser import parse_record
+from phys_mem import PhysicalMemory
+from pt_cache import PageTableCache
+from qmp_client import QMPClient
+from regfile import STATE_REGS, RegisterFile
+from session import DebugSession
+from session_manager import SessionManager
+from regtrace import TRACE_REGS, TraceReader, TraceWriter
+
+# stepi + Registers + Page Info 갱신 1회 (DebugSession.cmd_step과 같은 경로)
+def step_refresh_once(client) -> None:
+    client.stepi()
+    regs = client.read_registers()
+    client.inspect_va(regs["rip"])
+
+def measure(fn, iters: int, warmup: int = 5) -> list:
+    for _ in range(warmup):
+        fn()
+
+    samples = []
+    for _ in range(iters):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return samples
+
+def summarize(samples: list) -> dict:
+    ordered = sorted(samples)
+    return {
+        "n": len(samples),
+        "min_ms": ordered[0] * 1e3,
+        "mean_ms": statistics.fmean(samples) * 1e3,
+        "p50_ms": ordered[len(ordered) // 2] * 1e3,
+        "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1e3,
+    }
+
+def print_row(name: str, stats: dict) -> None:
+    print(
+        f"{name:<28} n={stats['n']:<5} mean={stats['mean_ms']:8.3f} ms"
+        f"  p50={stats['p50_ms']:8.3f} ms  p95={stats['p95_ms']:8.3f} ms"
+    )
+
+# mi vs rsp: stepi + refresh 지연 비교
+def bench_backends(args) -> None:
+    stub = None
+    target = args.target
+    if target is None:
+        stub = FakeGdbStub(latency=args.latency / 1e3).start()
+        target = stub.target
+
+    try:
+        results = {}
+
+        rsp = GdbRSPClient(target=target)
+        rsp.connect()
+        try:
+            results["rsp stepi+refresh"] = summarize(measure(lambda: step_refresh_once(rsp), args.iters))
+        finally:
+            rsp.close()
+
+        if shutil.which(args.gdb):
+            mi = GdbMIClient(target=target, gdb_path=args.gdb)
+            mi.connect()
+            try:
+                results["mi stepi+refresh"] = summarize(measure(lambda: step_refresh_once(mi), args.iters))
+            finally:
+                mi.close()
+        else:
+            print(f"[skip] mi backend: '{args.gdb}' not found")
+
+        print(f"target: {target}" + (" (fake gdbstub)" if stub else ""))
+        for name, stats in results.items():
+            print_row(name, stats)
+
+        if len(results) == 2:
+            speedup = results["mi stepi+refresh"]["mean_ms"] / results["rsp stepi+refresh"]["mean_ms"]
+            print(f"rsp speedup: {speedup:.1f}x")
+    finally:
+        if stub is not None:
+            stub.stop()
+
+# AVX-512 머신에서 gdb가 내보내는 -data-list-register-values x 형태의 코퍼스
+def avx512_register_names() -> list:
+    names = [
+        "rax", "rbx", "rcx", "rdx", "rsi", "rdi", "rbp", "rsp",
+        "r8", "r9", "r10", "r11", "r12", "r13", "r14", "r15",
+        "rip", "eflags", "cs", "ss", "ds", "es", "fs", "gs",
+    ]
+    names += [f"st{i}" for i in range(8)]
+    names += ["fctrl", "fstat", "ftag", "fiseg", "fioff", "foseg", "fooff", "fop"]
+    names += [f"xmm{i}" for i in range(16)] + ["mxcsr"]
+    names += [f"ymm{i}h" for i in range(16)]
+    names += [f"xmm{i}" for i in range(16, 32)] + [f"ymm{i}h" for i in range(16, 32)]
+    names += [f"k{i}" for i in range(8)] + [f"zmm{i}h" for i in range(32)]
+    names += ["fs_base", "gs_base", "orig_rax"]
+    names += ["al", "bl", "cl", "dl", "ax", "bx", "cx", "dx", "eax", "ebx", "ecx", "edx"]
+    names += [f"ymm{i}" for i in range(32)] + [f"zmm{i}" for i in range(32)]
+    return names
+
+def vector_value(lanes_128: int, seed: int) -> str:
+    def vec(kind, count):
+        vals = ", ".join(f"0x{(seed * 2654435761 + j) & 0xFFFF:x}" for j in range(count))
+        return f"{kind} = {{{vals}}}"
+
+    parts = [
+        vec(f"v{8 * lanes_128}_bfloat16", 8 * lanes_128),
+        vec(f"v{8 * lanes_128}_half", 8 * lanes_128),
+        vec(f"v{4 * lanes_128}_float", 4 * lanes_128),
+        vec(f"v{2 * lanes_128}_double", 2 * lanes_128),
+        f"v{16 * lanes_128}_int8 = {{0x0 <repeats {16 * lanes_128} times>}}",
+        vec(f"v{8 * lanes_128}_int16", 8 * lanes_128),
+        vec(f"v{4 * lanes_128}_int32", 4 * lanes_128),
+        vec(f"v{2 * lanes_128}_int64", 2 * lanes_128),
+    ]
+    if lanes_128 == 1:
+        parts.append(f"uint128 = 0x{seed:x}")
+    else:
+        parts.append(vec(f"v{lanes_128}_int128", lanes_128))
+    return "{" + ", ".join(parts) + "}"
+
+def mi_corpus() -> dict:
+    names = avx512_register_names()
+
+    values = []
+    for i, name in enumerate(names):
+        if name.startswith("zmm") and not name.endswith("h"):
+            val = vector_value(4, i)
+        elif name.startswith("ymm") and not name.endswith("h"):
+            val = vector_value(2, i)
+        elif name.startswith(("xmm", "ymm", "zmm")):
+            val = vector_value(1, i)
+        elif name.startswith("st"):
+            val = "0x0"
+        else:
+            val = f"0x{(i * 0x1000193) & 0xFFFFFFFFFFFF:x}"
+        values.append(f'{{number="{i}",value="{val}"}}')
+
+    xp_lines = [
+        '~"' + f"{0x1000 + i * 16:016x}: 0x{i:016x} 0x{i + 1:016x}" + '\\n"'
+        for i in range(256)
+    ]
+
+    return {
+        "register-names": ["5^done,register-names=[" + ",".join(f'"{n}"' for n in names) + "]"],
+        "register-values": ["6^done,register-values=[" + ",".join(values) + "]"],
+        "xp /512gx": xp_lines + ["7^done"],
+        "stopped": [
+            '*stopped,reason="end-stepping-range",frame={addr="0xffffffff81000100",func="??",'
+            'args=[]},thread-id="1",stopped-threads="all",core="0"',
+        ],
+    }
+
+# 기존 방식 (regex + ast.literal_eval)
+def legacy_parse(kind: str, lines: list):
+    text = "\n".join(lines)
+    if kind == "register-names":
+        inner = re.search(r"register-names=\[(.*)\]", text, re.S).group(1)
+        return ast.literal_eval("[" + inner + "]")
+    if kind == "register-values":
+        return {int(n): v for n, v in re.findall(r'number="(\d+)",value="([^"]*)"', text)}
+    if kind == "xp /512gx":
+        return "".join(ast.literal_eval(line[1:]) for line in lines if line.startswith('~"'))
+    return re.findall(r'(\w[\w-]*)="([^"]*)"', text)
+
+def bench_mi_parse(args) -> None:
+    corpus = mi_corpus()
+    total_bytes = sum(len(line) for lines in corpus.values() for line in lines)
+    print(f"corpus: {len(corpus)} outputs, {total_bytes} bytes, "
+          f"{len(avx512_register_names())} registers (AVX-512)")
+
+    for kind, lines in corpus.items():
+        legacy = summarize(measure(lambda: legacy_parse(kind, lines), args.iters))
+        parsed = summarize(measure(lambda: [parse_record(line) for line in lines], args.iters))
+        print_row(f"legacy {kind}", legacy)
+        print_row(f"parser {kind}", parsed)
+
+# VA 여러 개 워크: VA마다 새로 읽기 vs 테이블 공유
+def bench_page_walk(args) -> None:
+    stub = FakeGdbStub(latency=args.latency / 1e3).start()
+    client = GdbRSPClient(target=stub.target)
+    client.connect()
+
+    try:
+        cr3 = client.read_cr3()
+        vas = list(range(0xFFFFFFFF81000000, 0xFFFFFFFF81040000, 0x1000))
+
+        for label, shared in (("per-VA tables", False), ("shared tables", True)):
+            n0 = stub.packets
+            t0 = time.perf_counter()
+            tables = {}
+            for va in vas:
+                client.inspect_va(va, cr3=cr3, tables=tables if shared else None)
+            elapsed = time.perf_counter() - t0
+            print(f"{label:<16} {len(vas)} VAs: {elapsed * 1e3:8.2f} ms, "
+                  f"{stub.packets - n0} round-trips")
+    finally:
+        client.close()
+        stub.stop()
+
+# 스텝 루프: DebugSession.refresh_state (페이지 테이블 캐시 + leaf 선읽기)
+def bench_step_cache(args) -> None:
+    stub = FakeGdbStub(latency=args.latency / 1e3).start()
+    sess = DebugSession(target=stub.target, backend="rsp")
+    sess.connect()
+
+    try:
+        n0 = stub.packets
+        stats = summarize(measure(sess.cmd_step, args.iters, warmup=0))
+        print_row("rsp stepi+refresh (cached)", stats)
+        print(f"round-trips/step: {(stub.packets - n0) / args.iters:.2f}")
+        print(f"pt cache: {sess.pt_cache.summary()}")
+    finally:
+        sess.close()
+        stub.stop()
+
+# PC 샘플링: 요청한 빈도별 실제 샘플 빈도와 샘플당 게스트 정지 시간 (stop -> read -> resume)
+def bench_profile(args) -> None:
+    stub = FakeGdbStub(latency=args.latency / 1e3).start()
+    sess = DebugSession(target=stub.target, backend="rsp")
+    sess.connect()
+
+    try:
+        for hz in (50, 200, 1000):
+            n0 = stub.packets
+            sess.cmd_profile(0.5, hz)
+            prof = sess.profile
+            print(f"{hz:>5} Hz requested: {prof.achieved_hz:7.1f} Hz achieved, "
+                  f"pause avg {prof.avg_pause * 1e3:.3f} ms, "
+                  f"{(stub.packets - n0) / max(1, prof.samples):.2f} packets/sample")
+    finally:
+        sess.close()
+        stub.stop()
+
+# n <count>: 스텝마다 새로고침 vs 새로고침 없이 몰아서 실행 (마지막에 한 번만 갱신)
+def bench_step_many(args) -> None:
+    stub = FakeGdbStub(latency=args.latency / 1e3).start()
+    sess = DebugSession(target=stub.target, backend="rsp")
+    sess.connect()
+
+    try:
+        count = args.iters
+        n0 = stub.packets
+        t0 = time.perf_counter()
+        for _ in range(count):
+            sess.cmd_step()
+        per_step = time.perf_counter() - t0
+        per_step_packets = stub.packets - n0
+
+        n0 = stub.packets
+        t0 = time.perf_counter()
+        sess.cmd_step_many(count)
+        batched = time.perf_counter() - t0
+
+        print(f"{count} x (stepi + refresh): {per_step * 1e3:9.2f} ms, {per_step_packets} packets")
+        print(f"n {count} (batched):        {batched * 1e3:9.2f} ms, {stub.packets - n0} packets "
+              f"({per_step / batched:.1f}x)")
+        if stub.dropped:
+            raise SystemExit(f"{stub.dropped} bytes sent while the guest was running (gdbstub is all-stop)")
+    finally:
+        sess.close()
+        stub.stop()
+
+# trace: 합성 스텝 N개 기록 (스텝당 바이트/시간) + mmap 으로 열기 + 임의 스텝 접근
+def bench_trace(args) -> None:
+    steps = args.iters * 1000
+    regs = {name: 0x1000 * i for i, name in enumerate(TRACE_REGS)}
+    path = os.path.join(tempfile.mkdtemp(prefix="qvhd-"), "bench.trace")
+
+    writer = TraceWriter(path)
+    t0 = time.perf_counter()
+    for i in range(steps):
+        regs["rip"] += 3
+        if i % 4 == 0:
+            regs["rax"] = i
+        writer.append(RegisterFile.from_ints(regs))
+    writer.close()
+    elapsed = time.perf_counter() - t0
+    size = os.path.getsize(path)
+    print(f"write {steps} steps: {elapsed / steps * 1e6:.2f} us/step, {size / steps:.2f} bytes/step "
+          f"(raw {8 * (len(TRACE_REGS) + 1)} bytes/step)")
+
+    t0 = time.perf_counter()
+    reader = TraceReader(path)
+    print(f"open: {(time.perf_counter() - t0) * 1e3:.3f} ms ({len(reader)} steps)")
+
+    stats = summarize(measure(lambda: reader[random.randrange(len(reader))], 200, warmup=0))
+    print_row("random step (block decode)", stats)
+    pos = len(reader) // 2
+    stats = summarize(measure(lambda: reader[pos + 1], 200))
+    print_row("next step (cached block)", stats)
+
+    reader.close()
+    os.remove(path)
+
+# RAM 파일 mmap: fake 게스트 RAM 을 파일로 써 두고 페이지 워크 / 주소 공간 맵을 xp 경로와 비교
+#   --latency 로 xp 왕복 비용을 흉내냄 (mmap 경로는 왕복 없음)
+def bench_phys_mem(args) -> None:
+    guest = build_demo_guest()
+    for off in range(0, 64 << 20, 0x1000):
+        guest.map_page(0xFFFFC90000000000 + off, off % len(guest.ram), PTE_P | PTE_W | PTE_NX)
+
+    path = os.path.join(tempfile.mkdtemp(prefix="qvhd-"), "ram")
+    with open(path, "wb") as f:
+        f.write(guest.ram)
+
+    stub = FakeGdbStub(guest, latency=args.latency / 1e3).start()
+    client = GdbRSPClient(target=stub.target)
+    client.connect()
+
+    try:
+        cr3 = client.read_cr3()
+        vas = [guest.regs["rip"], 0xFFFFC90000000000, 0xFFFFC90000123456]
+
+        stats = summarize(measure(lambda: [client.inspect_va(va, cr3=cr3) for va in vas], args.iters))
+        print_row(f"inspect_va x{len(vas)} via xp", stats)
+
+        t0 = time.perf_counter()
+        xp_map = list(client.walk_address_space(cr3=cr3))
+        print(f"address map via xp:   {(time.perf_counter() - t0) * 1e3:9.2f} ms ({len(xp_map)} regions)")
+
+        client.phys = PhysicalMemory(path)
+        n0 = stub.packets
+        stats = summarize(measure(lambda: [client.inspect_va(va, cr3=cr3) for va in vas], args.iters))
+        print_row(f"inspect_va x{len(vas)} via mmap", stats)
+
+        t0 = time.perf_counter()
+        mm_map = list(client.walk_address_space(cr3=cr3))
+        print(f"address map via mmap: {(time.perf_counter() - t0) * 1e3:9.2f} ms ({len(mm_map)} regions, "
+              f"{stub.packets - n0} packets)")
+    finally:
+        if client.phys is not None:
+            client.phys.close()
+        client.close()
+        stub.stop()
+        os.remove(path)
+
+# read_phys_bytes: 크기별 xp / pmemsave / 자동 선택 비교 + 물리 덤프 / 검색
+#   --latency 는 요청마다 붙는 왕복 비용 (pmemsave 는 요청 1번, xp 는 4KB 마다 1번)
+def bench_phys_read(args) -> None:
+    guest = build_demo_guest()
+    needle = b"qvhd-needle"
+    guest.write_phys(0x2345678, needle)
+
+    stub = FakeGdbStub(guest, latency=args.latency / 1e3).start()
+    client = GdbRSPClient(target=stub.target)
+    client.connect()
+
+    def report(label, fn, size):
+        t0 = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - t0
+        print(f"{label:<32} {elapsed * 1e3:9.2f} ms  {size / elapsed / 1e6:8.2f} MB/s")
+
+    try:
+        plan = client.calibrate_phys_reads()
+        print(f"plan: {plan.summary()}")
+
+        for size in (64, 4096, 64 << 10, 1 << 20, 8 << 20):
+            pa = 0x100000 + 8
+            report(f"xp       {size:>8} bytes", lambda: client.read_phys_xp(pa, size), size)
+            report(f"pmemsave {size:>8} bytes", lambda: client.read_phys_pmemsave(pa, size), size)
+            report(f"auto     {size:>8} bytes", lambda: client.read_phys_bytes(pa, size), size)
+
+        size = len(guest.ram)
+        report(f"pfind {size >> 20} MB", lambda: client.search_phys(needle, 0, size), size)
+        report("phys dump 8 KB", lambda: client.read_phys_dump(0x2345000, 0x2000), 0x2000)
+    finally:
+        client.close()
+        stub.stop()
+
+# QMP 소켓: monitor 명령 / 페이지 테이블 읽기 / pmemsave 를 gdbstub(qRcmd) 경유와 비교
+#   fake gdbstub 과 fake QMP 서버가 같은 게스트를 공유, --latency 는 양쪽 응답마다 적용
+def bench_qmp(args) -> None:
+    guest = build_demo_guest()
+    stub = FakeGdbStub(guest, latency=args.latency / 1e3).start()
+    server = FakeQMPServer(guest, latency=args.latency / 1e3, cpus=4).start()
+    client = GdbRSPClient(target=stub.target)
+    client.connect()
+    qmp = QMPClient(server.path)
+    qmp.connect()
+
+    try:
+        cr3 = client.read_cr3()
+        tables = list(client.read_phys_tables([cr3]).values())[0]
+        table_pas = [cr3] + sorted({e & 0x000FFFFFFFFFF000 for e in tables if e & 1})
+        walk_vas = [guest.regs["rip"], 0xFFFF888000000000, 0x400000, 0x7FFFFFFFE000]
+
+        def run(label):
+            stats = summarize(measure(lambda: client.monitor_cmd("info registers"), args.iters))
+            print_row(f"{label} info registers", stats)
+            stats = summarize(measure(lambda: client.read_phys_tables(table_pas), max(1, args.iters // 10)))
+            print_row(f"{label} {len(table_pas)} tables", stats)
+            stats = summarize(measure(lambda: [client.inspect_va(va, cr3=cr3) for va in walk_vas], max(1, args.iters // 10)))
+            print_row(f"{label} inspect_va x{len(walk_vas)}", stats)
+
+        run("gdbstub")
+        client.qmp = qmp
+        run("qmp    ")
+
+        # 게스트가 running 이어도 QMP 는 응답 (gdbstub 은 멈출 때까지 monitor 불가)
+        client.cont()
+        try:
+            stats = summarize(measure(lambda: client.monitor_cmd("info registers"), args.iters))
+            print_row("qmp     info registers (running)", stats)
+        finally:
+            client.interrupt()
+
+        cpus = qmp.query_cpus_fast()
+        print(f"query-cpus-fast: {len(cpus)} vCPUs, {server.commands} QMP commands, "
+              f"read plan: {client.phys_read_plan().summary()}")
+    finally:
+        qmp.close()
+        client.close()
+        server.stop()
+        stub.stop()
+
+# translate_many: 레지스터 16개가 가리키는 VA 를 VA마다 따로 워크 vs 레벨별 배치 워크
+#   + Register Deref 패널을 켠 stepi + 갱신 1회 (DebugSession.cmd_step 경로)
+def bench_deref(args) -> None:
+    guest = build_demo_guest()
+    pointers = [0xFFFFFFFF81000000 + i * 0x3000 for i in range(6)]
+    pointers += [0xFFFF888000000000 + i * 0x40000 for i in range(5)]
+    pointers += [0x400000 + i * 0x2000 for i in range(3)] + [0x7FFFFFFFE000, 0x7FFF00000000]
+    for name, va in zip(("rax", "rbx", "rcx", "rdx", "rsi", "rdi", "rbp", "r8",
+                         "r9", "r10", "r11", "r12", "r13", "r14", "r15"), pointers):
+        guest.regs[name] = va
+
+    stub = FakeGdbStub(guest, latency=args.latency / 1e3).start()
+    client = GdbRSPClient(target=stub.target)
+    client.connect()
+
+    try:
+        cr3 = client.read_cr3()
+        iters = max(1, args.iters // 10)
+
+        for label, fn in (
+            (f"inspect_va x{len(pointers)}", lambda: [client.inspect_va(va, cr3=cr3) for va in pointers]),
+            (f"translate_many x{len(pointers)}", lambda: client.translate_many(pointers, cr3=cr3)),
+        ):
+            n0 = stub.packets
+            stats = summarize(measure(fn, iters, warmup=0))
+            print_row(label, stats)
+            print(f"{'':<28} {(stub.packets - n0) / iters:.0f} packets per pass")
+    finally:
+        client.close()
+
+    for deref in (False, True):
+        sess = DebugSession(target=stub.target, backend="rsp")
+        sess.connect()
+        sess.set_deref(deref)
+        try:
+            n0 = stub.packets
+            stats = summarize(measure(sess.cmd_step, iters))
+            print_row(f"stepi+refresh deref={'on' if deref else 'off'}", stats)
+            print(f"{'':<28} {(stub.packets - n0) / (iters + 5):.0f} packets per step, "
+                  f"{len(sess.deref_rows or ())} rows, {sess.status}")
+        finally:
+            sess.close()
+    stub.stop()
+
+# vCPU 수에 따른 새로고침 비용: vCPU 마다 고르고 읽기 vs Hg+g 를 한 번에 pipeline
+#   stub 은 rtt 모델 (지연이 0이면 vCPU 수 차이가 안 보이므로 기본 0.5 ms)
+def bench_smp(args) -> None:
+    latency = (args.latency or 0.5) / 1e3
+    iters = max(1, args.iters // 10)
+
+    for count in (1, 4, 16):
+        guest = build_demo_guest(cpus=count)
+        with FakeGdbStub(guest, latency=latency, rtt=True) as stub:
+            client = GdbRSPClient(target=stub.target)
+            client.connect()
+            try:
+                tids = [tid for tid, _ in client.list_threads()]
+
+                def sequential():
+                    for tid in tids:
+                        client.select_thread(tid)
+                        client.read_state()
+                    client.select_thread(None)
+
+                for label, fn in (
+                    (f"select+read x{count}", sequential),
+                    (f"read_thread_states x{count}", lambda: client.read_thread_states(tids)),
+                ):
+                    print_row(label, summarize(measure(fn, iters, warmup=1)))
+            finally:
+                client.close()
+
+            sess = DebugSession(target=stub.target, backend="rsp")
+            sess.connect()
+            sess.set_cpu_grid(True)
+            try:
+                print_row(f"refresh cpu grid x{count}", summarize(measure(sess.cmd_refresh, iters, warmup=1)))
+                print(f"{'':<28} {sess.status}")
+            finally:
+                sess.close()
+
+# 여러 대상: 차례로 연결/새로고침 vs SessionManager (대상마다 worker 스레드)
+def bench_sessions(args) -> None:
+    latency = (args.latency or 0.5) / 1e3
+    iters = max(1, args.iters // 20)
+
+    def wait_idle(mgr):
+        while any(worker.busy for worker in mgr.workers):
+            mgr.poll()
+            time.sleep(0.0005)
+
+    for count in (1, 4, 8):
+        stubs = [FakeGdbStub(build_demo_guest(), latency=latency).start() for _ in range(count)]
+        targets = [stub.target for stub in stubs]
+        try:
+            sessions = [DebugSession(target=target, backend="rsp") for target in targets]
+            t0 = time.perf_counter()
+            for sess in sessions:
+                sess.connect()
+            serial_connect = time.perf_counter() - t0
+            serial = summarize(measure(lambda: [sess.cmd_refresh() for sess in sessions], iters, warmup=1))
+            for sess in sessions:
+                sess.close()
+
+            mgr = SessionManager(targets, backend="rsp")
+            t0 = time.perf_counter()
+            mgr.connect_all()
+            wait_idle(mgr)
+            pool_connect = time.perf_counter() - t0
+            # 연결이 안 된 대상이 있으면 시간이 의미 없음
+            if not all(sess.alive() for sess in mgr.sessions):
+                raise SystemExit(f"sessions: connect failed: {[sess.status for sess in mgr.sessions]}")
+
+            def pool_refresh():
+                mgr.refresh_all()
+                wait_idle(mgr)
+
+            pool = summarize(measure(pool_refresh, iters, warmup=1))
+            t0 = time.perf_counter()
+            for i in range(len(mgr)):
+                mgr.switch(i)
+            switch = (time.perf_counter() - t0) / len(mgr)
+            mgr.close()
+        finally:
+            for stub in stubs:
+                stub.stop()
+
+        print(f"{count} targets: connect {serial_connect * 1e3:.1f} -> {pool_connect * 1e3:.1f} ms, "
+              f"refresh all {serial['mean_ms']:.2f} -> {pool['mean_ms']:.2f} ms, "
+              f"switch {switch * 1e6:.1f} us")
+
+# 주소 공간 전체 맵: 커널 direct map(4K) 256MB + demo 매핑
+def bench_address_map(args) -> None:
+    guest = build_demo_guest()
+    for off in range(0, 256 << 20, 0x1000):
+        guest.map_page(0xFFFFC90000000000 + off, off % len(guest.ram), PTE_P | PTE_W | PTE_NX)
+
+    stub = FakeGdbStub(guest, latency=args.latency / 1e3).start()
+    client = GdbRSPClient(target=stub.target)
+    client.connect()
+
+    try:
+        tables = (guest.next_table - 0x1000) // 0x1000
+        n0 = stub.packets
+        t0 = time.perf_counter()
+        ranges = list(client.walk_address_space())
+        elapsed = time.perf_counter() - t0
+        packets = stub.packets - n0
+
+        # 워크 중 최대 메모리 (다 돈 테이블은 버리므로 테이블 수가 아니라 깊이 x 형제 수에 비례)
+        tracemalloc.start()
+        for _ in client.walk_address_space():
+            pass
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        print(f"{len(ranges)} regions, {tables} tables: {elapsed * 1e3:8.2f} ms, "
+              f"{packets} round-trips "
+              f"(per-qword reads would need {tables * 512}), peak {peak / 1e6:.1f} MB")
+    finally:
+        client.close()
+        stub.stop()
+
+# 레지스터 스냅샷: 문자열 dict 복사 + 문자열 비교 vs RegisterFile + diff 비트마스크
+def bench_regfile(args) -> None:
+    snapshots = 10000
+    values = [{name: (i * 7 + j) & 0xFFFF if name in ("rax", "rip") else j for j, name in enumerate(STATE_REGS)}
+              for i in range(snapshots)]
+
+    def dict_snapshots():
+        kept, prev = [], {}
+        for vals in values:
+            regs = {name: f"0x{val:x}" for name, val in vals.items()}
+            changed = [name for name in regs if prev.get(name) != regs[name]]
+            kept.append(prev.copy())
+            prev = regs
+        return kept, changed
+
+    def regfile_snapshots():
+        kept, prev = [], None
+        for vals in values:
+            regs = RegisterFile.from_ints(vals)
+            changed = regs.diff(prev)
+            kept.append(regs)
+            prev = regs
+        return kept, changed
+
+    for label, fn in (("dict of str", dict_snapshots), ("RegisterFile", regfile_snapshots)):
+        t0 = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - t0
+
+        tracemalloc.start()
+        kept = fn()
+        size, _peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del kept
+        print(f"{label:<14} {snapshots} snapshots: {elapsed * 1e3:8.2f} ms, "
+              f"{size / snapshots:7.0f} bytes/snapshot retained")
+
+# 기존 mi 경로: 명령 1개 + 두 글자씩 int() 변환
+def legacy_mi_read(client, va: int, size: int) -> bytes:
+    result, streams = client.mi_cmd(f"-data-read-memory-bytes 0x{va:x} {size}", timeout=60.0)
+    hexstr = result.get("memory")[0]["contents"][: 2 * size]
+
+    byte_list = []
+    for i in range(0, len(hexstr), 2):
+        byte_list.append(int(hexstr[i:i + 2], 16))
+    return bytes(byte_list)
+
+# 큰 메모리 덤프 처리량 (MB/s): 기존 경로 vs chunk + pipeline + bytes.fromhex
+def bench_mem_read(args) -> None:
+    va, size = 0xFFFF888000000000, 4 << 20
+    stub = FakeGdbStub(latency=args.latency / 1e3).start()
+
+    def report(label, fn):
+        t0 = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - t0
+        print(f"{label:<24} {size >> 20} MB: {elapsed * 1e3:9.2f} ms  {size / elapsed / 1e6:8.2f} MB/s")
+
+    try:
+        rsp = GdbRSPClient(target=stub.target)
+        rsp.connect()
+        try:
+            report("rsp read_virt_bytes", lambda: rsp.read_virt_bytes(va, size))
+            report("rsp read_virt_dump", lambda: rsp.read_virt_dump(va, size))
+        finally:
+            rsp.close()
+
+        if shutil.which(args.gdb):
+            mi = GdbMIClient(target=stub.target, gdb_path=args.gdb, timeout=60.0)
+            mi.connect()
+            try:
+                report("mi legacy (1 cmd)", lambda: legacy_mi_read(mi, va, size))
+                report("mi read_virt_dump", lambda: mi.read_virt_dump(va, size))
+            finally:
+                mi.close()
+        else:
+            print(f"[skip] mi backend: '{args.gdb}' not found")
+    finally:
+        stub.stop()
+
+# suite: QEMU / gdb 없이 fake gdbstub + fake gdb(fake_gdb.py) 로 MI 경로 전체를 측정, JSON 으로 기준치와 비교
+FAKE_GDB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_gdb.py")
+SUITE_BIG_VA = 0xFFFFC90000000000
+SUITE_MD_SIZES = (("64B", 64), ("64KiB", 64 << 10), ("16MiB", 16 << 20))
+
+def suite_guest():
+    guest = build_demo_guest(ram_size=96 << 20)
+    guest.map_range(SUITE_BIG_VA, 16 << 20, PTE_P | PTE_W | PTE_NX, "2M")
+    return guest
+
+# 경우마다 반복 횟수: 짧은 것은 --iters/10, 큰 덤프 / 전체 맵 / 연결은 몇 번만
+def suite_cases(client_factory, sess_factory, iters: int) -> dict:
+    few = max(3, iters // 20)
+    results = {}
+
+    def run(name, fn, n, warmup=1):
+        results[name] = summarize(measure(fn, n, warmup=warmup))
+        print_row(name, results[name])
+
+    # GdbMIClient
+    clients = []
+
+    def connect_client():
+        client = client_factory()
+        client.connect()
+        clients.append(client)
+
+    run("mi connect", connect_client, few, warmup=0)
+    for old in clients:
+        old.close()
+    client = client_factory()
+    client.connect()
+    try:
+        cr3 = client.read_cr3()
+        va = client.read_registers()["rip"]
+        run("mi stepi+refresh", lambda: step_refresh_once(client), iters)
+        run("mi inspect_va cold", lambda: client.inspect_va(va, cr3=cr3, cache=PageTableCache()), iters)
+        cache = PageTableCache()
+        run("mi inspect_va warm", lambda: client.inspect_va(va, cr3=cr3, cache=cache), iters)
+        for label, size in SUITE_MD_SIZES:
+            run(f"mi md {label}", lambda size=size: client.read_virt_dump(SUITE_BIG_VA, size),
+                iters if size <= 64 << 10 else few)
+        run("mi address map", lambda: list(client.walk_address_space(cr3=cr3)), few)
+    finally:
+        client.close()
+
+    # DebugSession (UI 가 부르는 명령 그대로)
+    sessions = []
+
+    def connect_session():
+        sess = sess_factory()
+        sess.connect()
+        sessions.append(sess)
+
+    run("session connect", connect_session, few, warmup=0)
+    for old in sessions:
+        old.close()
+    sess = sess_factory()
+    sess.connect()
+    try:
+        va = sess.regs["rip"]
+
+        def inspect_cold():
+            sess.pt_cache.clear()
+            sess.set_inspect_va(va)
+
+        run("session stepi+refresh", sess.cmd_step, iters)
+        run("session inspect_va cold", inspect_cold, iters)
+        run("session inspect_va warm", lambda: sess.set_inspect_va(va), iters)
+        for label, size in SUITE_MD_SIZES:
+            run(f"session md {label}", lambda size=size: sess.memdump(SUITE_BIG_VA, size),
+                iters if size <= 64 << 10 else few)
+        run("session address map", sess.cmd_map, few)
+        if sess.mem_error:
+            raise RuntimeError(sess.mem_error)
+    finally:
+        sess.close()
+    return results
+
+# 기준치 비교: 최솟값(잡음이 가장 적음)이 max_ratio 배를 넘고 min_ms 이상 느려진 항목 -> [(이름, 기준, 지금)]
+def suite_regressions(results: dict, baseline: dict, max_ratio: float, min_ms: float) -> list:
+    out = []
+    for name, stats in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if stats["min_ms"] > base["min_ms"] * max_ratio and stats["min_ms"] - base["min_ms"] >= min_ms:
+            out.append((name, base["min_ms"], stats["min_ms"]))
+    return out
+
+def bench_suite(args) -> None:
+    iters = max(2, args.iters // 10)
+    stub = FakeGdbStub(suite_guest(), latency=args.latency / 1e3,
+                       latencies={"qRcmd": args.hmp_latency / 1e3} if args.hmp_latency else None).start()
+
+    saved_env = os.environ.get(FAKE_GDB_LATENCY_ENV)
+    os.environ[FAKE_GDB_LATENCY_ENV] = args.gdb_latency
+    try:
+        results = suite_cases(
+            lambda: GdbMIClient(target=stub.target, gdb_path=FAKE_GDB, timeout=60.0),
+            lambda: DebugSession(target=stub.target, gdb_path=FAKE_GDB, backend="mi"),
+            iters,
+        )
+    finally:
+        stub.stop()
+        if saved_env is None:
+            os.environ.pop(FAKE_GDB_LATENCY_ENV, None)
+        else:
+            os.environ[FAKE_GDB_LATENCY_ENV] = saved_env
+
+    report = {
+        "config": {
+            "stub_latency_ms": args.latency,
+            "hmp_latency_ms": args.hmp_latency,
+            "gdb_latency": args.gdb_latency,
+            "iters": iters,
+        },
+        "results": results,
+    }
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"wrote {args.json}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("config") != report["config"]:
+            print(f"[warn] baseline config differs: {baseline.get('config')}")
+
+        base_results = baseline.get("results", {})
+        for name, stats in results.items():
+            base = base_results.get(name)
+            if base is None or not base["min_ms"]:
+                print(f"{name:<28} (no baseline)")
+                continue
+            print(f"{name:<28} min {base['min_ms']:9.3f} -> {stats['min_ms']:9.3f} ms "
+                  f"({stats['min_ms'] / base['min_ms']:.2f}x)")
+
+        regressions = suite_regressions(results, base_results, args.max_ratio, args.min_ms)
+        for name, base, now in regressions:
+            print(f"REGRESSION {name}: min {base:.3f} -> {now:.3f} ms (> {args.max_ratio:g}x)")
+        if regressions:
+            raise SystemExit(1)
+        print(f"no regressions (threshold {args.max_ratio:g}x, {args.min_ms:g} ms)")
+
+# 명령 계측 비용: client.stats 없음 vs CommandStats (fake gdb 경유 mi)
+def bench_stats(args) -> None:
+    iters = max(2, args.iters // 10)
+    stub = FakeGdbStub(suite_guest(), latency=args.latency / 1e3).start()
+    client = GdbMIClient(target=stub.target, gdb_path=FAKE_GDB, timeout=60.0)
+    client.connect()
+
+    try:
+        cases = (
+            ("stepi+refresh", lambda: step_refresh_once(client), iters),
+            ("md 1MiB", lambda: client.read_virt_dump(SUITE_BIG_VA, 1 << 20), max(2, iters // 4)),
+        )
+        for label, fn, n in cases:
+            client.stats = None
+            off = summarize(measure(fn, n, warmup=2))
+            client.stats = CommandStats()
+            on = summarize(measure(fn, n, warmup=2))
+            print_row(f"{label} stats off", off)
+            print_row(f"{label} stats on", on)
+            print(f"{'':<28} {client.stats.summary()}")
+        client.stats = None
+    finally:
+        client.close()
+        stub.stop()
+
+# headless: 같은 명령을 DebugSession 직접 호출 vs HeadlessSession.run (이벤트 만들기 + JSON 직렬화)
+def bench_headless(args) -> None:
+    iters = max(2, args.iters // 10)
+    stub = FakeGdbStub(suite_guest(), latency=args.latency / 1e3).start()
+
+    try:
+        for backend in ("mi", "rsp"):
+            with HeadlessSession(stub.target, backend, FAKE_GDB) as h:
+                h.connect()
+                sess = h.sess
+                cases = (
+                    ("n", sess.cmd_step, "n", iters),
+                    ("md 64KiB", lambda: sess.memdump(SUITE_BIG_VA, 64 << 10), f"md 0x{SUITE_BIG_VA:x} 0x10000",
+                     max(2, iters // 4)),
+                )
+                for label, direct, line, n in cases:
+                    print_row(f"{backend} {label} direct", summarize(measure(direct, n, warmup=2)))
+                    print_row(
+                        f"{backend} {label} headless",
+                        summarize(measure(lambda: [json.dumps(e) for e in h.run(line)], n, warmup=2)),
+                    )
+    finally:
+        stub.stop()
+
+BENCHMARKS = {
+    "address-map": bench_address_map,
+    "backends": bench_backends,
+    "deref": bench_deref,
+    "headless": bench_headless,
+    "sessions": bench_sessions,
+    "smp": bench_smp,
+    "step-cache": bench_step_cache,
+    "stats": bench_stats,
+    "step-many": bench_step_many,
+    "suite": bench_suite,
+    "trace": bench_trace,
+    "page-walk": bench_page_walk,
+    "phys-mem": bench_phys_mem,
+    "phys-read": bench_phys_read,
+    "profile": bench_profile,
+    "qmp": bench_qmp,
+    "regfile": bench_regfile,
+    "mem-read": bench_mem_read,
+    "mi-parse": bench_mi_parse,
+}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="QVHD micro-benchmarks")
+    parser.add_argument("bench", choices=sorted(BENCHMARKS), help="benchmark to run")
+    parser.add_argument("--iters", type=int, default=200)
+    parser.add_argument("--target", default=None, help="live gdbstub (default: in-process fake stub)")
+    parser.add_argument("--latency", type=float, default=0.0, help="fake stub reply latency (ms)")
+    parser.add_argument("--gdb", default="gdb", help="gdb executable for the mi backend")
+    parser.add_argument("--gdb-latency", default="", help="suite: fake gdb latency spec (ms, e.g. '0.2,monitor=1')")
+    parser.add_argument("--hmp-latency", type=float, default=0.0, help="suite: fake stub latency for monitor (qRcmd) packets (ms)")
+    parser.add_argument("--json", default=None, help="suite: write results to this JSON file")
+    parser.add_argument("--baseline", default=None, help="suite: compare against a JSON file written by --json")
+    parser.add_argument("--max-ratio", type=float, default=1.25, help="suite: allowed slowdown (min time) vs baseline")
+    parser.add_argument("--min-ms", type=float, default=0.05, help="suite: ignore slowdowns smaller than this (ms)")
+    args = parser.parse_args()
+
+    BENCHMARKS[args.bench](args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+import bisect
+import json
+import threading
+import time
+
+# 명령 분류 (stats 패널 순서)
+COMMAND_CLASSES = ("regs", "xp", "mem", "step", "exec", "monitor", "other")
+
+# 지연 히스토그램 칸 경계 (ms, 마지막 칸은 그보다 큰 것)
+HIST_BOUNDS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 1000)
+
+# MI 명령 -> 분류 (monitor 명령은 xp 만 따로)
+def command_class(cmd: str) -> str:
+    name = cmd.split(" ", 1)[0]
+    if name.startswith("-data-list-"):
+        return "regs"
+    if name in ("-data-read-memory-bytes", "-data-write-memory-bytes"):
+        return "mem"
+    if name == "-exec-step-instruction":
+        return "step"
+    if name.startswith("-exec-"):
+        return "exec"
+    if name == "-interpreter-exec":
+        if '"monitor xp ' in cmd:
+            return "xp"
+        if '"monitor ' in cmd:
+            return "monitor"
+        if '"stepi' in cmd:
+            return "step"
+    return "other"
+
+def monitor_class(cmd: str) -> str:
+    return "xp" if cmd.startswith("xp ") else "monitor"
+
+class ClassStats:
+    # 분류 하나의 누적값 (시간은 초, 히스토그램은 HIST_BOUNDS_MS 칸별 횟수)
+    __slots__ = ("count", "errors", "total", "max", "parse", "bytes_out", "bytes_in", "hist")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.parse = 0.0
+        self.bytes_out = 0
+        self.bytes_in = 0
+        self.hist = [0] * (len(HIST_BOUNDS_MS) + 1)
+
+    # 히스토그램에서 q 분위 (그 칸의 위 경계, 최댓값을 넘지 않게, ms)
+    def quantile_ms(self, q: float) -> float:
+        top = self.max * 1e3
+        need = q * self.count
+        seen = 0
+        for i, n in enumerate(self.hist):
+            seen += n
+            if n and seen >= need:
+                return min(HIST_BOUNDS_MS[i], top) if i < len(HIST_BOUNDS_MS) else top
+        return top
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "total_ms": self.total * 1e3,
+            "mean_ms": self.total / self.count * 1e3 if self.count else 0.0,
+            "p50_ms": self.quantile_ms(0.5),
+            "p95_ms": self.quantile_ms(0.95),
+            "max_ms": self.max * 1e3,
+            "parse_ms": self.parse * 1e3,
+            "bytes_out": self.bytes_out,
+            "bytes_in": self.bytes_in,
+            "hist": list(self.hist),
+        }
+
+class CommandStats:
+    # 명령별 지연 / 주고받은 바이트 / 우리 쪽 파싱 시간 (분류별 누적)
+    #   begin(token) 은 명령을 보내는 스레드, end(token) 는 응답을 받는 reader 스레드에서 부름
+    #   log_path 를 주면 명령마다 JSONL 한 줄 (닫을 때 분류별 합계 한 줄)
+    #   끄는 것은 client.stats = None (그때는 계측 코드가 아무것도 하지 않음)
+    def __init__(self, log_path: str = None) -> None:
+        self.lock = threading.Lock()
+        self.classes = {}
+        self.inflight = {}
+        self.started = time.perf_counter()
+
+        # 바뀔 때마다 증가 (패널 다시 그리기 판단)
+        self.version = 0
+
+        self.log_path = None
+        self.log = None
+        if log_path:
+            self.open_log(log_path)
+
+    def get(self, cls: str) -> ClassStats:
+        stats = self.classes.get(cls)
+        if stats is None:
+            stats = self.classes[cls] = ClassStats()
+        return stats
+
+    # 명령 송신 직전
+    def begin(self, token, cmd: str) -> None:
+        self.inflight[token] = (time.perf_counter(), command_class(cmd), cmd, len(cmd) + 1)
+
+    # 결과 레코드 수신 (bytes_in / parse: 결과 레코드와 그 앞 stream 레코드들)
+    def end(self, token, bytes_in: int, parse: float, error: bool = False) -> None:
+        item = self.inflight.pop(token, None)
+        if item is None:
+            return
+        t0, cls, cmd, bytes_out = item
+        self.add(cls, cmd, time.perf_counter() - t0, bytes_out, bytes_in, parse, error)
+
+    def add(self, cls: str, cmd: str, elapsed: float, bytes_out: int, bytes_in: int,
+            parse: float = 0.0, error: bool = False) -> None:
+        with self.lock:
+            stats = self.get(cls)
+            stats.count += 1
+            stats.errors += bool(error)
+            stats.total += elapsed
+            stats.max = max(stats.max, elapsed)
+            stats.parse += parse
+            stats.bytes_out += bytes_out
+            stats.bytes_in += bytes_in
+            stats.hist[bisect.bisect_left(HIST_BOUNDS_MS, elapsed * 1e3)] += 1
+            self.version += 1
+
+            if self.log is not None:
+                self.log.write(json.dumps({
+                    "t": round(time.perf_counter() - self.started, 6),
+                    "class": cls,
+                    "cmd": cmd[:200],
+                    "ms": round(elapsed * 1e3, 4),
+                    "parse_ms": round(parse * 1e3, 4),
+                    "out": bytes_out,
+                    "in": bytes_in,
+                    "error": bool(error),
+                }) + "\n")
+
+    # 응답을 받은 뒤 따로 하는 파싱 (xp 텍스트 등)
+    def add_parse(self, cls: str, parse: float) -> None:
+        with self.lock:
+            self.get(cls).parse += parse
+            self.version += 1
+
+    def reset(self) -> None:
+        with self.lock:
+            self.classes.clear()
+            self.started = time.perf_counter()
+            self.version += 1
+
+    # {분류: 합계 dict} (COMMAND_CLASSES 순서)
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {cls: self.classes[cls].as_dict() for cls in COMMAND_CLASSES if cls in self.classes}
+
+    def summary(self) -> str:
+        with self.lock:
+            count = sum(stats.count for stats in self.classes.values())
+            total = sum(stats.total for stats in self.classes.values())
+            parse = sum(stats.parse for stats in self.classes.values())
+        elapsed = time.perf_counter() - self.started
+        return (
+            f"{count} cmds in {elapsed:.1f}s, wait {total * 1e3:.1f} ms, "
+            f"parse {parse * 1e3:.1f} ms" + (f", log {self.log_path}" if self.log_path else "")
+        )
+
+    # JSONL 로그 열기 (열려 있던 로그는 합계를 쓰고 닫음, 이어 쓰기)
+    def open_log(self, path: str) -> None:
+        log = open(path, "a")
+        self.close()
+        with self.lock:
+            self.log_path = path
+            self.log = log
+
+    def close(self) -> None:
+        if self.log is None:
+            return
+        summary = self.snapshot()
+        with self.lock:
+            self.log.write(json.dumps({"summary": summary}) + "\n")
+            self.log.close()
+            self.log = None
+            self.log_path = None
@@ -0,0 +1,250 @@
+from regfile import REG_ORDER
+from session import TRACE_PATH, DebugSession
+from worker import SessionWorker
+
+# peek 최대 빈도 (게스트를 멈추는 시간의 상한)
+PEEK_MAX_HZ = 50
+
+# pfind 기본 검색 범위 (물리 주소 0 부터)
+SEARCH_SIZE = 64 << 20
+
+# 쉼표로 나눈 목록 ("a,b" -> ["a", "b"], None -> [])
+def split_list(arg: str) -> list:
+    return [part.strip() or None for part in arg.split(",")] if arg else []
+
+# pfind 인자: '"text" [pa] [size]' 또는 'hex바이트 [pa] [size]' -> (패턴, pa, size)
+def parse_search_args(arg: str):
+    if arg.startswith('"'):
+        end = arg.find('"', 1)
+        if end < 0:
+            raise ValueError("unterminated string")
+        pattern = arg[1:end].encode()
+        rest = arg[end + 1:].split()
+    else:
+        parts = arg.split()
+        if not parts:
+            raise ValueError("missing pattern")
+        pattern = bytes.fromhex(parts[0].removeprefix("0x"))
+        rest = parts[1:]
+    if not pattern:
+        raise ValueError("empty pattern")
+
+    pa = int(rest[0], 0) if len(rest) >= 1 else 0
+    size = int(rest[1], 0) if len(rest) >= 2 else SEARCH_SIZE
+    return pattern, pa, size
+
+# 명령 한 줄 실행 (GDB 와 통신하는 것은 worker 에 넘김) - TUI(ui.py) 와 headless(headless.py) 공용
+#   sess / worker 는 입력할 때의 대상 - 작업이 실행될 때 대상이 바뀌어 있어도 원래 대상에서 실행됨
+#   screen: mem_rows (Mem Dump 줄 수) 와 set_tick(ms) 만 씀
+def run_command(cmd: str, sess: DebugSession, worker: SessionWorker, screen) -> None:
+    if cmd == "n":
+        worker.submit("stepi", sess.cmd_step)
+
+    elif cmd.startswith("n "):
+        arg = cmd[2:].strip()
+        try:
+            count = int(arg, 0)
+        except ValueError:
+            sess.fail(f"invalid count: {arg!r}")
+        else:
+            worker.submit(f"n {count}", lambda: sess.cmd_step_many(count))
+
+    # until rip==<addr> / until <reg> changes
+    elif cmd.startswith("until "):
+        arg = cmd[6:].strip()
+        if arg.startswith("rip==") or arg.startswith("rip =="):
+            try:
+                addr = int(arg.split("==", 1)[1].strip(), 0)
+            except ValueError:
+                sess.fail(f"invalid address: {arg!r}")
+            else:
+                worker.submit(f"until rip==0x{addr:x}", lambda: sess.cmd_until_addr(addr))
+        elif arg.endswith(" changes") and arg[:-8].strip() in REG_ORDER:
+            reg = arg[:-8].strip()
+            worker.submit(f"until {reg} changes", lambda: sess.cmd_until_change(reg))
+        else:
+            sess.fail("usage: until rip==<addr> | until <reg> changes")
+
+    elif cmd == "c":
+        worker.submit("continue", sess.cmd_continue)
+
+    elif cmd == "p":
+        worker.submit("pause", sess.cmd_pause)
+
+    elif cmd == "r":
+        worker.submit("refresh", sess.cmd_refresh)
+
+    elif cmd.startswith("va "):
+        arg = cmd[3:].strip()
+        if arg.lower() == "rip":
+            def job():
+                sess.set_inspect_rip()
+                sess.status = "inspect 모드: RIP-follow"
+            worker.submit("va rip", job)
+        else:
+            try:
+                va = int(arg, 0)
+            except ValueError:
+                sess.fail(f"invalid VA: {arg!r}")
+            else:
+                def job(va=va):
+                    sess.set_inspect_va(va)
+                    sess.status = f"inspect 모드: VA=0x{va:x}"
+                worker.submit(f"va 0x{va:x}", job)
+
+    elif cmd == "peek off" or cmd.startswith("peek "):
+        arg = cmd[5:].strip()
+        try:
+            hz = 0.0 if arg == "off" else float(arg)
+        except ValueError:
+            sess.fail(f"invalid peek rate: {arg!r}")
+        else:
+            hz = min(max(hz, 0.0), PEEK_MAX_HZ)
+            sess.set_peek(hz)
+            screen.set_tick(min(100, 1000 / hz) if hz else 100)
+
+    elif cmd == "profile off":
+        sess.close_profile()
+        sess.status = "profile closed"
+
+    elif cmd.startswith("profile save"):
+        path = cmd[len("profile save"):].strip() or "profile.folded"
+        sess.save_profile(path)
+
+    elif cmd.startswith("profile "):
+        parts = cmd.split()
+        try:
+            seconds, hz = float(parts[1]), float(parts[2])
+            key = parts[3] if len(parts) >= 4 else "page"
+        except (IndexError, ValueError):
+            sess.fail("usage: profile <seconds> <hz> [page|sym]")
+        else:
+            worker.submit(f"profile {seconds:g}s @ {hz:g} Hz", lambda: sess.cmd_profile(seconds, hz, key))
+
+    elif cmd == "stats":
+        sess.stats_on()
+
+    elif cmd.startswith("stats log"):
+        path = cmd[len("stats log"):].strip()
+        if path:
+            sess.stats_on(path)
+        else:
+            sess.fail("usage: stats log <path>")
+
+    elif cmd == "stats reset":
+        sess.stats_reset()
+
+    elif cmd == "stats off":
+        sess.stats_off()
+
+    elif cmd == "trace start" or cmd.startswith("trace start "):
+        path = cmd[len("trace start"):].strip() or TRACE_PATH
+        worker.submit("trace start", lambda: sess.trace_start(path))
+
+    elif cmd == "trace stop":
+        worker.submit("trace stop", sess.trace_stop)
+
+    elif cmd == "trace open" or cmd.startswith("trace open "):
+        sess.trace_open(cmd[len("trace open"):].strip() or TRACE_PATH)
+
+    elif cmd == "trace close":
+        sess.trace_close()
+        sess.status = "trace closed"
+
+    elif cmd.startswith("ts "):
+        arg = cmd[3:].strip()
+        try:
+            sess.trace_seek(int(arg, 0))
+        except ValueError:
+            sess.fail(f"invalid step: {arg!r}")
+
+    elif cmd == "map":
+        worker.submit("map (page table walk)", sess.cmd_map)
+
+    elif cmd == "map off":
+        sess.close_map()
+        sess.status = "map closed"
+
+    elif cmd.startswith("mj "):
+        if sess.map_ranges is None:
+            sess.fail("mj: run 'map' first")
+        else:
+            arg = cmd[3:].strip()
+            worker.submit(f"mj {arg}", lambda: sess.jump_map_region(arg))
+
+    elif cmd.startswith("goto "):
+        arg = cmd[5:].strip()
+        try:
+            va = int(arg, 0)
+        except ValueError:
+            sess.fail(f"invalid VA for goto: {arg!r}")
+        else:
+            worker.submit(f"goto 0x{va:x}", lambda: sess.goto_mem(va, screen.mem_rows))
+
+    elif cmd.startswith("md "):
+        parts = cmd.split()
+        if len(parts) < 2:
+            sess.fail("usage: md <va> [size]")
+        else:
+            target = parts[1]
+            size = 64
+            if len(parts) >= 3:
+                try:
+                    size = int(parts[2], 0)
+                except ValueError:
+                    size = 64
+
+            try:
+                va = int(target, 0)
+            except ValueError:
+                sess.fail(f"invalid VA for md: {target!r}")
+            else:
+                worker.submit(f"md 0x{va:x} {size}", lambda: sess.memdump(va, size))
+
+    elif cmd == "deref":
+        worker.submit("deref", lambda: sess.set_deref(True))
+
+    elif cmd == "deref off":
+        sess.set_deref(False)
+
+    elif cmd == "cpus":
+        worker.submit("cpus", sess.cmd_cpus)
+
+    elif cmd == "cpu grid":
+        worker.submit("cpu grid", lambda: sess.set_cpu_grid(True))
+
+    elif cmd == "cpu grid off":
+        sess.set_cpu_grid(False)
+
+    elif cmd.startswith("cpu "):
+        arg = cmd[4:].strip()
+        try:
+            index = int(arg, 0)
+        except ValueError:
+            sess.fail("usage: cpu <n> | cpu grid [off]")
+        else:
+            worker.submit(f"cpu {index}", lambda: sess.cmd_select_cpu(index))
+
+    elif cmd.startswith("pmd "):
+        parts = cmd.split()
+        try:
+            pa = int(parts[1], 0)
+            size = int(parts[2], 0) if len(parts) >= 3 else 64
+        except (IndexError, ValueError):
+            sess.fail("usage: pmd <pa> [size]")
+        else:
+            worker.submit(f"pmd 0x{pa:x} {size}", lambda: sess.memdump(pa, size, phys=True))
+
+    elif cmd.startswith("pfind "):
+        try:
+            pattern, pa, size = parse_search_args(cmd[6:].strip())
+        except ValueError as e:
+            sess.fail(f"usage: pfind <hex|\"text\"> [pa] [size] ({e})")
+        else:
+            worker.submit(f"pfind {pattern!r}", lambda: sess.cmd_search(pattern, pa, size))
+
+    elif cmd == "":
+        pass
+
+    else:
+        sess.fail(f"unknown cmd: {cmd!r}")
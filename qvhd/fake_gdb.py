@@ -0,0 +1,556 @@
+#!/usr/bin/env python3
+# 가짜 gdb: GdbMIClient 가 "gdb --interpreter=mi2" 대신 실행 (gdb_path=fake_gdb.py) - QEMU / gdb 없이 MI 경로를 재현
+#   live   (기본): MI 명령을 RSP 로 바꿔 "target remote" 대상(FakeGdbStub 또는 실제 QEMU gdbstub)에 보냄
+#                  gdb 처럼 정지 후 레지스터를 한 번 읽어 재개할 때까지 캐시, 메모리는 'm' 패킷을 차례로
+#   replay       : 기록한 MI transcript(JSONL) 에서 같은 명령의 응답을 찾아 돌려줌 (같은 명령이 여러 번이면 기록 순서대로)
+#   record       : 진짜 gdb 를 중계하며 명령과 응답을 transcript 로 기록
+#
+# 설정은 환경 변수로 (GdbMIClient 가 넘기는 인자는 고정)
+#   QVHD_FAKE_GDB_LATENCY  명령마다 지연 ms - "0.2" 또는 "0.2,-data-read-memory-bytes=1,monitor=0.5" (명령 접두사별)
+#   QVHD_FAKE_GDB_REPLAY   transcript 경로 -> replay
+#   QVHD_FAKE_GDB_RECORD   transcript 경로 -> record (QVHD_FAKE_GDB_REAL: 중계할 gdb, 기본 gdb)
+import json
+import os
+import re
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from gdb_rsp_client import GdbRSPClient
+from memory import PAGE_SIZE, split_chunks
+from mi_parser import parse_cstring
+
+ENV_LATENCY = "QVHD_FAKE_GDB_LATENCY"
+ENV_REPLAY = "QVHD_FAKE_GDB_REPLAY"
+ENV_RECORD = "QVHD_FAKE_GDB_RECORD"
+ENV_REAL = "QVHD_FAKE_GDB_REAL"
+
+# 명령 앞의 token / --thread, --frame 옵션
+COMMAND_RE = re.compile(r"(\d*)(\S*)\s*(.*)$")
+OPTION_RE = re.compile(r"--(thread|frame)\s+(\S+)\s*")
+TARGET_REMOTE_RE = re.compile(r'target remote [^"\s]+')
+
+# "0.2,-data-read-memory-bytes=1,monitor=0.5" -> (기본 초, [(접두사, 초), ...] 긴 접두사 먼저)
+def parse_latency(spec: str):
+    default, overrides = 0.0, []
+    for part in (spec or "").split(","):
+        part = part.strip()
+        if not part:
+            continue
+        prefix, eq, ms = part.rpartition("=")
+        if eq:
+            overrides.append((prefix.strip(), float(ms) / 1e3))
+        else:
+            default = float(ms) / 1e3
+    overrides.sort(key=lambda item: -len(item[0]))
+    return default, overrides
+
+# MI c-string
+def mi_quote(text: str) -> str:
+    text = text.replace("\\", "\\\\").replace('"', '\\"')
+    return '"' + text.replace("\n", "\\n").replace("\r", "\\r").replace("\t", "\\t") + '"'
+
+# -interpreter-exec console "..." 의 콘솔 명령 (아니면 None)
+def console_text(cmd: str, args: str):
+    if cmd != "-interpreter-exec" or not args.startswith("console "):
+        return None
+    try:
+        text, _pos = parse_cstring(args, len("console "))
+    except ValueError:
+        return None
+    return text
+
+class MIOutput:
+    # stdout 에 MI 레코드 쓰기 (reader / 실행 대기 스레드가 같이 씀)
+    def __init__(self, stream=None) -> None:
+        self.stream = stream if stream is not None else sys.stdout
+        self.lock = threading.Lock()
+
+    def emit(self, *lines) -> None:
+        with self.lock:
+            for line in lines:
+                self.stream.write(line + "\n")
+            self.stream.flush()
+
+    def done(self, token: str, results: str = "") -> None:
+        self.emit(f"{token}^done" + (f",{results}" if results else ""), "(gdb) ")
+
+    def error(self, token: str, msg: str) -> None:
+        self.emit(f"{token}^error,msg={mi_quote(msg)}", "(gdb) ")
+
+    def console(self, text: str) -> None:
+        if text:
+            self.emit(*[f"~{mi_quote(line)}" for line in text.splitlines(keepends=True)])
+
+class LiveGdb:
+    # MI 명령 -> RSP (gdb 가 하는 만큼만)
+    def __init__(self, out: MIOutput, latency) -> None:
+        self.out = out
+        self.latency = latency
+        self.rsp = None
+
+        # gdb thread 번호(1부터) 순서의 RSP thread id / 이름, 지금 thread
+        self.threads = []
+        self.labels = []
+        self.current = 1
+
+        # 정지 중 레지스터 캐시 {RSP thread id: {이름: 값}} (재개하면 비움) / changed-registers 비교용 이전 값
+        self.regcache = {}
+        self.prev_values = {}
+
+        # breakpoint 번호 -> (Z 종류, 주소, 임시 여부)
+        self.breakpoints = {}
+        self.next_bkpt = 1
+
+        # -exec-continue 중 (정지는 waiter thread 가 받아 *stopped 를 씀)
+        self.running = False
+        self.waiter = None
+        self.interrupt_req = threading.Event()
+
+    def on_sigint(self, *_args) -> None:
+        if self.running:
+            self.interrupt_req.set()
+
+    def handle(self, token: str, cmd: str, thread, args: str) -> None:
+        # 인터럽트 뒤에 온 명령은 gdb 처럼 정지를 먼저 처리하고 실행
+        if self.running and self.interrupt_req.is_set() and cmd != "-exec-interrupt":
+            self.waiter.join(timeout=5.0)
+        if self.running and cmd not in ("-exec-interrupt", "-gdb-set"):
+            self.out.error(token, "Cannot execute this command while the target is running.")
+            return
+
+        text = console_text(cmd, args)
+        try:
+            if text is not None:
+                self.console_cmd(token, text, thread)
+            elif cmd == "-gdb-set":
+                self.out.done(token)
+            elif self.rsp is None:
+                self.out.error(token, "The program is not being run.")
+            elif cmd == "-data-list-register-names":
+                names = ",".join(mi_quote(name) for name, _ in self.rsp.reg_layout)
+                self.out.done(token, f"register-names=[{names}]")
+            elif cmd == "-data-list-register-values":
+                self.register_values(token, thread, args)
+            elif cmd == "-data-list-changed-registers":
+                self.changed_registers(token, thread)
+            elif cmd == "-exec-step-instruction":
+                self.step(token, thread, 1)
+            elif cmd == "-exec-continue":
+                self.cont(token)
+            elif cmd == "-exec-interrupt":
+                self.interrupt_req.set()
+                self.out.done(token)
+            elif cmd == "-break-insert":
+                self.break_insert(token, args)
+            elif cmd == "-break-delete":
+                self.break_delete(token, args)
+            elif cmd == "-data-read-memory-bytes":
+                self.read_memory(token, args)
+            elif cmd == "-data-write-memory-bytes":
+                addr, data = args.split()
+                self.rsp.write_virt_bytes(int(addr, 0), bytes.fromhex(data))
+                self.out.done(token)
+            elif cmd == "-thread-info":
+                self.thread_info(token)
+            elif cmd == "-thread-select":
+                self.current = self.gdb_thread(args.strip())
+                self.out.done(token, f'new-thread-id="{self.current}"')
+            else:
+                self.out.error(token, f"Undefined MI command: {cmd[1:]}")
+        except (RuntimeError, ValueError, OSError) as e:
+            self.out.error(token, str(e))
+
+    # 콘솔 명령 (target remote / monitor / stepi / info symbol)
+    def console_cmd(self, token: str, text: str, thread) -> None:
+        words = text.split()
+        if words[:2] == ["target", "remote"] and len(words) == 3:
+            self.connect(words[2])
+            self.out.console(f"Remote debugging using {words[2]}\n")
+            self.out.done(token)
+        elif self.rsp is None:
+            self.out.error(token, "The program is not being run.")
+        elif words[:1] == ["monitor"]:
+            self.out.console(self.rsp.monitor_cmd(text[len("monitor"):].strip()))
+            self.out.done(token)
+        elif words[:1] == ["stepi"]:
+            self.step(token, thread, int(words[1], 0) if len(words) > 1 else 1)
+        elif words[:2] == ["info", "symbol"] and len(words) == 3:
+            self.out.console(f"No symbol matches {words[2]}.\n")
+            self.out.done(token)
+        else:
+            self.out.error(token, f'Undefined command: "{text}".')
+
+    def connect(self, target: str) -> None:
+        self.rsp = GdbRSPClient(target=target)
+        self.rsp.connect()
+        try:
+            threads = self.rsp.list_threads()
+        except RuntimeError:
+            threads = [("1", "CPU#0")]
+        self.threads = [tid for tid, _ in threads]
+        self.labels = [label for _, label in threads]
+        self.current = self.stop_thread()
+
+    # gdb thread 번호 <-> RSP thread id
+    def gdb_thread(self, num) -> int:
+        num = int(num)
+        if not 1 <= num <= len(self.threads):
+            raise ValueError(f"Invalid thread id: {num}")
+        return num
+
+    def stop_thread(self) -> int:
+        m = re.search(r"thread:([^;]+);", self.rsp.last_stop or "")
+        if m and m.group(1) in self.threads:
+            return self.threads.index(m.group(1)) + 1
+        return self.current
+
+    def rsp_thread(self, thread) -> str:
+        return self.threads[(self.gdb_thread(thread) if thread is not None else self.current) - 1]
+
+    # 정지 후 thread 마다 'g' 한 번 (재개 전까지 캐시)
+    def values(self, thread) -> dict:
+        tid = self.rsp_thread(thread)
+        if tid not in self.regcache:
+            sel, pkt = self.rsp.request_many([f"Hg{tid}", "g"])
+            if sel != "OK":
+                raise RuntimeError(f"Invalid thread id: {thread}")
+            self.regcache[tid] = self.rsp.parse_register_values(pkt)
+        return self.regcache[tid]
+
+    def register_values(self, token: str, thread, args: str) -> None:
+        parts = args.split()
+        names = [name for name, _ in self.rsp.reg_layout]
+        nums = [int(p) for p in parts[1:]] if len(parts) > 1 else range(len(names))
+        values = self.values(thread)
+
+        entries = []
+        for num in nums:
+            if not 0 <= num < len(names):
+                raise ValueError(f"bad register number: {num}")
+            val = values.get(names[num])
+            text = "<unavailable>" if val is None else hex(val)
+            entries.append(f'{{number="{num}",value="{text}"}}')
+        self.out.done(token, f"register-values=[{','.join(entries)}]")
+
+    def changed_registers(self, token: str, thread) -> None:
+        tid = self.rsp_thread(thread)
+        values = self.values(thread)
+        prev = self.prev_values.get(tid, {})
+        names = [name for name, _ in self.rsp.reg_layout]
+        changed = [f'"{num}"' for num, name in enumerate(names) if prev.get(name) != values.get(name)]
+        self.prev_values[tid] = values
+        self.out.done(token, f"changed-registers=[{','.join(changed)}]")
+
+    # stepi (thread 를 지정하면 그 vCPU 만) - gdb 처럼 ^running 먼저, 정지하면 *stopped
+    #   breakpoint 가 있으면 gdb 처럼 스텝마다 RIP 를 보고 걸리면 "stepi N" 을 거기서 끝냄
+    def step(self, token: str, thread, count: int) -> None:
+        self.rsp.thread = self.rsp_thread(thread)
+        self.regcache.clear()
+        self.out.emit(f"{token}^running", '*running,thread-id="all"', "(gdb) ")
+        reason = 'reason="end-stepping-range"'
+        if self.breakpoints:
+            for _ in range(count):
+                self.rsp.step_many(1)
+                self.regcache.clear()
+                hit = self.breakpoint_reason(self.values(thread).get("rip"))
+                if hit is not None:
+                    reason = hit
+                    break
+        else:
+            self.rsp.step_many(count)
+        self.out.emit(self.stopped_record(reason), "(gdb) ")
+
+    def cont(self, token: str) -> None:
+        self.rsp.thread = None
+        self.regcache.clear()
+        self.interrupt_req.clear()
+        self.rsp.cont()
+        self.running = True
+        self.out.emit(f"{token}^running", '*running,thread-id="all"', "(gdb) ")
+        self.waiter = threading.Thread(target=self.wait_running, daemon=True)
+        self.waiter.start()
+
+    # 실행 중 정지 대기 (SIGINT / -exec-interrupt 면 \x03)
+    def wait_running(self) -> None:
+        try:
+            while self.rsp.running:
+                if self.interrupt_req.is_set():
+                    self.rsp.interrupt()
+                    break
+                self.rsp.poll_stop()
+                if self.rsp.running:
+                    time.sleep(0.0005)
+        except RuntimeError as e:
+            self.interrupt_req.clear()
+            self.running = False
+            self.out.emit(f"&{mi_quote(str(e) + chr(10))}")
+            return
+
+        pkt = self.rsp.last_stop or ""
+        reason = 'reason="signal-received",signal-name="SIGTRAP"'
+        if pkt.startswith("T02"):
+            reason = 'reason="signal-received",signal-name="SIGINT"'
+        else:
+            self.current = self.stop_thread()
+            hit = self.breakpoint_reason(self.values(None).get("rip"))
+            if hit is not None:
+                reason = hit
+        # RSP 를 다 쓴 뒤에 running 을 풀어야 reader 쪽 명령과 겹치지 않음
+        line = self.stopped_record(reason)
+        self.interrupt_req.clear()
+        self.running = False
+        self.out.emit(line, "(gdb) ")
+
+    def stopped_record(self, reason: str) -> str:
+        self.current = self.stop_thread()
+        rip = self.values(None).get("rip") or 0
+        return (
+            f'*stopped,{reason},frame={{addr="0x{rip:x}",func="??",args=[]}},'
+            f'thread-id="{self.current}",stopped-threads="all",core="{self.current - 1}"'
+        )
+
+    # -break-insert [-t] [-h] *0xaddr
+    def break_insert(self, token: str, args: str) -> None:
+        words = args.split()
+        temporary, hardware = "-t" in words, "-h" in words
+        addr = int(words[-1].lstrip("*"), 0)
+        kind = 1 if hardware else 0
+        if self.rsp.request(f"Z{kind},{addr:x},1") != "OK":
+            what = "hardware breakpoint" if hardware else "breakpoint"
+            raise RuntimeError(f"Could not insert {what} at 0x{addr:x}")
+
+        num = self.next_bkpt
+        self.next_bkpt += 1
+        self.breakpoints[num] = (kind, addr, temporary)
+        disp = "del" if temporary else "keep"
+        btype = "hw breakpoint" if hardware else "breakpoint"
+        self.out.done(token, f'bkpt={{number="{num}",type="{btype}",disp="{disp}",enabled="y",addr="0x{addr:x}"}}')
+
+    def break_delete(self, token: str, args: str) -> None:
+        for word in args.split():
+            if int(word) not in self.breakpoints:
+                raise ValueError(f"No breakpoint number {word}.")
+            self.remove_breakpoint(int(word))
+        self.out.done(token)
+
+    def breakpoint_at(self, addr):
+        for num, (_kind, bp_addr, temporary) in self.breakpoints.items():
+            if bp_addr == addr:
+                return num, temporary
+        return None
+
+    # addr 에 breakpoint 가 있으면 *stopped 의 reason (임시 breakpoint 는 지움)
+    def breakpoint_reason(self, addr):
+        hit = self.breakpoint_at(addr)
+        if hit is None:
+            return None
+        num, temporary = hit
+        if temporary:
+            self.remove_breakpoint(num)
+        return f'reason="breakpoint-hit",disp="{"del" if temporary else "keep"}",bkptno="{num}"'
+
+    def remove_breakpoint(self, num: int) -> None:
+        kind, addr, _temporary = self.breakpoints.pop(num)
+        self.rsp.request(f"z{kind},{addr:x},1")
+
+    # -data-read-memory-bytes: 'm' 패킷을 차례로 (gdb 처럼), 읽히는 부분만 블록으로
+    def read_memory(self, token: str, args: str) -> None:
+        addr, size = args.split()[:2]
+        addr, size = int(addr, 0), int(size, 0)
+        try:
+            data = self.rsp.read_virt_bytes(addr, size)
+            blocks = [(addr, data)] if len(data) == size else None
+        except RuntimeError:
+            blocks = None
+
+        if blocks is None:
+            blocks = []
+            for page, n in split_chunks(addr, size, PAGE_SIZE):
+                try:
+                    data = self.rsp.read_virt_bytes(page, n)
+                except RuntimeError:
+                    continue
+                if blocks and blocks[-1][0] + len(blocks[-1][1]) == page:
+                    blocks[-1] = (blocks[-1][0], blocks[-1][1] + data)
+                else:
+                    blocks.append((page, data))
+        if not blocks:
+            raise RuntimeError(f"Unable to read memory at 0x{addr:x}.")
+
+        out = []
+        for begin, data in blocks:
+            out.append(
+                f'{{begin="0x{begin:x}",offset="0x{0:016x}",end="0x{begin + len(data):x}",contents="{data.hex()}"}}'
+            )
+        self.out.done(token, f"memory=[{','.join(out)}]")
+
+    def thread_info(self, token: str) -> None:
+        entries = []
+        for num, label in enumerate(self.labels, 1):
+            entries.append(
+                f'{{id="{num}",target-id="Thread 1.{num} ({label} [halted ])",state="stopped",core="{num - 1}"}}'
+            )
+        self.out.done(token, f'threads=[{",".join(entries)}],current-thread-id="{self.current}"')
+
+    def close(self) -> None:
+        if self.rsp is not None:
+            self.rsp.close()
+
+class ReplayGdb:
+    # transcript: JSONL {"cmd": 명령(token 제외), "out": [출력 줄]}
+    #   결과 레코드("^...") 에는 지금 token 을 붙여 돌려줌
+    def __init__(self, out: MIOutput, path: str) -> None:
+        self.out = out
+        self.replies = {}
+        with open(path) as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    entry = json.loads(line)
+                    self.replies.setdefault(replay_key(entry["cmd"]), []).append(entry["out"])
+        self.used = {}
+
+    def on_sigint(self, *_args) -> None:
+        pass
+
+    def handle(self, token: str, cmd: str, thread, args: str) -> None:
+        key = replay_key(full_command(cmd, thread, args))
+        replies = self.replies.get(key)
+        if not replies:
+            self.out.error(token, f"fake gdb: no recorded reply for {key!r}")
+            return
+
+        # 같은 명령은 기록 순서대로, 다 쓰면 마지막 것을 반복
+        i = self.used.get(key, 0)
+        self.used[key] = i + 1
+        lines = replies[min(i, len(replies) - 1)]
+        self.out.emit(*[token + line if line.startswith("^") else line for line in lines], "(gdb) ")
+
+    def close(self) -> None:
+        pass
+
+def full_command(cmd: str, thread, args: str) -> str:
+    opt = f" --thread {thread}" if thread is not None else ""
+    return f"{cmd}{opt} {args}".rstrip()
+
+# replay 에서 같은 명령으로 볼 키 (target remote 주소는 기록할 때와 달라도 됨)
+def replay_key(command: str) -> str:
+    return TARGET_REMOTE_RE.sub("target remote", command)
+
+# 명령 줄 -> (token, 명령, --thread 값, 나머지 인자)
+def split_command(line: str):
+    token, cmd, rest = COMMAND_RE.match(line).groups()
+    thread = None
+    while True:
+        m = OPTION_RE.match(rest)
+        if not m:
+            break
+        if m.group(1) == "thread":
+            thread = m.group(2)
+        rest = rest[m.end():]
+    return token, cmd, thread, rest
+
+def latency_for(latency, cmd: str, args: str) -> float:
+    default, overrides = latency
+    text = console_text(cmd, args)
+    for prefix, delay in overrides:
+        if cmd.startswith(prefix) or (text is not None and text.startswith(prefix)):
+            return delay
+    return default
+
+def serve(backend, latency) -> None:
+    out = backend.out
+    signal.signal(signal.SIGINT, backend.on_sigint)
+    out.emit('=thread-group-added,id="i1"', "(gdb) ")
+
+    for raw in sys.stdin:
+        line = raw.strip()
+        if not line:
+            continue
+        token, cmd, thread, args = split_command(line)
+        if cmd in ("-gdb-exit", "quit"):
+            out.emit(f"{token}^exit")
+            break
+
+        delay = latency_for(latency, cmd, args)
+        if delay:
+            time.sleep(delay)
+        backend.handle(token, cmd, thread, args)
+    backend.close()
+
+# 진짜 gdb 중계 + 기록 (스트림 레코드는 다음 결과 레코드의 명령, *stopped 같은 비동기 레코드는 직전 명령에 붙임)
+def record(path: str, real_gdb: str) -> None:
+    env = {k: v for k, v in os.environ.items() if k not in (ENV_RECORD, ENV_REPLAY)}
+    proc = subprocess.Popen(
+        [real_gdb] + sys.argv[1:], stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, bufsize=1, env=env,
+    )
+    signal.signal(signal.SIGINT, lambda *_args: proc.send_signal(signal.SIGINT))
+
+    commands = {}
+    entries = []
+    lock = threading.Lock()
+
+    def pump_output():
+        pending = []
+        last = None
+        for line in proc.stdout:
+            sys.stdout.write(line)
+            sys.stdout.flush()
+            line = line.rstrip("\n")
+            if line.strip() == "(gdb)":
+                continue
+            m = re.match(r"(\d+)\^", line)
+            with lock:
+                if m and m.group(1) in commands:
+                    last = {"cmd": commands.pop(m.group(1)), "out": pending + [line[len(m.group(1)):]]}
+                    entries.append(last)
+                    pending = []
+                elif line[:1] in ("*", "=") and last is not None:
+                    last["out"].append(line)
+                elif line[:1] in ("*", "="):
+                    # 첫 명령 전의 배너 (=thread-group-added) 는 serve() 가 직접 씀
+                    continue
+                else:
+                    pending.append(line)
+
+    reader = threading.Thread(target=pump_output, daemon=True)
+    reader.start()
+    for raw in sys.stdin:
+        line = raw.strip()
+        token, cmd, thread, args = split_command(line)
+        if token:
+            with lock:
+                commands[token] = full_command(cmd, thread, args)
+        proc.stdin.write(raw)
+        proc.stdin.flush()
+        if cmd in ("-gdb-exit", "quit"):
+            break
+
+    try:
+        proc.stdin.close()
+    except OSError:
+        pass
+    proc.wait()
+    reader.join(timeout=1.0)
+    with open(path, "w") as f:
+        for entry in entries:
+            f.write(json.dumps(entry) + "\n")
+
+def main() -> None:
+    latency = parse_latency(os.environ.get(ENV_LATENCY, ""))
+    out = MIOutput()
+
+    if os.environ.get(ENV_RECORD):
+        record(os.environ[ENV_RECORD], os.environ.get(ENV_REAL, "gdb"))
+    elif os.environ.get(ENV_REPLAY):
+        serve(ReplayGdb(out, os.environ[ENV_REPLAY]), latency)
+    else:
+        serve(LiveGdb(out, latency), latency)
+
+if __name__ == "__main__":
+    main()
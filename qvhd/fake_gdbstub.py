@@ -0,0 +1,708 @@
+import json
+import os
+import re
+import select
+import socket
+import tempfile
+import threading
+import time
+
+from gdb_rsp_client import DEFAULT_REG_LAYOUT
+
+PTE_P  = 1 << 0
+PTE_W  = 1 << 1
+PTE_U  = 1 << 2
+PTE_PS = 1 << 7
+PTE_NX = 1 << 63
+
+PAGE_SIZES = {"4K": 1 << 12, "2M": 1 << 21, "1G": 1 << 30}
+
+class FakeGuest:
+    # 테스트/벤치마크용 가짜 x86_64 게스트 (물리 메모리 + 페이지 테이블 + 레지스터)
+    def __init__(self, ram_size: int = 64 << 20) -> None:
+        self.ram = bytearray(ram_size)
+        self.regs = {name: 0 for name, _ in DEFAULT_REG_LAYOUT}
+        # vCPU 별 레지스터 (cpus[0] 이 regs - add_cpus 로 늘림)
+        self.cpus = [self.regs]
+        self.breakpoints = set()
+        self.steps = 0
+
+        # 페이지 테이블은 1MB 아래, 데이터 프레임은 1MB 위에서 할당
+        self.next_table = 0x1000
+        self.next_frame = 0x100000
+
+        self.regs["cr0"] = 0x80050033
+        self.regs["cr4"] = 0x000006F0
+        self.regs["efer"] = 0xD01
+        self.regs["eflags"] = 0x246
+        self.regs["cs"] = 0x10
+        self.regs["ss"] = 0x18
+        self.regs["cr3"] = self.alloc_table()
+
+        # 스텝 시 rip가 순환하는 코드 구간
+        self.code_base = None
+        self.code_len = 48
+
+    # 물리 메모리 할당
+    def alloc_table(self) -> int:
+        pa = self.next_table
+        self.next_table += 0x1000
+        if self.next_table > 0x100000:
+            raise RuntimeError("fake guest: page table area exhausted")
+        return pa
+
+    def alloc_frames(self, size: int, align: int = 0x1000) -> int:
+        pa = (self.next_frame + align - 1) & ~(align - 1)
+        if pa + size > len(self.ram):
+            raise RuntimeError("fake guest: out of RAM")
+        self.next_frame = pa + size
+        return pa
+
+    # 물리 메모리 읽기/쓰기
+    def read_phys(self, pa: int, size: int) -> bytes:
+        if pa < 0 or pa + size > len(self.ram):
+            raise ValueError(f"physical address out of range: 0x{pa:x}")
+        return bytes(self.ram[pa:pa + size])
+
+    def write_phys(self, pa: int, data: bytes) -> None:
+        if pa < 0 or pa + len(data) > len(self.ram):
+            raise ValueError(f"physical address out of range: 0x{pa:x}")
+        self.ram[pa:pa + len(data)] = data
+
+    def read_qword(self, pa: int) -> int:
+        return int.from_bytes(self.ram[pa:pa + 8], "little")
+
+    def write_qword(self, pa: int, val: int) -> None:
+        self.ram[pa:pa + 8] = val.to_bytes(8, "little")
+
+    # 페이지 1개 매핑 (필요한 상위 테이블은 자동 생성)
+    def map_page(self, va: int, pa: int, flags: int = PTE_P | PTE_W, page_size: str = "4K") -> None:
+        leaf_level = {"1G": 1, "2M": 2, "4K": 3}[page_size]
+        table = self.regs["cr3"] & ~0xFFF
+        shifts = (39, 30, 21, 12)
+
+        for level, shift in enumerate(shifts):
+            entry_pa = table + ((va >> shift) & 0x1FF) * 8
+            if level == leaf_level:
+                entry = pa | flags | PTE_P
+                if page_size != "4K":
+                    entry |= PTE_PS
+                self.write_qword(entry_pa, entry)
+                return
+
+            entry = self.read_qword(entry_pa)
+            if not (entry & PTE_P):
+                entry = self.alloc_table() | PTE_P | PTE_W | (flags & PTE_U)
+                self.write_qword(entry_pa, entry)
+            table = entry & 0x000FFFFFFFFFF000
+
+    # 연속 구간 매핑 (물리 프레임도 새로 할당)
+    def map_range(self, va: int, size: int, flags: int = PTE_P | PTE_W, page_size: str = "4K") -> int:
+        step = PAGE_SIZES[page_size]
+        pa_base = self.alloc_frames(size, align=step)
+        for off in range(0, size, step):
+            self.map_page(va + off, pa_base + off, flags, page_size)
+        return pa_base
+
+    # VA -> PA 변환 (매핑이 없으면 None)
+    def translate(self, va: int):
+        table = self.regs["cr3"] & ~0xFFF
+        for level, shift in enumerate((39, 30, 21, 12)):
+            entry = self.read_qword(table + ((va >> shift) & 0x1FF) * 8)
+            if not (entry & PTE_P):
+                return None
+            if level in (1, 2) and entry & PTE_PS:
+                mask = (1 << shift) - 1
+                return (entry & 0x000FFFFFFFFFF000 & ~mask) + (va & mask)
+            table = entry & 0x000FFFFFFFFFF000
+        return table + (va & 0xFFF)
+
+    def read_virt(self, va: int, size: int):
+        out = bytearray()
+        while size > 0:
+            pa = self.translate(va)
+            if pa is None:
+                return bytes(out) if out else None
+            n = min(size, 0x1000 - (va & 0xFFF))
+            out += self.ram[pa:pa + n]
+            va += n
+            size -= n
+        return bytes(out)
+
+    def write_virt(self, va: int, data: bytes) -> bool:
+        pos = 0
+        while pos < len(data):
+            pa = self.translate(va + pos)
+            if pa is None:
+                return False
+            n = min(len(data) - pos, 0x1000 - ((va + pos) & 0xFFF))
+            self.ram[pa:pa + n] = data[pos:pos + n]
+            pos += n
+        return True
+
+    # vCPU 를 count 개로 (추가 vCPU 는 cpu 0 복사본, rip / rsp 만 다름)
+    def add_cpus(self, count: int) -> None:
+        for i in range(len(self.cpus), count):
+            regs = dict(self.cpus[0])
+            if self.code_base is not None:
+                regs["rip"] = self.code_base + (3 * i) % self.code_len
+            regs["rsp"] = (regs["rsp"] - i * 0x4000) & 0xFFFFFFFFFFFFFFFF
+            self.cpus.append(regs)
+
+    # 가짜 명령어 1개 실행
+    def step(self, cpu: int = 0) -> None:
+        self.steps += 1
+        regs = self.cpus[cpu]
+        regs["rax"] = (regs["rax"] + 1) & 0xFFFFFFFFFFFFFFFF
+        regs["rcx"] = (regs["rcx"] - 1) & 0xFFFFFFFFFFFFFFFF
+        if self.steps % 8 == 0:
+            regs["rdx"] ^= 1
+
+        if self.code_base is None:
+            regs["rip"] = (regs["rip"] + 3) & 0xFFFFFFFFFFFFFFFF
+        else:
+            regs["rip"] = self.code_base + (regs["rip"] - self.code_base + 3) % self.code_len
+
+    # 레지스터 하나를 hex 로 (값이 None 이면 QEMU 가 읽지 못한 레지스터처럼 'xx..')
+    def reg_hex(self, name: str, size: int, cpu: int = 0) -> str:
+        val = self.cpus[cpu][name]
+        if val is None:
+            return "xx" * size
+        return (val & ((1 << (size * 8)) - 1)).to_bytes(size, "little").hex()
+
+    # 레지스터 파일 직렬화 ('g' 패킷 배치)
+    def reg_packet(self, cpu: int = 0) -> str:
+        return "".join(self.reg_hex(name, size, cpu) for name, size in DEFAULT_REG_LAYOUT)
+
+    def set_reg_bytes(self, data: bytes, cpu: int = 0) -> None:
+        regs = self.cpus[cpu]
+        off = 0
+        for name, size in DEFAULT_REG_LAYOUT:
+            if off + size > len(data):
+                break
+            regs[name] = int.from_bytes(data[off:off + size], "little")
+            off += size
+
+    # QEMU HMP 명령어 흉내
+    def monitor(self, cmd: str) -> str:
+        cmd = cmd.strip()
+
+        m = re.match(r"xp\s+/(\d*)([gwhb]?)x\s+(\S+)$", cmd)
+        if m:
+            count = int(m.group(1) or "1")
+            unit = {"g": 8, "w": 4, "h": 2, "b": 1, "": 4}[m.group(2)]
+            addr = int(m.group(3), 0)
+            return self.format_xp(addr, count, unit)
+
+        m = re.match(r'pmemsave\s+(\S+)\s+(\S+)\s+"(.*)"$', cmd)
+        if m:
+            addr, size = int(m.group(1), 0), int(m.group(2), 0)
+            if addr + size > len(self.ram):
+                return "Invalid parameter 'addr'\n"
+            with open(m.group(3), "wb") as f:
+                f.write(self.ram[addr:addr + size])
+            return ""
+
+        if cmd == "info registers":
+            r = self.regs
+            return (
+                f"RAX={r['rax']:016x} RBX={r['rbx']:016x} RCX={r['rcx']:016x} RDX={r['rdx']:016x}\n"
+                f"RIP={r['rip']:016x} RFL={r['eflags']:08x}\n"
+                f"CR0={r['cr0']:08x} CR2={r['cr2']:016x} CR3={r['cr3']:016x} CR4={r['cr4']:08x}\n"
+            )
+
+        return f"unknown command: '{cmd}'\n"
+
+    # QEMU memory_dump() 출력 형식 (한 줄 16바이트)
+    def format_xp(self, addr: int, count: int, unit: int) -> str:
+        per_line = max(1, 16 // unit)
+        lines = []
+        for i in range(0, count, per_line):
+            line_addr = addr + i * unit
+            vals = []
+            for j in range(i, min(count, i + per_line)):
+                pa = addr + j * unit
+                if pa + unit > len(self.ram):
+                    lines.append("Cannot access memory")
+                    return "\n".join(lines) + "\n"
+                val = int.from_bytes(self.ram[pa:pa + unit], "little")
+                vals.append(f"0x{val:0{unit * 2}x}")
+            lines.append(f"{line_addr:016x}: " + " ".join(vals))
+        return "\n".join(lines) + "\n"
+
+# 커널/유저 영역이 섞인 기본 게스트
+def build_demo_guest(ram_size: int = 64 << 20, cpus: int = 1) -> FakeGuest:
+    guest = FakeGuest(ram_size=ram_size)
+
+    # 커널 텍스트 (4K, 실행 가능)
+    guest.map_range(0xFFFFFFFF81000000, 0x40000, PTE_P)
+    # 커널 데이터 (2M, NX)
+    guest.map_range(0xFFFF888000000000, 0x400000, PTE_P | PTE_W | PTE_NX, "2M")
+    # 유저 코드/스택
+    guest.map_range(0x400000, 0x10000, PTE_P | PTE_U)
+    guest.map_range(0x7FFFFFFDE000, 0x21000, PTE_P | PTE_W | PTE_U | PTE_NX)
+
+    guest.code_base = 0xFFFFFFFF81000100
+    guest.regs["rip"] = guest.code_base
+    guest.regs["rsp"] = 0xFFFF888000100000
+    guest.regs["rcx"] = 0x1000
+    guest.write_virt(0xFFFFFFFF81000100, bytes(range(0x40, 0x80)))
+    guest.add_cpus(cpus)
+    return guest
+
+class FakeGdbStub:
+    # FakeGuest를 RSP로 노출하는 in-process gdbstub (QEMU -s 대용)
+    #   vCPU 마다 thread 1개 (id = cpu 번호 + 1), Hg / Hc / vCont;s 로 고름
+    #   rtt=True 면 latency 를 패킷이 도착한 시점부터 셈 (네트워크 왕복 지연 모델 - 한 번에 보낸 요청은 지연을 한 번만 겪음)
+    #   rtt=False 면 응답마다 latency (stub 처리 시간 모델)
+    #   latencies: 패킷 접두사별 latency {"qRcmd": 0.002, ...} (HMP monitor 명령처럼 느린 패킷, 긴 접두사 우선)
+    #   QEMU 처럼 all-stop: 실행 중(c, 또는 s 후 step_time 안)에 받은 바이트는 ack 가 아니면 버리고 게스트를 멈춤 (dropped 로 셈)
+    def __init__(self, guest: FakeGuest = None, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+                 rtt: bool = False, latencies: dict = None, step_time: float = 0.0001) -> None:
+        self.guest = guest if guest is not None else build_demo_guest()
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.rtt = rtt
+        self.latencies = sorted((latencies or {}).items(), key=lambda item: -len(item[0]))
+        self.step_time = step_time
+
+        self.listener = None
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.lock = threading.Lock()
+        self.packets = 0
+        self.dropped = 0
+
+    @property
+    def target(self) -> str:
+        return f"{self.host}:{self.port}"
+
+    def start(self) -> "FakeGdbStub":
+        self.listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.listener.bind((self.host, self.port))
+        self.listener.listen(4)
+        self.port = self.listener.getsockname()[1]
+
+        self.thread = threading.Thread(target=self.serve, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.stop_event.set()
+        try:
+            self.listener.close()
+        except Exception:
+            pass
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def serve(self) -> None:
+        while not self.stop_event.is_set():
+            try:
+                ready, _, _ = select.select([self.listener], [], [], 0.1)
+                if not ready:
+                    continue
+                conn, _ = self.listener.accept()
+            except OSError:
+                return
+
+            threading.Thread(target=self.serve_conn, args=(conn,), daemon=True).start()
+
+    # 연결 1개 처리
+    def serve_conn(self, conn: socket.socket) -> None:
+        conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        buf = bytearray()
+        state = {"no_ack": False, "running": False, "open": True, "g_cpu": 0, "c_cpu": 0, "arrived": 0.0, "buf": buf}
+
+        try:
+            while state["open"] and not self.stop_event.is_set():
+                timeout = 0.001 if state["running"] else 0.1
+                ready, _, _ = select.select([conn], [], [], timeout)
+
+                if ready:
+                    chunk = conn.recv(65536)
+                    if not chunk:
+                        return
+                    buf += chunk
+                    state["arrived"] = time.monotonic()
+                elif state["running"]:
+                    self.run_slice(conn, state)
+                    continue
+
+                while buf:
+                    if state["running"] and buf[0] not in (0x2B, 0x2D):
+                        # QEMU gdb_read_byte: 실행 중에는 0x03 이 아닌 바이트도 버리고 vm_stop (stop reply T02)
+                        if buf[0] != 0x03:
+                            self.dropped += 1
+                        del buf[0]
+                        state["running"] = False
+                        self.send(conn, state, f"T02thread:{self.thread_id(state['c_cpu'])};")
+                        continue
+                    if buf[0] == 0x03:
+                        del buf[0]
+                        continue
+                    if buf[0] in (0x2B, 0x2D):
+                        del buf[0]
+                        continue
+
+                    start = buf.find(b"$")
+                    if start < 0:
+                        buf.clear()
+                        break
+                    end = buf.find(b"#", start)
+                    if end < 0 or len(buf) < end + 3:
+                        del buf[:start]
+                        break
+
+                    payload = bytes(buf[start + 1:end])
+                    del buf[:end + 3]
+                    if not state["no_ack"]:
+                        conn.sendall(b"+")
+
+                    self.packets += 1
+                    state["latency"] = self.packet_latency(payload)
+                    self.handle(conn, state, payload)
+        except OSError:
+            pass
+        finally:
+            conn.close()
+
+    # continue 중인 게스트를 조금씩 실행
+    def run_slice(self, conn, state) -> None:
+        with self.lock:
+            cpu = state["c_cpu"]
+            for _ in range(64):
+                self.guest.step(cpu)
+                if self.guest.cpus[cpu]["rip"] in self.guest.breakpoints:
+                    state["running"] = False
+                    state["g_cpu"] = cpu
+                    self.send(conn, state, f"T05thread:{self.thread_id(cpu)};swbreak:;")
+                    return
+
+    # 스텝이 실행되는 동안 (지금 패킷 뒤, step_time 안에) ack 가 아닌 바이트가 도착하는지
+    def more_input(self, conn, state) -> bool:
+        if any(b not in (0x2B, 0x2D) for b in state["buf"]):
+            return True
+        ready, _, _ = select.select([conn], [], [], self.step_time)
+        if not ready:
+            return False
+        return any(b not in (0x2B, 0x2D) for b in conn.recv(4096, socket.MSG_PEEK))
+
+    def send(self, conn, state, payload) -> None:
+        if isinstance(payload, str):
+            payload = payload.encode("latin-1")
+        latency = state.get("latency", self.latency)
+        if latency:
+            delay = latency
+            if self.rtt:
+                delay = state["arrived"] + latency - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        conn.sendall(b"$" + payload + b"#" + f"{sum(payload) & 0xFF:02x}".encode())
+
+    def packet_latency(self, payload: bytes) -> float:
+        for prefix, latency in self.latencies:
+            if payload.startswith(prefix.encode("latin-1")):
+                return latency
+        return self.latency
+
+    # RSP 패킷 처리
+    def handle(self, conn, state, payload: bytes) -> None:
+        pkt = payload.decode("latin-1")
+        guest = self.guest
+
+        with self.lock:
+            if pkt.startswith("qSupported"):
+                reply = "PacketSize=4000;qXfer:features:read+;QStartNoAckMode+"
+            elif pkt == "QStartNoAckMode":
+                self.send(conn, state, "OK")
+                state["no_ack"] = True
+                return
+            elif pkt.startswith("qXfer:features:read:"):
+                reply = self.xfer_features(pkt)
+            elif pkt == "?":
+                reply = f"T05thread:{self.thread_id(state['c_cpu'])};"
+            elif pkt == "g":
+                reply = guest.reg_packet(state["g_cpu"])
+            elif pkt.startswith("G"):
+                guest.set_reg_bytes(bytes.fromhex(pkt[1:]), state["g_cpu"])
+                reply = "OK"
+            elif pkt.startswith("p"):
+                reply = self.read_one_reg(int(pkt[1:], 16), state["g_cpu"])
+            elif pkt.startswith("m"):
+                addr, size = (int(x, 16) for x in pkt[1:].split(","))
+                data = guest.read_virt(addr, size)
+                reply = "E14" if data is None else data.hex()
+            elif pkt.startswith("M"):
+                head, data = pkt[1:].split(":", 1)
+                addr = int(head.split(",")[0], 16)
+                reply = "OK" if guest.write_virt(addr, bytes.fromhex(data)) else "E14"
+            elif pkt.startswith("X"):
+                head, _, _ = payload[1:].partition(b":")
+                addr, size = (int(x, 16) for x in head.decode().split(","))
+                data = self.unescape(payload[payload.index(b":") + 1:])[:size]
+                reply = "OK" if guest.write_virt(addr, data) else "E14"
+            elif pkt == "s" or pkt.startswith("s") or pkt.startswith("vCont;s:"):
+                # 정지하면 QEMU 처럼 g/c 대상이 멈춘 vCPU 로 바뀜
+                cpu = self.cpu_index(pkt[8:]) if pkt.startswith("vCont;s:") else state["c_cpu"]
+                if cpu is None:
+                    reply = "E22"
+                elif self.more_input(conn, state):
+                    # 스텝이 끝나기 전에 다음 바이트가 도착 -> 실행 중에 받은 것 (버려지고 스텝 대신 T02 로 멈춤)
+                    state["c_cpu"] = cpu
+                    state["running"] = True
+                    return
+                else:
+                    guest.step(cpu)
+                    state["g_cpu"] = state["c_cpu"] = cpu
+                    reply = f"T05thread:{self.thread_id(cpu)};"
+            elif pkt == "vCont?":
+                reply = "vCont;c;C;s;S"
+            elif pkt == "c" or pkt.startswith("c"):
+                state["running"] = True
+                return
+            elif pkt.startswith("Z0,") or pkt.startswith("Z1,"):
+                guest.breakpoints.add(int(pkt.split(",")[1], 16))
+                reply = "OK"
+            elif pkt.startswith("z0,") or pkt.startswith("z1,"):
+                guest.breakpoints.discard(int(pkt.split(",")[1], 16))
+                reply = "OK"
+            elif pkt.startswith("qRcmd,"):
+                out = guest.monitor(bytes.fromhex(pkt[6:]).decode("utf-8", "replace"))
+                if out:
+                    self.send(conn, state, "O" + out.encode("utf-8").hex())
+                reply = "OK"
+            elif pkt.startswith("Hg") or pkt.startswith("Hc"):
+                cpu = self.cpu_index(pkt[2:])
+                if cpu is None:
+                    reply = "E22"
+                else:
+                    state["g_cpu" if pkt[1] == "g" else "c_cpu"] = cpu
+                    reply = "OK"
+            elif pkt.startswith("H"):
+                reply = "OK"
+            elif pkt.startswith("T"):
+                reply = "OK" if self.cpu_index(pkt[1:]) is not None else "E22"
+            elif pkt == "qC":
+                reply = f"QC{self.thread_id(state['g_cpu'])}"
+            elif pkt == "qAttached":
+                reply = "1"
+            elif pkt == "qfThreadInfo":
+                reply = "m" + ",".join(self.thread_id(i) for i in range(len(guest.cpus)))
+            elif pkt == "qsThreadInfo":
+                reply = "l"
+            elif pkt.startswith("qThreadExtraInfo,"):
+                cpu = self.cpu_index(pkt[17:])
+                reply = "E22" if cpu is None else f"CPU#{cpu} [halted ]".encode().hex()
+            elif pkt in ("D", "k"):
+                self.send(conn, state, "OK")
+                state["open"] = False
+                return
+            else:
+                reply = ""
+
+        self.send(conn, state, reply)
+
+    def read_one_reg(self, regnum: int, cpu: int = 0) -> str:
+        if regnum >= len(DEFAULT_REG_LAYOUT):
+            return "E45"
+        name, size = DEFAULT_REG_LAYOUT[regnum]
+        return self.guest.reg_hex(name, size, cpu)
+
+    # thread id <-> vCPU 번호 (QEMU 처럼 cpu 번호 + 1, "0" / "-1" 은 첫 vCPU)
+    def thread_id(self, cpu: int) -> str:
+        return f"{cpu + 1:02x}"
+
+    def cpu_index(self, tid: str):
+        tid = tid.rpartition(".")[2]
+        if tid in ("0", "-1"):
+            return 0
+        try:
+            cpu = int(tid, 16) - 1
+        except ValueError:
+            return None
+        return cpu if 0 <= cpu < len(self.guest.cpus) else None
+
+    # target.xml (레지스터 목록을 한 파일에 모두 포함)
+    def xfer_features(self, pkt: str) -> str:
+        annex, _, span = pkt[len("qXfer:features:read:"):].rpartition(":")
+        if annex != "target.xml":
+            return "E00"
+
+        regs = "".join(
+            f'<reg name="{name}" bitsize="{size * 8}" regnum="{i}"/>'
+            for i, (name, size) in enumerate(DEFAULT_REG_LAYOUT)
+        )
+        xml = (
+            '<?xml version="1.0"?><!DOCTYPE target SYSTEM "gdb-target.dtd">'
+            '<target><architecture>i386:x86-64</architecture>'
+            f'<feature name="org.gnu.gdb.i386.core">{regs}</feature></target>'
+        )
+
+        offset, length = (int(x, 16) for x in span.split(","))
+        chunk = xml[offset:offset + length]
+        prefix = "l" if offset + length >= len(xml) else "m"
+        return prefix + self.escape(chunk.encode()).decode("latin-1")
+
+    def escape(self, data: bytes) -> bytes:
+        out = bytearray()
+        for b in data:
+            if b in (0x23, 0x24, 0x7D, 0x2A):
+                out += bytes((0x7D, b ^ 0x20))
+            else:
+                out.append(b)
+        return bytes(out)
+
+    def unescape(self, data: bytes) -> bytes:
+        out = bytearray()
+        it = iter(data)
+        for b in it:
+            out.append(next(it) ^ 0x20 if b == 0x7D else b)
+        return bytes(out)
+
+class FakeQMPServer:
+    # FakeGuest를 QMP(UNIX 소켓, 줄 단위 JSON)로 노출 (QEMU -qmp unix:...,server=on,wait=off 대용)
+    #   human-monitor-command 는 FakeGuest.monitor 로, pmemsave / query-cpus-fast / query-status 지원
+    def __init__(self, guest: FakeGuest = None, path: str = None, latency: float = 0.0, cpus: int = 1) -> None:
+        self.guest = guest if guest is not None else build_demo_guest()
+        self.path = path
+        self.latency = latency
+        self.cpus = cpus
+        self.listener = None
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.conns = []
+        self.commands = 0
+        self.tmpdir = None
+
+    def start(self) -> "FakeQMPServer":
+        if self.path is None:
+            self.tmpdir = tempfile.mkdtemp(prefix="qvhd-qmp-")
+            self.path = os.path.join(self.tmpdir, "qmp.sock")
+
+        self.listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.listener.bind(self.path)
+        self.listener.listen(4)
+
+        self.thread = threading.Thread(target=self.serve, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.stop_event.set()
+        try:
+            self.listener.close()
+        except Exception:
+            pass
+        for conn in list(self.conns):
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+        try:
+            os.remove(self.path)
+            if self.tmpdir is not None:
+                os.rmdir(self.tmpdir)
+        except OSError:
+            pass
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def serve(self) -> None:
+        while not self.stop_event.is_set():
+            try:
+                ready, _, _ = select.select([self.listener], [], [], 0.1)
+                if not ready:
+                    continue
+                conn, _ = self.listener.accept()
+            except OSError:
+                return
+
+            self.conns.append(conn)
+            threading.Thread(target=self.serve_conn, args=(conn,), daemon=True).start()
+
+    # 비동기 이벤트 보내기 (STOP / RESUME ...)
+    def emit_event(self, name: str, data: dict = None) -> None:
+        now = time.time()
+        msg = {"event": name, "timestamp": {"seconds": int(now), "microseconds": int(now % 1 * 1e6)}}
+        if data is not None:
+            msg["data"] = data
+        for conn in list(self.conns):
+            try:
+                conn.sendall(json.dumps(msg).encode() + b"\n")
+            except OSError:
+                pass
+
+    def serve_conn(self, conn: socket.socket) -> None:
+        greeting = {"QMP": {"version": {"qemu": {"major": 8, "minor": 2, "micro": 0}, "package": ""},
+                            "capabilities": ["oob"]}}
+        negotiated = False
+        try:
+            conn.sendall(json.dumps(greeting).encode() + b"\n")
+            for line in conn.makefile("rb"):
+                try:
+                    msg = json.loads(line)
+                    cmd = msg["execute"]
+                except (ValueError, KeyError, TypeError):
+                    reply = {"error": {"class": "GenericError", "desc": "JSON parse error"}}
+                else:
+                    self.commands += 1
+                    if cmd == "qmp_capabilities":
+                        negotiated = True
+                        reply = {"return": {}}
+                    elif not negotiated:
+                        reply = {"error": {"class": "CommandNotFound",
+                                           "desc": "Expecting capabilities negotiation with 'qmp_capabilities'"}}
+                    else:
+                        reply = self.handle(cmd, msg.get("arguments") or {})
+                    if "id" in msg:
+                        reply["id"] = msg["id"]
+
+                if self.latency:
+                    time.sleep(self.latency)
+                conn.sendall(json.dumps(reply).encode() + b"\n")
+        except OSError:
+            pass
+        finally:
+            if conn in self.conns:
+                self.conns.remove(conn)
+            conn.close()
+
+    # QMP 명령 처리 -> {"return": ...} / {"error": ...}
+    def handle(self, cmd: str, args: dict) -> dict:
+        guest = self.guest
+        if cmd == "human-monitor-command":
+            return {"return": guest.monitor(args.get("command-line", ""))}
+        if cmd == "pmemsave":
+            addr, size = args["val"], args["size"]
+            if addr + size > len(guest.ram):
+                return {"error": {"class": "GenericError", "desc": "Invalid parameter 'val'"}}
+            try:
+                with open(args["filename"], "wb") as f:
+                    f.write(guest.ram[addr:addr + size])
+            except OSError as e:
+                return {"error": {"class": "GenericError", "desc": f"could not open '{args['filename']}': {e}"}}
+            return {"return": {}}
+        if cmd == "query-cpus-fast":
+            return {"return": [
+                {"cpu-index": i, "qom-path": f"/machine/unattached/device[{i}]", "thread-id": 1000 + i,
+                 "props": {"core-id": 0, "thread-id": 0, "socket-id": i}, "target": "x86_64"}
+                for i in range(self.cpus)
+            ]}
+        if cmd == "query-status":
+            return {"return": {"running": False, "singlestep": False, "status": "debug"}}
+        return {"error": {"class": "CommandNotFound", "desc": f"The command {cmd} has not been found"}}
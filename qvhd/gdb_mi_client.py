@@ -1,18 +1,18 @@
 import subprocess
 import signal
+import threading
+import itertools
 import time
 import re
-import ast
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
 
-REG_ORDER = [
-    "rax", "rbx", "rcx", "rdx",
-    "rsi", "rdi", "rbp", "rsp",
-    "r8", "r9", "r10", "r11", "r12", "r13", "r14", "r15",
-    "rip", "eflags",
-    "cs", "ss", "ds", "es", "fs", "gs",
-]
+from cmd_stats import monitor_class
+from memory import MEM_CHUNK, PAGE_SIZE, MemoryDump, split_chunks
+from mi_parser import MIParseError, MIRecord, parse_record
+from page_walk import ENTRIES_PER_TABLE, PageWalkMixin
+from regfile import STATE_REGS, RegisterFile
 
-class GdbMIClient:
+class GdbMIClient(PageWalkMixin):
     # GDB/MI 클라이언트 초기화
     def __init__(self, target="localhost:1234", gdb_path="gdb", timeout=5.0):
         self.target = target
@@ -23,6 +23,39 @@ class GdbMIClient:
         self.name2num = {}
         self.num2name = {}
 
+        # 큰 메모리 읽기 chunk 크기
+        self.mem_chunk = MEM_CHUNK
+
+        # 마지막으로 읽은 STATE_REGS 값 {번호: 값 문자열} (바뀐 레지스터만 다시 읽음)
+        self.reg_values = {}
+
+        # MI transport
+        self.reader = None
+        self.tokens = itertools.count(1)
+        self.pending = {}
+        self.pending_lock = threading.Lock()
+        self.write_lock = threading.Lock()
+        self.subscribers = []
+
+        # *running / *stopped 로 추적하는 실행 상태 (stops: 지금까지 받은 *stopped 수)
+        self.running = False
+        self.stops = 0
+        self.last_stop = None
+        # end-stepping-range 가 아닌 정지 횟수 (breakpoint, signal 등으로 스텝이 일찍 끝난 경우)
+        self.other_stops = 0
+        self.stop_cond = threading.Condition()
+
+        # True면 gdb 가 대상 연결을 잃음 (=thread-group-exited)
+        self.target_lost = False
+
+        # 고른 vCPU thread id (None이면 gdb 기본 - 마지막으로 멈춘 thread)
+        self.thread = None
+        # -thread-info 의 current-thread-id (아직 *stopped 를 못 받았을 때 지금 vCPU)
+        self.gdb_thread = None
+
+        # 명령별 지연 / 바이트 / 파싱 시간 (CommandStats, None 이면 계측 안 함)
+        self.stats = None
+
     # GDB/MI 클라이언트 연결
     def connect(self):
         if self.proc is not None and self.proc.poll() is None:
@@ -37,18 +70,37 @@ class GdbMIClient:
             bufsize=1,
         )
 
-        # 기본 설정
-        self.mi_cmd("-gdb-set pagination off")
-        self.mi_cmd("-gdb-set confirm off")
-        self.mi_cmd(f'-interpreter-exec console "target remote {self.target}"', timeout=10.0)
-
-        self.init_register_map()
+        # gdb stdout은 reader thread가 전담
+        self.target_lost = False
+        self.reader = threading.Thread(target=self.reader_loop, args=(self.proc,), daemon=True)
+        self.reader.start()
+
+        # 대상에 붙지 못하면 gdb 도 정리 (alive() 가 False 가 되어 다시 연결할 수 있게)
+        try:
+            # 기본 설정
+            self.mi_pipeline([
+                "-gdb-set pagination off",
+                "-gdb-set confirm off",
+            ])
+            self.mi_cmd(f'-interpreter-exec console "target remote {self.target}"', timeout=10.0)
+
+            self.thread = None
+            self.running = False
+            self.init_register_map()
+        except Exception:
+            self.close()
+            raise
+
+    # gdb 프로세스가 살아 있고 대상(QEMU)에 붙어 있는지
+    def alive(self) -> bool:
+        return self.proc is not None and self.proc.poll() is None and not self.target_lost
 
     def close(self):
         if self.proc is not None and self.proc.poll() is None:
             try:
-                self.proc.stdin.write("quit\n")
-                self.proc.stdin.flush()
+                with self.write_lock:
+                    self.proc.stdin.write("quit\n")
+                    self.proc.stdin.flush()
             except Exception:
                 pass
 
@@ -59,146 +111,439 @@ class GdbMIClient:
 
             if self.proc.poll() is None:
                 self.proc.terminate()
+                try:
+                    self.proc.wait(timeout=1.0)
+                except Exception:
+                    pass
+
+        if self.reader is not None:
+            self.reader.join(timeout=0.5)
+            self.reader = None
 
+    # ^running 다음 *stopped 까지 기다려야 실행 상태가 확정됨
     def stepi(self):
-        self.mi_cmd("-exec-step-instruction")
+        stops = self.stops
+        self.mi_cmd(self.thread_cmd("-exec-step-instruction"))
+        if not self.wait_stopped(stops):
+            raise RuntimeError("stepi: target did not stop")
 
+    # *running 레코드보다 먼저 돌아올 수 있으므로 ^running 을 받으면 바로 running 으로 봄
     def cont(self):
+        stops = self.stops
         self.mi_cmd("-exec-continue")
+        with self.stop_cond:
+            if self.stops == stops:
+                self.running = True
 
     def interrupt(self):
         if self.proc is None or self.proc.poll() is not None:
             raise RuntimeError("gdb is not running")
         self.proc.send_signal(signal.SIGINT)
 
-    # GDB/MI 명령어 송수신
-    def mi_cmd(self, cmd, timeout=None):
+    # n <count>: gdb 안에서 "stepi N" (chunk 단위, MI 왕복은 chunk 당 1회)
+    #   progress(done): chunk 마다 호출 / cancel(): True면 거기서 멈춤 -> 실행한 스텝 수
+    #   breakpoint 나 signal 로 "stepi N" 이 일찍 끝나면 거기서 멈춤
+    #   (그 chunk 에서 몇 스텝을 돌았는지 gdb 가 알려주지 않으므로 세지 않음)
+    def step_many(self, count: int, chunk: int = 1000, cancel=None, progress=None) -> int:
+        done = 0
+        while done < count:
+            if cancel is not None and cancel():
+                break
+
+            n = min(chunk, count - done)
+            stops = self.stops
+            timeout = self.timeout + n * 0.01
+            self.mi_cmd(self.thread_cmd(f'-interpreter-exec console "stepi {n}"'), timeout=timeout)
+            if not self.wait_stopped(stops, timeout):
+                raise RuntimeError(f"stepi {n}: target did not stop")
+            if self.last_stop.get("reason") != "end-stepping-range":
+                break
+
+            done += n
+            if progress is not None:
+                progress(done)
+        return done
+
+    # trace: 스텝마다 STATE_REGS 를 record(RegisterFile) 로 넘김 (stepi + 값 읽기를 window 쌍씩 pipeline)
+    #   window 안에서 breakpoint 나 signal 로 멈췄으면 그 window 까지만 (이미 보낸 stepi 는 모두 실행됨)
+    def step_record(self, count: int, record, window: int = 32, cancel=None, progress=None) -> int:
+        values_cmd = self.register_values_cmd(self.state_reg_nums())
+        done = 0
+        while done < count:
+            if cancel is not None and cancel():
+                break
+
+            n = min(window, count - done)
+            other_stops = self.other_stops
+            replies = self.mi_pipeline([self.thread_cmd("-exec-step-instruction"), values_cmd] * n)
+            for reply in replies[1::2]:
+                self.reg_values = self.parse_register_values(reply[0])
+                record(self.regs_from_values(self.reg_values))
+
+            done += n
+            if self.other_stops != other_stops:
+                break
+            if progress is not None:
+                progress(done)
+        return done
+
+    # until <reg> changes: 스텝마다 레지스터 하나만 (stepi + 값 읽기를 pipeline)
+    #   -> (스텝 수, 이전 값, 바뀐 값 또는 None) / 값을 못 읽으면 RuntimeError
+    def step_until_change(self, name: str, max_steps: int, cancel=None, progress=None):
+        num = self.name2num.get(name)
+        if num is None:
+            raise RuntimeError(f"unknown register: {name!r}")
+
+        def value(reply):
+            try:
+                return int(self.parse_register_values(reply[0])[num], 0)
+            except (KeyError, TypeError, ValueError):
+                raise RuntimeError(f"cannot read register {name!r}") from None
+
+        old = value(self.mi_cmd(self.register_values_cmd([num])))
+        for steps in range(1, max_steps + 1):
+            if cancel is not None and cancel():
+                return steps - 1, old, None
+
+            _, reply = self.mi_pipeline([self.thread_cmd("-exec-step-instruction"), self.register_values_cmd([num])])
+            val = value(reply)
+
+            if val != old:
+                return steps, old, val
+            if progress is not None and steps % 256 == 0:
+                progress(steps)
+        return max_steps, old, None
+
+    # until rip==<addr>: 임시 하드웨어(안 되면 소프트웨어) breakpoint + continue (도달 여부는 호출한 쪽이 RIP로 확인)
+    def run_until(self, addr: int, cancel=None) -> None:
+        number = None
+        for flags in ("-t -h", "-t"):
+            reply = self.mi_pipeline([f"-break-insert {flags} *0x{addr:x}"], raise_errors=False)[0]
+            if not isinstance(reply, Exception):
+                number = (reply[0].get("bkpt") or {}).get("number")
+                break
+        else:
+            raise reply
+
+        stops = self.stops
+        self.cont()
+        try:
+            while not self.wait_stopped(stops, 0.1):
+                if cancel is not None and cancel():
+                    self.interrupt()
+                    if not self.wait_stopped(stops):
+                        raise RuntimeError("until: target did not stop")
+                    break
+        finally:
+            # 도달하면 임시 breakpoint 는 gdb 가 지움
+            if number is not None and self.last_stop is not None and self.last_stop.get("reason") != "breakpoint-hit":
+                self.mi_pipeline([f"-break-delete {number}"], raise_errors=False)
+
+    # exec async 레코드로 실행 상태 갱신 (reader thread)
+    def track_exec(self, record):
+        with self.stop_cond:
+            if record.cls == "running":
+                self.running = True
+            elif record.cls == "stopped":
+                self.running = False
+                self.stops += 1
+                self.last_stop = record
+                if record.get("reason") != "end-stepping-range":
+                    self.other_stops += 1
+                self.stop_cond.notify_all()
+
+    # since 번째 이후의 *stopped 대기
+    def wait_stopped(self, since: int, timeout=None) -> bool:
         if timeout is None:
             timeout = self.timeout
-        if self.proc is None or self.proc.poll() is not None:
-            raise RuntimeError("gdb is not running")
+        with self.stop_cond:
+            return self.stop_cond.wait_for(lambda: self.stops > since, timeout=timeout)
+
+    # (정지 횟수, 마지막 정지 이유) - 실행 중 정지 감지용 (MI는 reader thread가 이미 갱신)
+    def poll_stop(self):
+        return self.stops, self.stop_reason()
+
+    def stop_reason(self):
+        record = self.last_stop
+        if record is None:
+            return None
+
+        reason = record.get("reason") or "stopped"
+        signal_name = record.get("signal-name")
+        if signal_name:
+            reason = f"{reason} {signal_name}"
+        frame = record.get("frame")
+        if isinstance(frame, dict) and frame.get("addr"):
+            reason = f"{reason} @ {frame['addr']}"
+        return reason
+
+    # peek: 잠깐 멈추고 RIP/CR3만 읽은 뒤 다시 실행 -> (rip, cr3)
+    #   이미 멈춰 있거나 SIGINT 가 아닌 이유로 멈췄으면(breakpoint 등) 재개하지 않고 None
+    def peek(self, timeout=None):
+        if not self.running:
+            return None
+
+        stops = self.stops
+        self.interrupt()
+        if not self.wait_stopped(stops, timeout):
+            raise RuntimeError("peek: target did not stop")
+        if self.stops != stops + 1 or self.last_stop.get("signal-name") != "SIGINT":
+            return None
+
+        nums = [self.name2num.get("rip"), self.name2num.get("cr3")]
+        values_reply, _ = self.mi_pipeline([
+            self.register_values_cmd([n for n in nums if n is not None]),
+            "-exec-continue",
+        ])
+        values = self.parse_register_values(values_reply[0])
+
+        sample = []
+        for num in nums:
+            try:
+                sample.append(int(values[num], 0))
+            except (KeyError, TypeError, ValueError):
+                sample.append(None)
+        return tuple(sample)
 
-        full = cmd.strip()
-        self.proc.stdin.write(full + "\n")
-        self.proc.stdin.flush()
+    # async(*, =, +) / stream(~, @, &) 레코드 구독
+    def subscribe(self, callback):
+        self.subscribers.append(callback)
 
-        deadline = time.time() + timeout
-        lines = []
-        result = None
+    def unsubscribe(self, callback):
+        if callback in self.subscribers:
+            self.subscribers.remove(callback)
 
-        while True:
-            if time.time() > deadline:
-                raise RuntimeError(f"MI timeout for '{cmd}'")
+    def publish(self, record):
+        for callback in list(self.subscribers):
+            try:
+                callback(record)
+            except Exception:
+                pass
 
-            line = self.proc.stdout.readline()
-            if not line:
-                raise RuntimeError("gdb exited")
+    # gdb stdout 수신 루프 (token 기준으로 결과 레코드를 각 Future에 전달)
+    #   stats 가 켜져 있으면 결과 레코드와 그 앞 stream 레코드의 바이트 수 / 파싱 시간을 그 명령에 더함
+    def reader_loop(self, proc):
+        streams = []
+        nbytes, parse = 0, 0.0
 
-            line = line.rstrip()
-            if not line:
+        for raw in proc.stdout:
+            line = raw.rstrip()
+            if not line or line == "(gdb)":
                 continue
 
-            lines.append(line)
+            stats = self.stats
+            if stats is not None:
+                t0 = time.perf_counter()
+            try:
+                record = parse_record(line)
+            except MIParseError:
+                record = MIRecord(None, "raw", text=line)
+            kind = record.kind
+
+            if kind == "result":
+                if stats is not None:
+                    stats.end(record.token, nbytes + len(raw), parse + time.perf_counter() - t0,
+                              record.cls == "error")
+                    nbytes, parse = 0, 0.0
+
+                # 결과 레코드 앞의 stream 레코드는 같은 명령어의 출력
+                with self.pending_lock:
+                    fut = self.pending.pop(record.token, None)
+                if fut is not None and not fut.done():
+                    fut.set_result((record, streams))
+                streams = []
+
+            elif kind in ("exec", "status", "notify"):
+                if kind == "exec":
+                    self.track_exec(record)
+                elif record.cls == "thread-group-exited":
+                    # QEMU 쪽 연결이 끊김 (gdb 는 살아 있어도 대상이 없음)
+                    self.target_lost = True
+                self.publish(record)
+
+            else:
+                if stats is not None:
+                    nbytes += len(raw)
+                    parse += time.perf_counter() - t0
+                streams.append(record)
+                if kind in ("console", "target", "log"):
+                    self.publish(record)
+
+        # gdb 종료: 대기 중인 명령어 모두 실패 처리
+        with self.pending_lock:
+            pending = list(self.pending.values())
+            self.pending.clear()
+        for fut in pending:
+            if not fut.done():
+                fut.set_exception(RuntimeError("gdb exited"))
+        self.publish(MIRecord(None, "exit"))
+
+    # GDB/MI 명령어 송신 (token 부여, 응답은 Future로 전달)
+    def mi_send(self, cmd) -> Future:
+        if self.proc is None or self.proc.poll() is not None:
+            raise RuntimeError("gdb is not running")
 
-            if line.startswith("^done") or line.startswith("^running") or line.startswith("^error"):
-                result = line
-                break
+        fut = Future()
+        with self.write_lock:
+            token = next(self.tokens)
+            with self.pending_lock:
+                self.pending[token] = fut
+            stats = self.stats
+            if stats is not None:
+                stats.begin(token, cmd)
+            try:
+                self.proc.stdin.write(f"{token}{cmd.strip()}\n")
+                self.proc.stdin.flush()
+            except (BrokenPipeError, OSError):
+                with self.pending_lock:
+                    self.pending.pop(token, None)
+                raise RuntimeError("gdb exited")
+        return fut
 
-        if result.startswith("^error"):
-            raise RuntimeError(f"MI error for '{cmd}': {result}")
-        return result, lines
+    # GDB/MI 응답 대기 -> (결과 레코드, 앞선 stream 레코드 목록)
+    def mi_wait(self, fut, cmd, timeout=None):
+        if timeout is None:
+            timeout = self.timeout
 
-    # QEMU Monitor 명령어 송수신
-    def monitor_cmd(self, cmd, timeout=None):
+        try:
+            result, streams = fut.result(timeout=max(0.0, timeout))
+        except FutureTimeoutError:
+            raise RuntimeError(f"MI timeout for '{cmd}'") from None
+
+        if result.cls == "error":
+            raise RuntimeError(f"MI error for '{cmd}': {result.get('msg', '')}")
+        return result, streams
+
+    # GDB/MI 명령어 송수신
+    def mi_cmd(self, cmd, timeout=None):
+        return self.mi_wait(self.mi_send(cmd), cmd, timeout=timeout)
+
+    # 여러 명령어를 한 번에 보내고 응답을 모아 받음 (왕복 지연 1회)
+    def mi_pipeline(self, cmds, timeout=None, raise_errors=True):
         if timeout is None:
             timeout = self.timeout
 
-        mi = f'-interpreter-exec console "monitor {cmd}"'
-        result, lines = self.mi_cmd(mi, timeout=timeout)
-        console_text = self.extract_console_text(lines)
+        futs = [self.mi_send(cmd) for cmd in cmds]
+        deadline = time.monotonic() + timeout
 
-        return console_text
+        replies = []
+        for cmd, fut in zip(cmds, futs):
+            try:
+                replies.append(self.mi_wait(fut, cmd, timeout=deadline - time.monotonic()))
+            except RuntimeError as e:
+                if raise_errors:
+                    raise
+                replies.append(e)
+        return replies
+
+    # QEMU Monitor 명령어 송수신 (QMP 소켓이 있으면 그쪽으로)
+    def monitor_cmd(self, cmd, timeout=None):
+        if timeout is None:
+            timeout = self.timeout
+        if self.qmp is not None:
+            stats = self.stats
+            if stats is None:
+                return self.qmp.hmp(cmd, timeout=timeout)
+            t0 = time.perf_counter()
+            text = self.qmp.hmp(cmd, timeout=timeout)
+            stats.add(monitor_class(cmd), f"qmp {cmd}", time.perf_counter() - t0, len(cmd), len(text))
+            return text
+
+        result, streams = self.mi_cmd(self.monitor_mi(cmd), timeout=timeout)
+        return self.extract_console_text(streams)
+
+    def monitor_mi(self, cmd) -> str:
+        escaped = cmd.replace("\\", "\\\\").replace('"', '\\"')
+        return f'-interpreter-exec console "monitor {escaped}"'
 
     # 명령어 응답 텍스트 추출
-    def extract_console_text(self, lines):
-        out_parts = []
-        for line in lines:
-            if len(line) >= 3 and line[0] in ("~", "@") and line[1] == '"':
-                s = line[2:]
-                if s.endswith('"'):
-                    s = s[:-1]
-                try:
-                    s = bytes(s, "utf-8").decode("unicode_escape")
-                except Exception:
-                    pass
-                out_parts.append(s)
-        return "".join(out_parts)
+    def extract_console_text(self, streams):
+        return "".join(
+            r.text for r in streams
+            if r.kind in ("console", "target") and r.text is not None
+        )
 
     # Registers 매핑
     def init_register_map(self):
-        result, lines = self.mi_cmd("-data-list-register-names")
-        text = "\n".join(lines)
+        result, streams = self.mi_cmd("-data-list-register-names")
 
-        m = re.search(r"register-names=\[(.*)\]", text, re.S)
-        if not m:
+        names = result.get("register-names")
+        if not isinstance(names, list):
             raise RuntimeError("failed to parse register names from MI")
-        inner = m.group(1).strip()
 
-        names = ast.literal_eval("[" + inner + "]")
         self.num2name = {i: n for i, n in enumerate(names) if n}
         self.name2num = {n: i for i, n in self.num2name.items()}
+        self.reg_values = {}
 
-    # Registers 읽기
+    # Registers 읽기 (REG_ORDER + 제어 레지스터)
     def read_registers(self):
-        result, lines = self.mi_cmd("-data-list-register-values x")
-        text = "\n".join(lines)
-
-        entries = re.findall(r'number="(\d+)",value="([^"]*)"', text)
-        by_num = {int(num): val for num, val in entries}
+        return self.read_state()[0]
+
+    # STATE_REGS 의 gdb 레지스터 번호
+    def state_reg_nums(self) -> list:
+        return [self.name2num[name] for name in STATE_REGS if name in self.name2num]
+
+    def register_values_cmd(self, nums, thread=None) -> str:
+        cmd = "-data-list-register-values x " + " ".join(str(n) for n in nums)
+        return self.thread_cmd(cmd, thread)
+
+    # MI 명령에 --thread 붙이기 (thread 가 없으면 고른 vCPU, 그것도 없으면 그대로)
+    #   gdb 는 정지할 때 멈춘 thread 로 바꾸므로 -thread-select 한 번으로는 고른 vCPU 가 유지되지 않음
+    def thread_cmd(self, cmd: str, thread=None) -> str:
+        if thread is None:
+            thread = self.thread
+        if thread is None:
+            return cmd
+        name, _, rest = cmd.partition(" ")
+        return f"{name} --thread {thread} {rest}".rstrip()
+
+    # -data-list-register-values 응답 -> {번호: 값 문자열}
+    def parse_register_values(self, result):
+        by_num = {}
+        for entry in result.get("register-values", ()):
+            try:
+                by_num[int(entry["number"])] = entry["value"]
+            except (KeyError, TypeError, ValueError):
+                continue
+        return by_num
 
-        regs = {}
-        for name in REG_ORDER:
-            num = self.name2num.get(name)
-            if num is None:
-                regs[name] = "N/A"
-            else:
-                regs[name] = by_num.get(num, "N/A")
-        return regs
+    # {번호: 값 문자열} -> RegisterFile
+    def regs_from_values(self, by_num) -> RegisterFile:
+        ints = {}
+        for name in STATE_REGS:
+            try:
+                ints[name] = int(by_num[self.name2num[name]], 0)
+            except (KeyError, TypeError, ValueError):
+                continue
+        return RegisterFile.from_ints(ints)
 
     # CR3 읽기
     def read_cr3(self) -> int:
         # GDB 레지스터에서 직접 읽기
         if "cr3" in self.name2num:
             num = self.name2num["cr3"]
-            result, lines = self.mi_cmd(f"-data-list-register-values x {num}")
-            text = "\n".join(lines)
+            result, streams = self.mi_cmd(f"-data-list-register-values x {num}")
 
-            m = re.search(r'value="([^"]+)"', text)
-            if m:
-                val_str = m.group(1)
-                try:
-                    return int(val_str, 0)
-                except ValueError:
-                    pass
+            cr3 = self.parse_cr3_value(result)
+            if cr3 is not None:
+                return cr3
 
-        # QEMU Monitor에서 info cr3 사용
-        result, lines = self.mi_cmd(
-            '-interpreter-exec console "monitor info cr3"',
-            timeout=10.0,
-        )
+        return self.read_cr3_monitor()
 
-        console_chunks = []
-        for ln in lines:
-            if ln.startswith('~"') and ln.endswith('"'):
-                s = ln[2:-1]
-                console_chunks.append(s)
+    def parse_cr3_value(self, result):
+        for val_str in self.parse_register_values(result).values():
+            try:
+                return int(val_str, 0)
+            except ValueError:
+                pass
+        return None
 
-        out = "\n".join(console_chunks).strip()
+    def read_cr3_monitor(self) -> int:
+        # QEMU Monitor에서 info registers 사용
+        out = self.monitor_cmd("info registers", timeout=10.0).strip()
 
         if not out:
-            raise RuntimeError(
-                f"failed to parse CR3 from monitor output: {lines!r}"
-            )
+            raise RuntimeError("failed to parse CR3: empty monitor output")
 
         patterns = [
             r"CR3\s*=\s*(0x[0-9a-fA-F]+)",
@@ -210,165 +555,170 @@ class GdbMIClient:
         for pat in patterns:
             m = re.search(pat, out)
             if m:
-                return int(m.group(1), 0)
+                return int(m.group(1), 16)
 
         raise RuntimeError(f"failed to parse CR3 from: {out!r}")
 
-    # 메모리 읽기
-    def read_phys_qword(self, phys_addr: int) -> int:
-        cmd = f'-interpreter-exec console "monitor xp /1gx {phys_addr:#x}"'
-        result, lines = self.mi_cmd(cmd, timeout=5.0)
+    # Registers + CR3 + 페이지 테이블/엔트리 선읽기를 한 번에 (pipeline)
+    #   - 레지스터는 STATE_REGS 번호만 요청
+    #   - 이전 값이 있으면 -data-list-changed-registers 로 바뀐 것만 다시 요청
+    def read_state(self, prefetch_tables=(), prefetch_qwords=()):
+        # RAM 파일이 있으면 선읽기는 로컬에서 (xp 왕복 없음)
+        local = self.phys is not None
+        prefetch = []
+        if not local:
+            prefetch = [(pa, ENTRIES_PER_TABLE) for pa in prefetch_tables]
+            prefetch += [(pa, 1) for pa in prefetch_qwords]
+
+        # QMP 소켓이 있으면 선읽기는 gdb 명령과 동시에 QMP 로
+        xp_cmds = [f"xp /{count}gx {pa:#x}" for pa, count in prefetch]
+        qmp_futs = [self.qmp.hmp_send(cmd) for cmd in xp_cmds] if self.qmp is not None else None
+
+        nums = self.state_reg_nums()
+        full = not self.reg_values
+
+        cmds = [self.register_values_cmd(nums)] if full else []
+        cmds.append(self.thread_cmd("-data-list-changed-registers"))
+        if qmp_futs is None:
+            cmds += [self.monitor_mi(cmd) for cmd in xp_cmds]
+
+        replies = self.mi_pipeline(cmds, raise_errors=False)
+        if full:
+            values_reply = replies.pop(0)
+            if isinstance(values_reply, Exception):
+                raise values_reply
+            self.reg_values = self.parse_register_values(values_reply[0])
+        changed_reply = replies.pop(0)
+
+        if not full:
+            wanted = nums
+            if not isinstance(changed_reply, Exception):
+                changed = set(changed_reply[0].get("changed-registers", ()))
+                wanted = [n for n in nums if str(n) in changed or n not in self.reg_values]
+            if wanted:
+                result, streams = self.mi_cmd(self.register_values_cmd(wanted))
+                self.reg_values.update(self.parse_register_values(result))
+
+        regs = self.regs_from_values(self.reg_values)
+
+        cr3 = regs.get("cr3")
+        if cr3 is None:
+            cr3 = self.read_cr3_monitor()
+
+        if local:
+            return (regs, cr3) + self.read_prefetch(prefetch_tables, prefetch_qwords)
+
+        if qmp_futs is None:
+            texts = [r if isinstance(r, Exception) else self.extract_console_text(r[1]) for r in replies]
+        else:
+            texts = []
+            for cmd, fut in zip(xp_cmds, qmp_futs):
+                try:
+                    texts.append(self.qmp.wait(fut, cmd))
+                except RuntimeError as e:
+                    texts.append(e)
+
+        # 선읽기 실패는 무시 (워크에서 다시 읽음)
+        tables, qwords = {}, {}
+        for (pa, count), text in zip(prefetch, texts):
+            vals = text if isinstance(text, Exception) else self.try_parse_xp(text, pa, count)
+            if isinstance(vals, Exception):
+                continue
+            if count == 1:
+                qwords[pa] = vals[0]
+            else:
+                tables[pa] = vals
 
-        raw_strs = []
-        for line in lines:
-            if len(line) >= 3 and line[0] in ("~", "@") and line[1] == '"':
-                raw_strs.append(line[2:])
+        return regs, cr3, tables, qwords
 
-        if not raw_strs:
-            raise RuntimeError(
-                f"xp had no console/target output; MI lines = {lines!r}"
-            )
+    # vCPU 목록 (-thread-info) -> [(thread id, 이름), ...]
+    #   QEMU gdbstub 은 vCPU 마다 thread 1개 ("Thread 1.2 (CPU#1 [running])")
+    def list_threads(self) -> list:
+        result, streams = self.mi_cmd("-thread-info")
+        threads = []
+        for entry in result.get("threads", ()):
+            if not isinstance(entry, dict) or "id" not in entry:
+                continue
+            target_id = entry.get("target-id", "")
+            m = re.search(r"CPU#\d+", target_id)
+            threads.append((entry["id"], m.group(0) if m else target_id or f"thread {entry['id']}"))
+        if not threads:
+            raise RuntimeError("-thread-info returned no threads")
+        self.gdb_thread = result.get("current-thread-id")
+        return threads
+
+    # vCPU 고르기 (None이면 gdb 기본으로) - 이후 레지스터 읽기 / 스텝 명령에 --thread 를 붙임
+    #   console 명령(monitor 등)도 따라가도록 -thread-select 도 보냄
+    def select_thread(self, tid) -> None:
+        if tid is not None:
+            self.mi_cmd(f"-thread-select {tid}")
+        if tid != self.thread:
+            # 바뀐 레지스터 추적은 thread 별이 아니므로 처음부터 다시 읽음
+            self.reg_values = {}
+        self.thread = tid
+
+    # 지금 vCPU (고른 것, 없으면 마지막 *stopped 의 thread-id, 그것도 없으면 -thread-info 때 gdb 의 thread)
+    def current_thread(self):
+        if self.thread is not None:
+            return self.thread
+        record = self.last_stop
+        if record is not None and record.get("thread-id"):
+            return record.get("thread-id")
+        return self.gdb_thread
+
+    # 여러 vCPU 의 STATE_REGS (CR3 포함) 를 한 번에: thread 마다 --thread 를 붙인 레지스터 읽기를 pipeline
+    #   -> {thread id: RegisterFile 또는 Exception}
+    def read_thread_states(self, tids) -> dict:
+        tids = list(tids)
+        nums = self.state_reg_nums()
+        replies = self.mi_pipeline([self.register_values_cmd(nums, tid) for tid in tids], raise_errors=False)
+
+        states = {}
+        for tid, reply in zip(tids, replies):
+            if isinstance(reply, Exception):
+                states[tid] = reply
+            else:
+                states[tid] = self.regs_from_values(self.parse_register_values(reply[0]))
+        return states
+
+    # 주소 -> 심볼 이름 ("info symbol" 을 pipeline으로, 심볼이 없는 주소는 빠짐)
+    def symbolize(self, addrs, chunk: int = 256) -> dict:
+        addrs = list(addrs)
+        names = {}
+
+        for i in range(0, len(addrs), chunk):
+            batch = addrs[i:i + chunk]
+            cmds = [f'-interpreter-exec console "info symbol 0x{addr:x}"' for addr in batch]
+
+            for addr, reply in zip(batch, self.mi_pipeline(cmds, raise_errors=False)):
+                if isinstance(reply, Exception):
+                    continue
+                # "start_kernel + 12 in section .text" / "No symbol matches 0x..."
+                m = re.match(r"(\S+)(?: \+ \d+)? in section", self.extract_console_text(reply[1]).strip())
+                if m:
+                    names[addr] = m.group(1)
+        return names
+
+    # xp 여러 개를 pipeline으로 (chunk 단위로 응답 대기) -> 요청마다 qword 목록 또는 Exception
+    def read_xp_many(self, reqs, chunk: int = 64) -> list:
+        reqs = list(reqs)
+        if self.qmp is not None:
+            return super().read_xp_many(reqs)
+        results = []
+
+        for i in range(0, len(reqs), chunk):
+            batch = reqs[i:i + chunk]
+            cmds = [self.monitor_mi(f"xp /{count}gx {pa:#x}") for pa, count in batch]
+            for (pa, count), reply in zip(batch, self.mi_pipeline(cmds, raise_errors=False)):
+                if isinstance(reply, Exception):
+                    results.append(reply)
+                else:
+                    results.append(self.try_parse_xp(self.extract_console_text(reply[1]), pa, count))
+        return results
 
-        decoded = []
-        for s in raw_strs:
-            try:
-                decoded.append(ast.literal_eval(s))
-            except Exception:
-                decoded.append(
-                    s.strip('"').encode("utf-8").decode("unicode_escape")
-                )
-
-        text = "".join(decoded)
-        first_line = text.strip().splitlines()[0]
-
-        m = re.search(r":\s*(0x[0-9a-fA-F]+)", first_line)
-        if not m:
-            raise RuntimeError(f"failed to parse xp line: {first_line!r}")
-
-        return int(m.group(1), 16)
-
-    # x86_64 페이지 오프셋 추출
-    def split_va(self, va: int):
-        pml4_i = (va >> 39) & 0x1FF
-        pdpt_i = (va >> 30) & 0x1FF
-        pd_i   = (va >> 21) & 0x1FF
-        pt_i   = (va >> 12) & 0x1FF
-        offset = va & 0xFFF
-        return pml4_i, pdpt_i, pd_i, pt_i, offset
-
-    # x86_64 페이지 엔트리 플래그 추출
-    def parse_pte_flags(self, entry: int) -> dict:
-        flags = {
-            "present":      bool(entry & (1 << 0)),
-            "writable":     bool(entry & (1 << 1)),
-            "user":         bool(entry & (1 << 2)),
-            "write_through":bool(entry & (1 << 3)),
-            "cache_disable":bool(entry & (1 << 4)),
-            "accessed":     bool(entry & (1 << 5)),
-            "dirty":        bool(entry & (1 << 6)),
-            "page_size":    bool(entry & (1 << 7)),
-            "global":       bool(entry & (1 << 8)),
-            "nx":           bool(entry & (1 << 63)),
-        }
-        return flags
-
-    def inspect_va(self, va: int) -> dict:
-        # CR3
-        cr3 = self.read_cr3()
-        pml4_i, pdpt_i, pd_i, pt_i, offset = self.split_va(va)
-
-        result = {
-            "va": va,
-            "cr3": cr3,
-            "pml4_index": pml4_i,
-            "pdpt_index": pdpt_i,
-            "pd_index": pd_i,
-            "pt_index": pt_i,
-            "offset": offset,
-        }
-
-        # PML4
-        pml4_phys = cr3 & ~0xFFF
-        pml4_entry_addr = pml4_phys + pml4_i * 8
-        pml4_entry = self.read_phys_qword(pml4_entry_addr)
-        result["pml4_entry"] = pml4_entry
-
-        if not (pml4_entry & 1):
-            result["level"] = "pml4"
-            result["present"] = False
-            result["page_size"] = None
-            return result
-
-        # PDPT
-        pdpt_phys = pml4_entry & ~0xFFF
-        pdpt_entry_addr = pdpt_phys + pdpt_i * 8
-        pdpt_entry = self.read_phys_qword(pdpt_entry_addr)
-        result["pdpt_entry"] = pdpt_entry
-
-        if not (pdpt_entry & 1):
-            result["level"] = "pdpt"
-            result["present"] = False
-            result["page_size"] = None
-            return result
-
-        if pdpt_entry & (1 << 7):
-            page_base = pdpt_entry & ~((1 << 30) - 1)
-            phys_addr = page_base + (va & ((1 << 30) - 1))
-            result["level"] = "1G"
-            result["present"] = True
-            result["page_size"] = "1G"
-            result["page_phys"] = page_base
-            result["phys_addr"] = phys_addr
-            result["flags"] = self.parse_pte_flags(pdpt_entry)
-            return result
-
-        # PD
-        pd_phys = pdpt_entry & ~0xFFF
-        pd_entry_addr = pd_phys + pd_i * 8
-        pd_entry = self.read_phys_qword(pd_entry_addr)
-        result["pd_entry"] = pd_entry
-
-        if not (pd_entry & 1):
-            result["level"] = "pd"
-            result["present"] = False
-            result["page_size"] = None
-            return result
-
-        if pd_entry & (1 << 7):
-            page_base = pd_entry & ~((1 << 21) - 1)
-            phys_addr = page_base + (va & ((1 << 21) - 1))
-            result["level"] = "2M"
-            result["present"] = True
-            result["page_size"] = "2M"
-            result["page_phys"] = page_base
-            result["phys_addr"] = phys_addr
-            result["flags"] = self.parse_pte_flags(pd_entry)
-            return result
-
-        # PT
-        pt_phys = pd_entry & ~0xFFF
-        pt_entry_addr = pt_phys + pt_i * 8
-        pt_entry = self.read_phys_qword(pt_entry_addr)
-        result["pt_entry"] = pt_entry
-
-        if not (pt_entry & 1):
-            result["level"] = "pt"
-            result["present"] = False
-            result["page_size"] = None
-            return result
-
-        # 최종 4KB 페이지
-        page_base = pt_entry & ~0xFFF
-        phys_addr = page_base + offset
-
-        result["level"] = "4K"
-        result["present"] = True
-        result["page_size"] = "4K"
-        result["page_phys"] = page_base
-        result["phys_addr"] = phys_addr
-        result["flags"] = self.parse_pte_flags(pt_entry)
-
-        return result
+    # 메모리 읽기
+    def read_phys_qword(self, phys_addr: int) -> int:
+        return self.read_phys_qwords(phys_addr, 1)[0]
 
     # 메모리 덤프
     def read_virt_bytes(self, va: int, size: int = 64) -> bytes:
@@ -376,21 +726,54 @@ class GdbMIClient:
             return b""
 
         cmd = f'-data-read-memory-bytes 0x{va:x} {size}'
-        result, lines = self.mi_cmd(cmd, timeout=5.0)
-        text = "\n".join(lines)
-
-        m = re.search(r'contents="([0-9a-fA-F]*)"', text)
-        if not m:
-            raise RuntimeError(f"failed to parse memory bytes from MI: {text!r}")
-
-        hexstr = m.group(1)
-        hexstr = hexstr[: 2 * size]
-
-        byte_list: list[int] = []
-        for i in range(0, len(hexstr), 2):
-            try:
-                byte_list.append(int(hexstr[i:i+2], 16))
-            except ValueError:
-                break
+        result, streams = self.mi_cmd(cmd, timeout=5.0)
+
+        try:
+            hexstr = result.get("memory")[0]["contents"]
+        except (TypeError, IndexError, KeyError):
+            raise RuntimeError(f"failed to parse memory bytes from MI: {result!r}") from None
+
+        return bytes.fromhex(hexstr[: 2 * size])
+
+    # 큰 구간 읽기: chunk 단위 -data-read-memory-bytes 를 pipeline으로 보내 bytearray에 채움
+    #   실패한 chunk는 page 단위로 다시 읽고, 그래도 실패한 page는 구멍으로 남김
+    #   cancel: 배치 사이마다 호출, True면 RuntimeError("cancelled")
+    def read_virt_dump(self, va: int, size: int, chunk: int = None, inflight: int = 64, cancel=None) -> MemoryDump:
+        dump = MemoryDump(va, size)
+        failed = self.read_virt_chunks(dump, split_chunks(va, size, chunk or self.mem_chunk), inflight, cancel)
+
+        pages = [page for addr, n in failed for page in split_chunks(addr, n, PAGE_SIZE)]
+        if pages:
+            self.read_virt_chunks(dump, pages, inflight, cancel)
+        return dump.finish()
+
+    def read_virt_chunks(self, dump: MemoryDump, chunks: list, inflight: int, cancel=None) -> list:
+        failed = []
+        for i in range(0, len(chunks), inflight):
+            if cancel is not None and cancel():
+                raise RuntimeError("cancelled")
+
+            batch = chunks[i:i + inflight]
+            cmds = [f"-data-read-memory-bytes 0x{addr:x} {n}" for addr, n in batch]
+
+            for (addr, n), reply in zip(batch, self.mi_pipeline(cmds, raise_errors=False)):
+                if isinstance(reply, Exception):
+                    failed.append((addr, n))
+                    continue
+
+                # 일부만 읽히면 gdb가 읽힌 블록들만 돌려줌
+                for block in reply[0].get("memory") or ():
+                    try:
+                        begin = int(block["begin"], 0) + int(block.get("offset", "0"), 0)
+                        dump.fill(begin, block["contents"])
+                    except (KeyError, TypeError, ValueError):
+                        continue
+        return failed
+
+    # 메모리 쓰기
+    def write_virt_bytes(self, va: int, data: bytes) -> None:
+        if not data:
+            return
 
-        return bytes(byte_list)
\ No newline at end of file
+        cmd = f'-data-write-memory-bytes 0x{va:x} {bytes(data).hex()}'
+        self.mi_cmd(cmd, timeout=5.0)
@@ -0,0 +1,716 @@
+import socket
+import select
+import time
+import re
+import xml.etree.ElementTree as ET
+
+from memory import PAGE_SIZE, MemoryDump, split_chunks
+from page_walk import PageWalkMixin
+from regfile import RegisterFile
+
+# QEMU x86_64 gdbstub 'g' 패킷 레지스터 배치 (target.xml을 못 읽었을 때 사용)
+DEFAULT_REG_LAYOUT = (
+    [(name, 8) for name in (
+        "rax", "rbx", "rcx", "rdx", "rsi", "rdi", "rbp", "rsp",
+        "r8", "r9", "r10", "r11", "r12", "r13", "r14", "r15",
+    )]
+    + [("rip", 8), ("eflags", 4)]
+    + [(name, 4) for name in ("cs", "ss", "ds", "es", "fs", "gs")]
+    + [("fs_base", 8), ("gs_base", 8), ("k_gs_base", 8)]
+    + [(f"st{i}", 10) for i in range(8)]
+    + [(name, 4) for name in (
+        "fctrl", "fstat", "ftag", "fiseg", "fioff", "foseg", "fooff", "fop",
+    )]
+    + [(f"xmm{i}", 16) for i in range(16)]
+    + [("mxcsr", 4)]
+    + [(name, 8) for name in ("cr0", "cr2", "cr3", "cr4", "cr8", "efer")]
+)
+
+class GdbRSPClient(PageWalkMixin):
+    # GDB Remote Serial Protocol 클라이언트 초기화 (gdb 없이 QEMU gdbstub에 직접 연결)
+    def __init__(self, target="localhost:1234", timeout=5.0):
+        self.target = target
+        self.timeout = timeout
+
+        self.sock = None
+        self.rxbuf = bytearray()
+        self.no_ack = False
+        self.packet_size = 4096
+
+        self.reg_layout = list(DEFAULT_REG_LAYOUT)
+        self.reg_offsets = {}
+        self.last_stop = None
+        self.running = False
+        self.stops = 0
+
+        # 고른 vCPU thread id (None이면 stub 기본 - 마지막으로 멈춘 vCPU)
+        self.thread = None
+
+    # gdbstub 연결
+    def connect(self):
+        if self.sock is not None:
+            return
+
+        host, _, port = self.target.rpartition(":")
+        self.sock = socket.create_connection((host or "localhost", int(port)), timeout=self.timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.rxbuf.clear()
+        self.no_ack = False
+        self.running = False
+        self.thread = None
+        self.sock.sendall(b"+")
+
+        # 기능 협상
+        features = self.request("qSupported:multiprocess+;xmlRegisters=i386")
+        for feat in features.split(";"):
+            if feat.startswith("PacketSize="):
+                self.packet_size = int(feat.split("=", 1)[1], 16)
+
+        if "QStartNoAckMode+" in features and self.request("QStartNoAckMode") == "OK":
+            self.no_ack = True
+
+        if "qXfer:features:read+" in features:
+            try:
+                self.load_target_xml()
+            except Exception:
+                self.reg_layout = list(DEFAULT_REG_LAYOUT)
+
+        self.build_reg_offsets()
+        self.last_stop = self.request("?")
+
+    # gdbstub 소켓이 살아 있는지 (상대가 닫으면 drop_connection 이 None 으로)
+    def alive(self) -> bool:
+        return self.sock is not None
+
+    def close(self):
+        if self.sock is None:
+            return
+
+        try:
+            if self.running:
+                self.interrupt()
+            self.send_packet("D")
+            self.recv_packet(timeout=0.2)
+        except Exception:
+            pass
+
+        try:
+            self.sock.close()
+        except Exception:
+            pass
+        self.sock = None
+
+    def stepi(self):
+        self.send_packet(self.step_packet())
+        self.wait_stop()
+
+    # 고른 vCPU 가 있으면 그 vCPU 만 한 스텝 (없으면 stub 이 고른 vCPU)
+    def step_packet(self) -> str:
+        return f"vCont;s:{self.thread}" if self.thread is not None else "s"
+
+    def cont(self):
+        self.send_packet("c")
+        self.running = True
+
+    def interrupt(self):
+        if self.sock is None:
+            raise RuntimeError("gdbstub is not connected")
+        if not self.running:
+            return
+
+        self.sock.sendall(b"\x03")
+        self.wait_stop()
+
+    # n <count>: 's' 를 count 번 (스텝마다 stop reply 를 받은 뒤 다음 's', 단계마다 새로고침 없음)
+    #   QEMU gdbstub 은 all-stop 이라 실행 중에 도착한 패킷은 버려지므로 pipeline 하지 않음
+    #   progress(done): 64 스텝마다 호출 / cancel(): True면 거기서 멈춤 -> 실행한 스텝 수
+    def step_many(self, count: int, cancel=None, progress=None) -> int:
+        step = self.step_packet()
+        for done in range(count):
+            if cancel is not None and cancel():
+                return done
+
+            self.send_packet(step)
+            self.wait_stop()
+
+            if progress is not None and (done + 1) % 64 == 0:
+                progress(done + 1)
+        return count
+
+    # trace: 스텝마다 레지스터 전체를 record(RegisterFile) 로 넘김 ('s' -> stop reply -> 'g')
+    #   QEMU gdbstub 은 all-stop - 실행 중에 받은 바이트는 버리고 게스트를 멈추므로 'g' 는 멈춘 뒤에 보냄
+    def step_record(self, count: int, record, cancel=None, progress=None) -> int:
+        step = self.step_packet()
+        for done in range(count):
+            if cancel is not None and cancel():
+                return done
+
+            self.send_packet(step)
+            self.wait_stop()
+            record(RegisterFile.from_ints(self.parse_register_values(self.request("g"))))
+
+            if progress is not None and (done + 1) % 64 == 0:
+                progress(done + 1)
+        return count
+
+    # until <reg> changes: 스텝마다 레지스터 하나만 ('s' -> stop reply -> 'p')
+    #   -> (스텝 수, 이전 값, 바뀐 값 또는 None) / 값을 못 읽으면 RuntimeError
+    def step_until_change(self, name: str, max_steps: int, cancel=None, progress=None):
+        regnum = self.reg_number(name)
+        old = self.read_register(name)
+        if old is None:
+            raise RuntimeError(f"cannot read register {name!r}")
+
+        for steps in range(1, max_steps + 1):
+            if cancel is not None and cancel():
+                return steps - 1, old, None
+
+            self.send_packet(self.step_packet())
+            self.wait_stop()
+            val = self.parse_register(name, self.request(f"p{regnum:x}"))
+            if val is None:
+                raise RuntimeError(f"cannot read register {name!r}")
+
+            if val != old:
+                return steps, old, val
+            if progress is not None and steps % 256 == 0:
+                progress(steps)
+        return max_steps, old, None
+
+    # until rip==<addr>: 하드웨어(안 되면 소프트웨어) breakpoint + continue (도달 여부는 호출한 쪽이 RIP로 확인)
+    def run_until(self, addr: int, cancel=None) -> None:
+        for kind in (1, 0):
+            if self.request(f"Z{kind},{addr:x},1") == "OK":
+                break
+        else:
+            raise RuntimeError(f"failed to set breakpoint at 0x{addr:x}")
+
+        try:
+            self.cont()
+            while self.running:
+                if cancel is not None and cancel():
+                    self.interrupt()
+                    break
+                ready, _, _ = select.select([self.sock], [], [], 0.1)
+                if ready or b"$" in self.rxbuf:
+                    self.wait_stop()
+        finally:
+            if not self.running:
+                self.request(f"z{kind},{addr:x},1")
+
+    # (정지 횟수, 마지막 정지 이유) - 실행 중이면 이미 도착한 stop reply 가 있는지만 확인 (블록하지 않음)
+    def poll_stop(self):
+        if self.running and self.sock is not None:
+            ready, _, _ = select.select([self.sock], [], [], 0)
+            if ready or b"$" in self.rxbuf:
+                try:
+                    self.wait_stop(timeout=0.5)
+                except RuntimeError:
+                    pass
+        return self.stops, self.stop_reason()
+
+    def stop_reason(self):
+        pkt = self.last_stop
+        if not pkt:
+            return None
+        if pkt[:1] in ("T", "S") and len(pkt) >= 3:
+            reason = f"signal 0x{pkt[1:3]}"
+            if "swbreak" in pkt or "hwbreak" in pkt:
+                reason = "breakpoint-hit " + reason
+            return reason
+        return pkt
+
+    # peek: 잠깐 멈추고 RIP/CR3만 읽은 뒤 다시 실행 -> (rip, cr3)
+    #   이미 멈춰 있거나 SIGINT(0x02)가 아닌 이유로 멈췄으면 재개하지 않고 None
+    def peek(self, timeout=None):
+        if not self.running:
+            return None
+
+        stops = self.stops
+        self.interrupt()
+        if self.stops != stops + 1 or not self.last_stop.startswith("T02"):
+            return None
+
+        regs = self.read_register_values()
+        self.cont()
+        return regs.get("rip"), regs.get("cr3")
+
+    # 정지 응답(stop reply) 대기
+    def wait_stop(self, timeout=None):
+        while True:
+            pkt = self.recv_packet(timeout=timeout)
+
+            # 실행 중 콘솔 출력
+            if pkt.startswith("O") and pkt != "OK":
+                continue
+
+            self.running = False
+            self.stops += 1
+            self.last_stop = pkt
+            if pkt[:1] in ("W", "X"):
+                raise RuntimeError(f"target exited: {pkt}")
+            if pkt[:1] not in ("T", "S"):
+                raise RuntimeError(f"unexpected stop reply: {pkt!r}")
+            return pkt
+
+    # RSP 패킷 송신
+    def send_packet(self, payload: str):
+        if self.sock is None:
+            raise RuntimeError("gdbstub is not connected")
+
+        data = payload.encode("latin-1")
+        frame = b"$" + data + b"#" + f"{sum(data) & 0xFF:02x}".encode()
+
+        for _ in range(3):
+            try:
+                self.sock.sendall(frame)
+            except OSError as e:
+                self.drop_connection()
+                raise RuntimeError(f"gdbstub connection lost: {e!s}") from None
+            if self.no_ack:
+                return
+
+            ack = self.read_ack()
+            if ack == b"+":
+                return
+        raise RuntimeError(f"RSP packet rejected: {payload[:32]!r}")
+
+    def read_ack(self):
+        while True:
+            for i, b in enumerate(self.rxbuf):
+                if b in (0x2B, 0x2D):
+                    ack = bytes(self.rxbuf[i:i + 1])
+                    del self.rxbuf[:i + 1]
+                    return ack
+            self.fill_rxbuf(self.timeout)
+
+    # RSP 패킷 수신
+    def recv_packet(self, timeout=None) -> str:
+        if timeout is None:
+            timeout = self.timeout
+
+        deadline = time.monotonic() + timeout
+        while True:
+            start = self.rxbuf.find(b"$")
+            if start >= 0:
+                end = self.rxbuf.find(b"#", start)
+                if end >= 0 and len(self.rxbuf) >= end + 3:
+                    payload = bytes(self.rxbuf[start + 1:end])
+                    csum = int(self.rxbuf[end + 1:end + 3], 16)
+                    del self.rxbuf[:end + 3]
+
+                    if not self.no_ack:
+                        if sum(payload) & 0xFF != csum:
+                            self.sock.sendall(b"-")
+                            continue
+                        self.sock.sendall(b"+")
+
+                    return self.decode_rle(payload).decode("latin-1")
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise RuntimeError("RSP timeout")
+            self.fill_rxbuf(remaining)
+
+    def fill_rxbuf(self, timeout):
+        ready, _, _ = select.select([self.sock], [], [], timeout)
+        if not ready:
+            raise RuntimeError("RSP timeout")
+
+        try:
+            chunk = self.sock.recv(65536)
+        except OSError:
+            chunk = b""
+        if not chunk:
+            self.drop_connection()
+            raise RuntimeError("gdbstub closed the connection")
+        self.rxbuf += chunk
+
+    # 상대가 연결을 끊음: 소켓을 버리고 실행 상태 초기화 (다음 connect 가 새로 연결)
+    def drop_connection(self):
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+        self.sock = None
+        self.running = False
+        self.rxbuf.clear()
+
+    # run-length 인코딩 해제 ('*' 뒤 글자 = 반복 횟수 + 29)
+    def decode_rle(self, payload: bytes) -> bytes:
+        if b"*" not in payload:
+            return payload
+
+        out = bytearray()
+        i = 0
+        while i < len(payload):
+            b = payload[i]
+            if b == 0x2A and out and i + 1 < len(payload):
+                out += bytes([out[-1]]) * (payload[i + 1] - 29)
+                i += 2
+                continue
+            out.append(b)
+            i += 1
+        return bytes(out)
+
+    # 바이너리 데이터 escape ('#', '$', '}', '*')
+    def escape_binary(self, data: bytes) -> bytes:
+        out = bytearray()
+        for b in data:
+            if b in (0x23, 0x24, 0x7D, 0x2A):
+                out.append(0x7D)
+                out.append(b ^ 0x20)
+            else:
+                out.append(b)
+        return bytes(out)
+
+    def unescape_binary(self, data: bytes) -> bytes:
+        if b"}" not in data:
+            return data
+
+        out = bytearray()
+        it = iter(data)
+        for b in it:
+            if b == 0x7D:
+                out.append(next(it) ^ 0x20)
+            else:
+                out.append(b)
+        return bytes(out)
+
+    # 요청 1개 + 응답 1개
+    def request(self, payload: str, timeout=None) -> str:
+        if self.running:
+            raise RuntimeError("target is running")
+        self.send_packet(payload)
+        return self.recv_packet(timeout=timeout)
+
+    # 요청 여러 개 -> 응답 목록 (no-ack 모드면 window 개씩 먼저 보내고 응답을 모아 받음)
+    def request_many(self, payloads, window: int = 16, timeout=None) -> list:
+        if not self.no_ack:
+            return [self.request(p, timeout=timeout) for p in payloads]
+        if self.running:
+            raise RuntimeError("target is running")
+
+        replies = []
+        for i in range(0, len(payloads), window):
+            batch = payloads[i:i + window]
+            for payload in batch:
+                self.send_packet(payload)
+            for _ in batch:
+                replies.append(self.recv_packet(timeout=timeout))
+        return replies
+
+    # target.xml 기반 레지스터 배치
+    def load_target_xml(self):
+        regs = []
+        self.collect_xml_regs("target.xml", regs, set())
+        if not regs:
+            raise RuntimeError("target.xml has no registers")
+
+        regs.sort(key=lambda r: r[0])
+        self.reg_layout = [(name, size) for _, name, size in regs]
+
+    def collect_xml_regs(self, annex, regs, seen):
+        if annex in seen:
+            return
+        seen.add(annex)
+
+        root = ET.fromstring(self.read_xfer_features(annex))
+        for elem in root.iter():
+            tag = elem.tag.rsplit("}", 1)[-1]
+            if tag == "include":
+                self.collect_xml_regs(elem.get("href"), regs, seen)
+            elif tag == "reg":
+                regnum = int(elem.get("regnum", len(regs)))
+                size = int(elem.get("bitsize")) // 8
+                regs.append((regnum, elem.get("name"), size))
+
+    def read_xfer_features(self, annex) -> str:
+        chunks = []
+        offset = 0
+        length = self.packet_size - 16
+
+        while True:
+            pkt = self.request(f"qXfer:features:read:{annex}:{offset:x},{length:x}")
+            if not pkt or pkt[0] not in ("m", "l"):
+                raise RuntimeError(f"qXfer {annex} failed: {pkt!r}")
+
+            data = self.unescape_binary(pkt[1:].encode("latin-1"))
+            chunks.append(data)
+            offset += len(data)
+            if pkt[0] == "l":
+                break
+
+        return b"".join(chunks).decode("utf-8")
+
+    def build_reg_offsets(self):
+        self.reg_offsets = {}
+        off = 0
+        for name, size in self.reg_layout:
+            self.reg_offsets[name] = (off, size)
+            off += size
+
+    # target.xml 순서 = 'p' 패킷 레지스터 번호
+    def reg_number(self, name: str) -> int:
+        for num, (reg, _) in enumerate(self.reg_layout):
+            if reg == name:
+                return num
+        raise RuntimeError(f"unknown register: {name!r}")
+
+    def parse_register(self, name: str, pkt: str):
+        size = self.reg_offsets[name][1]
+        if (pkt.startswith("E") and len(pkt) == 3) or len(pkt) < size * 2 or "x" in pkt:
+            return None
+        return int.from_bytes(bytes.fromhex(pkt[:size * 2]), "little")
+
+    # 레지스터 하나 ('p' 패킷)
+    def read_register(self, name: str):
+        return self.parse_register(name, self.request(f"p{self.reg_number(name):x}"))
+
+    # 'g' 패킷 -> {name: int | None}
+    def read_register_values(self) -> dict:
+        return self.parse_register_values(self.request("g"))
+
+    def parse_register_values(self, pkt: str) -> dict:
+        if pkt.startswith("E") and len(pkt) == 3:
+            raise RuntimeError(f"RSP error for 'g': {pkt}")
+
+        values = {}
+        for name, (off, size) in self.reg_offsets.items():
+            chunk = pkt[off * 2:(off + size) * 2]
+            if len(chunk) < size * 2 or "x" in chunk:
+                values[name] = None
+            else:
+                values[name] = int.from_bytes(bytes.fromhex(chunk), "little")
+        return values
+
+    # Registers 읽기 (REG_ORDER + 제어 레지스터)
+    def read_registers(self) -> RegisterFile:
+        return RegisterFile.from_ints(self.read_register_values())
+
+    # Registers + CR3 ('g' 패킷 1개로 둘 다 얻음)
+    #   고른 vCPU 가 있으면 Hg 를 'g' 와 같이 보냄 (정지하면 stub 이 멈춘 vCPU 로 바꾸므로)
+    def read_state(self, prefetch_tables=(), prefetch_qwords=()):
+        if self.thread is not None:
+            sel, pkt = self.request_many([f"Hg{self.thread}", "g"])
+            if sel != "OK":
+                raise RuntimeError(f"failed to select thread {self.thread}: {sel!r}")
+            values = self.parse_register_values(pkt)
+        else:
+            values = self.read_register_values()
+        regs = RegisterFile.from_ints(values)
+
+        cr3 = values.get("cr3")
+        if cr3 is None:
+            cr3 = self.read_cr3()
+
+        return (regs, cr3) + self.read_prefetch(prefetch_tables, prefetch_qwords)
+
+    # vCPU 목록 (qfThreadInfo / qsThreadInfo, 이름은 qThreadExtraInfo 를 pipeline) -> [(thread id, 이름), ...]
+    def list_threads(self) -> list:
+        tids = []
+        pkt = self.request("qfThreadInfo")
+        while pkt.startswith("m"):
+            tids += [tid for tid in pkt[1:].split(",") if tid]
+            pkt = self.request("qsThreadInfo")
+        if not tids:
+            raise RuntimeError(f"qfThreadInfo failed: {pkt!r}")
+
+        infos = self.request_many([f"qThreadExtraInfo,{tid}" for tid in tids])
+        return [(tid, self.thread_label(tid, info)) for tid, info in zip(tids, infos)]
+
+    # qThreadExtraInfo 응답 ("CPU#0 [running]" 의 hex) -> "CPU#0"
+    def thread_label(self, tid: str, info: str) -> str:
+        try:
+            text = bytes.fromhex(info).decode("utf-8", "replace")
+        except ValueError:
+            text = ""
+        return text.split(" [", 1)[0].strip() or f"thread {tid}"
+
+    # vCPU 고르기 (None이면 stub 기본으로) - 이후 레지스터 읽기 / 스텝은 그 vCPU
+    def select_thread(self, tid) -> None:
+        if tid is not None:
+            for reply in self.request_many([f"Hg{tid}", f"Hc{tid}"]):
+                if reply != "OK":
+                    raise RuntimeError(f"failed to select thread {tid}: {reply!r}")
+        self.thread = tid
+
+    # 지금 vCPU (고른 것, 없으면 마지막 stop reply 의 thread)
+    def current_thread(self):
+        if self.thread is not None:
+            return self.thread
+        m = re.search(r"thread:([^;]+);", self.last_stop or "")
+        return m.group(1) if m else None
+
+    # 여러 vCPU 의 레지스터 + CR3 를 한 번에: Hg<tid> + 'g' 쌍을 모두 pipeline (끝에 Hg 를 지금 vCPU 로 되돌림)
+    #   -> {thread id: RegisterFile 또는 Exception}
+    def read_thread_states(self, tids) -> dict:
+        tids = list(tids)
+        payloads = []
+        for tid in tids:
+            payloads += [f"Hg{tid}", "g"]
+        current = self.current_thread()
+        if current is not None:
+            payloads.append(f"Hg{current}")
+
+        replies = self.request_many(payloads, window=len(payloads))
+        states = {}
+        for i, tid in enumerate(tids):
+            sel, pkt = replies[2 * i], replies[2 * i + 1]
+            if sel != "OK":
+                states[tid] = RuntimeError(f"failed to select thread {tid}: {sel!r}")
+                continue
+            try:
+                states[tid] = RegisterFile.from_ints(self.parse_register_values(pkt))
+            except RuntimeError as e:
+                states[tid] = e
+        return states
+
+    # QEMU Monitor 명령어 송수신 (qRcmd, QMP 소켓이 있으면 그쪽으로 - running 중에도 가능)
+    def monitor_cmd(self, cmd, timeout=None):
+        if self.qmp is not None:
+            return self.qmp.hmp(cmd, timeout=timeout)
+        if self.running:
+            raise RuntimeError("target is running")
+        self.send_packet(self.monitor_packet(cmd))
+        return self.recv_monitor_reply(cmd, timeout=timeout)
+
+    # monitor 명령 여러 개 -> 명령마다 출력 텍스트 또는 Exception
+    #   no-ack 모드면 qRcmd 를 window 개씩 먼저 보내고 응답(O 패킷들 + OK)을 순서대로 받음
+    def monitor_many(self, cmds, window: int = 16, timeout=None) -> list:
+        cmds = list(cmds)
+        if self.qmp is not None:
+            return self.qmp.hmp_many(cmds, timeout=timeout)
+        if self.running:
+            raise RuntimeError("target is running")
+
+        out = []
+        step = window if self.no_ack else 1
+        for i in range(0, len(cmds), step):
+            batch = cmds[i:i + step]
+            for cmd in batch:
+                self.send_packet(self.monitor_packet(cmd))
+            for cmd in batch:
+                try:
+                    out.append(self.recv_monitor_reply(cmd, timeout=timeout))
+                except RuntimeError as e:
+                    out.append(e)
+        return out
+
+    def monitor_packet(self, cmd) -> str:
+        return "qRcmd," + cmd.encode("utf-8").hex()
+
+    def recv_monitor_reply(self, cmd, timeout=None) -> str:
+        out_parts = []
+        while True:
+            pkt = self.recv_packet(timeout=timeout)
+            if pkt == "OK":
+                break
+            if pkt == "":
+                raise RuntimeError("qRcmd is not supported by the stub")
+            if pkt.startswith("E") and len(pkt) == 3:
+                raise RuntimeError(f"monitor error for '{cmd}': {pkt}")
+            if pkt.startswith("O"):
+                out_parts.append(bytes.fromhex(pkt[1:]).decode("utf-8", "replace"))
+                continue
+
+            # O 접두사 없이 결과 hex만 오는 경우
+            out_parts.append(bytes.fromhex(pkt).decode("utf-8", "replace"))
+            break
+
+        return "".join(out_parts)
+
+    # xp 여러 개를 qRcmd pipeline 으로
+    def read_xp_many(self, reqs) -> list:
+        reqs = list(reqs)
+        texts = self.monitor_many([f"xp /{count}gx {pa:#x}" for pa, count in reqs])
+        return [
+            text if isinstance(text, Exception) else self.try_parse_xp(text, pa, count)
+            for (pa, count), text in zip(reqs, texts)
+        ]
+
+    # CR3 읽기
+    def read_cr3(self) -> int:
+        cr3 = self.read_register_values().get("cr3")
+        if cr3 is not None:
+            return cr3
+
+        # QEMU Monitor에서 info registers 사용
+        out = self.monitor_cmd("info registers")
+        m = re.search(r"CR3=([0-9a-fA-F]+)", out)
+        if not m:
+            raise RuntimeError(f"failed to parse CR3 from: {out!r}")
+        return int(m.group(1), 16)
+
+    # 메모리 읽기
+    def read_phys_qword(self, phys_addr: int) -> int:
+        return self.read_phys_qwords(phys_addr, 1)[0]
+
+    # 메모리 덤프
+    def read_virt_bytes(self, va: int, size: int = 64) -> bytes:
+        if size <= 0:
+            return b""
+
+        chunk_max = (self.packet_size - 8) // 2
+        out = bytearray()
+        addr = va
+        end = va + size
+
+        while addr < end:
+            n = min(chunk_max, end - addr)
+            pkt = self.request(f"m{addr:x},{n:x}")
+            if pkt.startswith("E") and len(pkt) == 3:
+                raise RuntimeError(f"failed to read memory at 0x{addr:x}: {pkt}")
+
+            data = bytes.fromhex(pkt)
+            if not data:
+                break
+            out += data
+            addr += len(data)
+
+        return bytes(out)
+
+    # 큰 구간 읽기: 'm' 패킷을 pipeline으로 보내 bytearray에 채움
+    #   실패한 chunk는 page 경계에서 나눠 다시 읽고, 그래도 실패한 부분은 구멍으로 남김
+    #   cancel: 배치 사이마다 호출, True면 RuntimeError("cancelled")
+    def read_virt_dump(self, va: int, size: int, chunk: int = None, cancel=None) -> MemoryDump:
+        if chunk is None:
+            # 응답 패킷에 들어가는 크기 중 페이지 경계와 맞는 것 (페이지 배수, 페이지보다 작으면 2의 거듭제곱)
+            limit = (self.packet_size - 8) // 2
+            chunk = limit - limit % PAGE_SIZE if limit >= PAGE_SIZE else 1 << (limit.bit_length() - 1)
+
+        dump = MemoryDump(va, size)
+        failed = self.read_virt_chunks(dump, split_chunks(va, size, chunk), cancel=cancel)
+
+        # 실패한 chunk 는 페이지 단위로 한 번 더 (한 페이지짜리 chunk 도 - 일시적 오류일 수 있음, mi 와 같음)
+        pages = [page for addr, n in failed for page in split_chunks(addr, n, PAGE_SIZE)]
+        if pages:
+            self.read_virt_chunks(dump, pages, cancel=cancel)
+        return dump.finish()
+
+    def read_virt_chunks(self, dump: MemoryDump, chunks: list, batch: int = 256, cancel=None) -> list:
+        failed = []
+        for i in range(0, len(chunks), batch):
+            if cancel is not None and cancel():
+                raise RuntimeError("cancelled")
+
+            part = chunks[i:i + batch]
+            replies = self.request_many([f"m{addr:x},{n:x}" for addr, n in part])
+            for (addr, n), pkt in zip(part, replies):
+                if not pkt or (pkt.startswith("E") and len(pkt) == 3):
+                    failed.append((addr, n))
+                    continue
+                dump.fill(addr, pkt)
+        return failed
+
+    # 메모리 쓰기
+    def write_virt_bytes(self, va: int, data: bytes) -> None:
+        chunk_max = (self.packet_size - 32) // 2
+        data = bytes(data)
+
+        for i in range(0, len(data), chunk_max):
+            chunk = data[i:i + chunk_max]
+            payload = f"X{va + i:x},{len(chunk):x}:".encode("latin-1") + self.escape_binary(chunk)
+            reply = self.request(payload.decode("latin-1"))
+            if reply != "OK":
+                raise RuntimeError(f"failed to write memory at 0x{va + i:x}: {reply}")
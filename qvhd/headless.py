@@ -0,0 +1,280 @@
+import argparse
+import itertools
+import json
+import sys
+import time
+
+from commands import run_command
+from phys_mem import MACHINES
+from regfile import STATE_REGS, RegisterFile
+from session import DebugSession
+
+# 이벤트 형식 버전 (필드를 빼거나 뜻을 바꿀 때만 올림, 필드 추가는 그대로)
+API_VERSION = 1
+
+# 명령 뒤에 내보낼 수 있는 데이터 이벤트 (바뀐 것만, cmd 이벤트 앞에)
+EVENT_TYPES = ("regs", "page", "dump", "map", "cpus")
+
+# wait 기본 제한 시간 (초)
+WAIT_TIMEOUT = 10.0
+
+# JSON 으로 바꿀 수 있는 값으로 (튜플 -> 리스트, bytes -> hex, dict 키 -> 문자열)
+def jsonable(value):
+    if isinstance(value, dict):
+        return {str(k): jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [jsonable(v) for v in value]
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value).hex()
+    return value
+
+# cpu_rows() 한 줄 -> cpus 이벤트 항목 (레지스터를 못 읽었으면 error)
+def cpu_event(current: bool, label: str, state) -> dict:
+    item = {"cpu": label, "current": current}
+    if isinstance(state, Exception):
+        item["error"] = str(state)
+    elif state is not None:
+        item.update(rip=state.get("rip"), rsp=state.get("rsp"), cr3=state.get("cr3"))
+    return item
+
+class InlineWorker:
+    # SessionWorker 대신 - submit() 한 작업을 그 자리에서 실행 (명령이 끝나야 다음 명령)
+    def __init__(self, sess: DebugSession) -> None:
+        self.sess = sess
+
+    def submit(self, label: str, fn) -> None:
+        self.sess.cancel_event.clear()
+        self.sess.progress = None
+        try:
+            fn()
+        except Exception as e:
+            self.sess.fail(f"{label} ERROR: {e!s}")
+
+class HeadlessView:
+    # run_command 가 쓰는 화면 정보 (Mem Dump 줄 수, 화면 갱신 주기는 없음)
+    mem_rows = 16
+
+    def set_tick(self, ms: int) -> None:
+        pass
+
+class HeadlessSession:
+    # curses 없이 DebugSession 에 TUI 와 같은 명령을 보내고 결과를 이벤트(dict)로 돌려줌
+    #   run(line) -> [이벤트, ...]: 바뀐 regs / page / dump / map / cpus 이벤트 뒤에 cmd 이벤트 하나
+    #   이벤트마다 "type" 과 명령 번호 "seq" (connect 는 0), 숫자는 JSON 정수 (주소도 10진 정수)
+    #   events: 내보낼 데이터 이벤트 종류 (EVENT_TYPES 중, 큰 덤프를 안 받으려면 "dump" 를 뺌)
+    #   session_args: DebugSession 인자 (ram_file, machine, qmp)
+    def __init__(self, target: str = "localhost:1234", backend: str = "mi", gdb_path: str = "gdb",
+                 events=EVENT_TYPES, **session_args) -> None:
+        unknown = set(events) - set(EVENT_TYPES)
+        if unknown:
+            raise ValueError(f"unknown event types: {sorted(unknown)} (expected some of {EVENT_TYPES})")
+        self.sess = DebugSession(target=target, gdb_path=gdb_path, backend=backend, **session_args)
+        self.worker = InlineWorker(self.sess)
+        self.view = HeadlessView()
+        self.events = set(events)
+
+        self.seq = 0
+        self.errors = 0
+        self.closed = False
+
+        # 마지막으로 내보낸 상태 (객체가 바뀌었을 때만 다시 내보냄)
+        self.sent = {}
+
+    def __enter__(self) -> "HeadlessSession":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def connect(self) -> list:
+        t0 = time.perf_counter()
+        self.sess.connect()
+        ok = self.sess.alive() and not self.sess.status_error
+        return self.finish({
+            "type": "hello",
+            "version": API_VERSION,
+            "target": self.sess.client.target,
+            "backend": self.sess.backend,
+            "cpus": [label for _tid, label in self.sess.cpus],
+        }, ok, time.perf_counter() - t0)
+
+    # 명령 한 줄 (빈 줄 / # 주석은 []) -> 이벤트 목록
+    #   TUI 명령 외에: wait [timeout] (running 이면 멈출 때까지), sleep <sec>, regs / page (바뀌지 않아도 내보냄)
+    def run(self, line: str) -> list:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            return []
+
+        self.seq += 1
+        sess = self.sess
+        t0 = time.perf_counter()
+        force = ()
+
+        # 실패는 DebugSession.fail() 로만 표시됨 (상태줄을 건드리지 않는 명령은 성공)
+        sess.status_error = False
+
+        if line == "wait" or line.startswith("wait "):
+            try:
+                self.cmd_wait(float(line[5:]) if line[5:].strip() else WAIT_TIMEOUT)
+            except ValueError:
+                sess.fail(f"usage: wait [timeout sec] ({line!r})")
+        elif line.startswith("sleep "):
+            try:
+                time.sleep(float(line[6:]))
+                sess.status = f"sleep {line[6:].strip()} OK"
+            except ValueError:
+                sess.fail(f"usage: sleep <seconds> ({line!r})")
+        elif line in ("regs", "page"):
+            force = (line,)
+            sess.status = f"{line} OK"
+        else:
+            run_command(line, sess, self.worker, self.view)
+
+        return self.finish({"type": "cmd", "cmd": line}, not sess.status_error, time.perf_counter() - t0, force)
+
+    # 여러 줄 -> 이벤트를 차례로 (stop_on_error 면 처음 실패한 명령에서 멈춤, q 에서 끝)
+    def run_script(self, lines, stop_on_error: bool = False):
+        for line in lines:
+            if line.strip() in ("q", "quit"):
+                return
+            events = self.run(line)
+            yield from events
+            if stop_on_error and events and not events[-1]["ok"]:
+                return
+
+    # wait: 게스트가 스스로 멈출 때까지 (breakpoint 등, c / until 뒤)
+    def cmd_wait(self, timeout: float) -> None:
+        sess = self.sess
+        if not sess.is_running:
+            sess.status = "wait OK: not running"
+            return
+
+        deadline = time.monotonic() + timeout
+        while not sess.check_stopped():
+            if time.monotonic() >= deadline:
+                sess.fail(f"wait ERROR: still running after {timeout:g}s")
+                return
+            time.sleep(0.001)
+        sess.cmd_stopped()
+
+    # 바뀐 상태 이벤트 + 마지막 이벤트(명령 결과)
+    def finish(self, last: dict, ok: bool, elapsed: float, force=()) -> list:
+        sess = self.sess
+        out = []
+
+        # obj 가 다른 객체이거나 extra (같은 객체가 커진 경우 등) 가 다르면 새로 내보냄
+        def changed(kind, obj, extra=None):
+            if kind not in self.events:
+                return False
+            prev = self.sent.get(kind)
+            if kind not in force and prev is not None and prev[0] is obj and prev[1] == extra:
+                return False
+            self.sent[kind] = (obj, extra)
+            return obj is not None
+
+        if changed("regs", sess.regs):
+            out.append({
+                "type": "regs",
+                "cpu": sess.cpu_label(),
+                "regs": {name: sess.regs.get(name) for name in STATE_REGS},
+                "changed": RegisterFile.changed_names(sess.reg_changed),
+            })
+        if changed("page", sess.page_info):
+            info = {k: v for k, v in sess.page_info.items() if k != "tables"}
+            out.append({"type": "page", "info": jsonable(info)})
+        dump = sess.mem_dump
+        if changed("dump", dump, dump.size if dump is not None else None):
+            out.append({
+                "type": "dump",
+                "va": dump.va,
+                "size": dump.size,
+                "phys": sess.mem_phys,
+                "data": dump.data.hex(),
+                "holes": jsonable(dump.holes),
+            })
+        if changed("map", sess.map_ranges):
+            out.append({
+                "type": "map",
+                "regions": [
+                    {"va_start": s, "va_end": e, "pa_start": pa, "perm": perm, "page_size": size}
+                    for s, e, pa, perm, size in sess.map_ranges
+                ],
+            })
+        if changed("cpus", sess.cpu_states):
+            out.append({"type": "cpus", "cpus": [cpu_event(*row) for row in sess.cpu_rows()]})
+
+        if not ok:
+            self.errors += 1
+        last.update(ok=ok, status=sess.status, running=sess.is_running, ms=round(elapsed * 1e3, 3))
+        out.append(last)
+        for event in out:
+            event["seq"] = self.seq
+        return out
+
+    # stats 가 켜져 있었으면 분류별 합계 이벤트
+    def close(self) -> list:
+        if self.closed:
+            return []
+        self.closed = True
+        stats = self.sess.client.stats
+        out = [{"type": "stats", "seq": self.seq, "classes": stats.snapshot()}] if stats is not None else []
+        self.sess.close()
+        return out
+
+def write_events(out, events) -> None:
+    for event in events:
+        out.write(json.dumps(event, separators=(",", ":")) + "\n")
+    out.flush()
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="QVHD headless mode: commands in, JSON lines out")
+    parser.add_argument("script", nargs="?", default="-", help="command script (default: stdin)")
+    parser.add_argument("-e", "--exec", dest="commands", action="append", default=[],
+                        help="command to run before the script (repeatable); with -e only, stdin is not read")
+    parser.add_argument("--out", default=None, help="write JSON lines here (default: stdout)")
+    parser.add_argument("--target", default="localhost:1234", help="QEMU gdbstub address")
+    parser.add_argument("--backend", default="mi", choices=("mi", "rsp"), help="mi: gdb/MI, rsp: gdbstub 직접 연결")
+    parser.add_argument("--gdb", default="gdb", help="gdb executable (mi backend)")
+    parser.add_argument("--ram-file", default=None, help="QEMU memory-backend-file path (share=on)")
+    parser.add_argument("--machine", default="pc", choices=MACHINES, help="QEMU machine type (RAM 배치 / PCI hole)")
+    parser.add_argument("--qmp", default=None, help="QEMU -qmp unix 소켓 경로")
+    parser.add_argument("--events", default=",".join(EVENT_TYPES), help=f"data events to emit (subset of {','.join(EVENT_TYPES)})")
+    parser.add_argument("--stats-log", default=None, help="명령별 지연 / 바이트 / 파싱 시간 JSONL (mi backend)")
+    parser.add_argument("--stop-on-error", action="store_true", help="stop at the first failing command")
+    args = parser.parse_args()
+
+    events = [e for e in args.events.split(",") if e]
+    out = open(args.out, "w") if args.out else sys.stdout
+
+    # -e 만 주면 stdin 은 읽지 않음
+    if args.script != "-":
+        script = open(args.script)
+    elif args.commands:
+        script = None
+    else:
+        script = sys.stdin
+
+    h = HeadlessSession(args.target, args.backend, args.gdb, events=events,
+                        ram_file=args.ram_file, machine=args.machine, qmp=args.qmp)
+    try:
+        hello = h.connect()
+        write_events(out, hello)
+        if not hello[-1]["ok"]:
+            return 2
+        # --stats-log 는 TUI 의 stats log 명령과 같음 (결과도 cmd 이벤트로)
+        first = [f"stats log {args.stats_log}"] if args.stats_log else []
+        lines = itertools.chain(first, args.commands, script if script is not None else ())
+        for event in h.run_script(lines, stop_on_error=args.stop_on_error):
+            write_events(out, (event,))
+    except KeyboardInterrupt:
+        return 130
+    finally:
+        write_events(out, h.close())
+        if script is not None and script is not sys.stdin:
+            script.close()
+        if out is not sys.stdout:
+            out.close()
+    return 1 if h.errors else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
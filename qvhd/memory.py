@@ -0,0 +1,111 @@
+PAGE_SIZE = 0x1000
+
+# hexdump 한 줄 바이트 수
+ROW_BYTES = 16
+
+# 출력 가능한 ASCII 외에는 '.' 로 바꾸는 변환표
+ASCII_TABLE = bytes(b if 32 <= b < 127 else 0x2E for b in range(256))
+
+# 한 번에 요청하는 크기 (page 단위로 정렬되므로 읽기 실패는 page 단위 구멍이 됨)
+MEM_CHUNK = 16 * PAGE_SIZE
+
+# [va, va + size) 를 chunk 경계(정렬)에서 자른 (주소, 길이) 목록
+def split_chunks(va: int, size: int, chunk: int = MEM_CHUNK) -> list:
+    chunks = []
+    addr = va
+    end = va + size
+    while addr < end:
+        n = min(chunk - (addr % chunk), end - addr)
+        chunks.append((addr, n))
+        addr += n
+    return chunks
+
+class MemoryDump:
+    # VA 구간 하나를 읽은 결과
+    #   data: 미리 할당한 bytearray (읽지 못한 부분은 0)
+    #   holes: 읽지 못한 구간 [(start, end), ...] (finish() 후 유효)
+    __slots__ = ("va", "data", "filled", "holes")
+
+    def __init__(self, va: int, size: int) -> None:
+        self.va = va
+        self.data = bytearray(size)
+        self.filled = []
+        self.holes = []
+
+    @property
+    def size(self) -> int:
+        return len(self.data)
+
+    @property
+    def end(self) -> int:
+        return self.va + len(self.data)
+
+    # addr 위치에 읽은 바이트 채우기 (hex 문자열은 bytes.fromhex 한 번으로 변환)
+    def fill(self, addr: int, data) -> None:
+        off = addr - self.va
+        if isinstance(data, str):
+            data = bytes.fromhex(data)
+        n = min(len(data), len(self.data) - off)
+        if off < 0 or n <= 0:
+            return
+        memoryview(self.data)[off:off + n] = data[:n]
+        self.filled.append((addr, addr + n))
+
+    # 채워지지 않은 구간 계산
+    def finish(self) -> "MemoryDump":
+        holes = []
+        pos = self.va
+        for start, end in sorted(self.filled):
+            if start > pos:
+                holes.append((pos, start))
+            pos = max(pos, end)
+        if pos < self.end:
+            holes.append((pos, self.end))
+        self.holes = holes
+        return self
+
+    # 바로 뒤에 이어지는 덤프 붙이기 (스크롤로 끝을 넘었을 때)
+    def append(self, other: "MemoryDump") -> None:
+        if other.va != self.end:
+            raise ValueError(f"dump at 0x{other.va:x} does not follow 0x{self.end:x}")
+        self.data += other.data
+        self.filled += other.filled
+        self.holes += other.holes
+
+    def hole_bytes(self) -> int:
+        return sum(end - start for start, end in self.holes)
+
+    # [addr, addr + n) 와 겹치는 구멍
+    def holes_in(self, addr: int, n: int) -> list:
+        return [(s, e) for s, e in self.holes if s < addr + n and e > addr]
+
+    @property
+    def rows(self) -> int:
+        return (len(self.data) + ROW_BYTES - 1) // ROW_BYTES
+
+    # first 번째 줄부터 count 줄만 hexdump 형식으로 (보이는 줄만 그때그때 포맷)
+    def format_rows(self, first: int, count: int) -> list:
+        lines = []
+        data = self.data
+        for row in range(first, min(first + count, self.rows)):
+            off = row * ROW_BYTES
+            chunk = bytes(data[off:off + ROW_BYTES])
+            addr = self.va + off
+
+            hexpart = chunk.hex(" ")
+            asciipart = chunk.translate(ASCII_TABLE).decode("ascii")
+
+            holes = self.holes_in(addr, len(chunk)) if self.holes else ()
+            if holes:
+                # 읽지 못한 바이트는 ?? 로 표시
+                cells = hexpart.split(" ")
+                chars = list(asciipart)
+                for start, end in holes:
+                    for i in range(max(start, addr) - addr, min(end, addr + len(chunk)) - addr):
+                        cells[i] = "??"
+                        chars[i] = "?"
+                hexpart = " ".join(cells)
+                asciipart = "".join(chars)
+
+            lines.append(f"0x{addr:016x}: {hexpart:<47}  {asciipart}")
+        return lines
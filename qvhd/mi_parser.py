@@ -0,0 +1,207 @@
+RESULT_PREFIX = "^"
+ASYNC_KINDS = {"*": "exec", "+": "status", "=": "notify"}
+STREAM_KINDS = {"~": "console", "@": "target", "&": "log"}
+
+C_ESCAPES = {
+    "n": "\n", "t": "\t", "r": "\r", "\"": "\"", "\\": "\\",
+    "a": "\a", "b": "\b", "f": "\f", "v": "\v", "e": "\x1b", "'": "'",
+}
+
+class MIParseError(ValueError):
+    pass
+
+class MIRecord:
+    # GDB/MI 출력 레코드 1개
+    #   kind: result / exec / status / notify / console / target / log / prompt / raw
+    #   cls: result/async 클래스 (done, running, error, stopped ...)
+    #   results: result/async 레코드의 결과 (tuple -> dict, list -> list)
+    #   text: stream 레코드의 디코딩된 문자열
+    __slots__ = ("token", "kind", "cls", "results", "text")
+
+    def __init__(self, token, kind, cls=None, results=None, text=None):
+        self.token = token
+        self.kind = kind
+        self.cls = cls
+        self.results = results
+        self.text = text
+
+    def __repr__(self):
+        if self.text is not None:
+            return f"MIRecord({self.kind}, {self.text!r})"
+        return f"MIRecord({self.token}, {self.kind}, {self.cls}, {self.results!r})"
+
+    def get(self, key, default=None):
+        if self.results is None:
+            return default
+        return self.results.get(key, default)
+
+# 레코드 1줄 파싱
+def parse_record(line: str) -> MIRecord:
+    n = len(line)
+    i = 0
+    while i < n and "0" <= line[i] <= "9":
+        i += 1
+    token = int(line[:i]) if i else None
+
+    if i >= n:
+        return MIRecord(token, "raw", text=line)
+
+    c = line[i]
+    if c == RESULT_PREFIX or c in ASYNC_KINDS:
+        kind = "result" if c == RESULT_PREFIX else ASYNC_KINDS[c]
+        j = line.find(",", i + 1)
+        if j < 0:
+            return MIRecord(token, kind, line[i + 1:], {})
+
+        results, pos = parse_results(line, j + 1, "")
+        if pos != n:
+            raise MIParseError(f"trailing garbage at {pos}: {line!r}")
+        return MIRecord(token, kind, line[i + 1:j], results)
+
+    if c in STREAM_KINDS and i + 1 < n and line[i + 1] == '"':
+        text, pos = parse_cstring(line, i + 1)
+        return MIRecord(token, STREAM_KINDS[c], text=text)
+
+    if line.startswith("(gdb)"):
+        return MIRecord(token, "prompt")
+
+    return MIRecord(token, "raw", text=line)
+
+# result ("," result)* -> dict (닫는 괄호 직전까지)
+def parse_results(s: str, pos: int, close: str):
+    results = {}
+    find = s.find
+
+    if s[pos:pos + 1] == close:
+        return results, pos
+
+    while True:
+        eq = find("=", pos)
+        if eq < 0:
+            raise MIParseError(f"expected '=' at {pos}: {s!r}")
+        name = s[pos:eq]
+        pos = eq + 1
+
+        # 이스케이프 없는 c-string 값은 여기서 바로 처리 (대부분의 값)
+        if s[pos:pos + 1] == '"':
+            end = find('"', pos + 1)
+            if end >= 0 and find("\\", pos + 1, end) < 0:
+                results[name] = s[pos + 1:end]
+                pos = end + 1
+            else:
+                results[name], pos = parse_cstring(s, pos)
+        else:
+            results[name], pos = parse_value(s, pos)
+
+        c = s[pos:pos + 1]
+        if c == ",":
+            pos += 1
+        elif c == close:
+            return results, pos
+        elif not c:
+            raise MIParseError(f"unterminated tuple: {s!r}")
+        else:
+            raise MIParseError(f"unexpected {c!r} at {pos}: {s!r}")
+
+# value = c-string | tuple | list
+def parse_value(s: str, pos: int):
+    c = s[pos] if pos < len(s) else ""
+
+    if c == '"':
+        return parse_cstring(s, pos)
+
+    if c == "{":
+        results, pos = parse_results(s, pos + 1, "}")
+        return results, pos + 1
+
+    if c == "[":
+        return parse_list(s, pos + 1)
+
+    raise MIParseError(f"unexpected {c!r} at {pos}: {s!r}")
+
+# list = "[]" | "[" value ("," value)* "]" | "[" result ("," result)* "]"
+# result 목록은 이름을 버리고 값만 남김 (frame={...},frame={...} -> [{...}, {...}])
+def parse_list(s: str, pos: int):
+    items = []
+    if s[pos:pos + 1] == "]":
+        return items, pos + 1
+
+    n = len(s)
+    while True:
+        c = s[pos] if pos < n else ""
+        if c not in ('"', "{", "["):
+            eq = s.find("=", pos)
+            if eq < 0:
+                raise MIParseError(f"expected value at {pos}: {s!r}")
+            pos = eq + 1
+
+        c = s[pos:pos + 1]
+        if c == "{":
+            value, pos = parse_results(s, pos + 1, "}")
+            pos += 1
+        else:
+            value, pos = parse_value(s, pos)
+        items.append(value)
+
+        c = s[pos] if pos < n else ""
+        if c == ",":
+            pos += 1
+        elif c == "]":
+            return items, pos + 1
+        else:
+            raise MIParseError(f"unterminated list: {s!r}")
+
+# C 문자열 ("..." 와 \n, \", \ooo 이스케이프) -> str
+def parse_cstring(s: str, pos: int):
+    start = pos + 1
+    end = s.find('"', start)
+    if end < 0:
+        raise MIParseError(f"unterminated c-string: {s!r}")
+
+    # 이스케이프가 없는 일반적인 경우
+    bs = s.find("\\", start, end)
+    if bs < 0:
+        return s[start:end], end + 1
+
+    parts = []
+    octets = None
+    i = start
+
+    while True:
+        if bs < 0 or bs > end:
+            if octets:
+                parts.append(octets.decode("utf-8", "replace"))
+            parts.append(s[i:end])
+            return "".join(parts), end + 1
+
+        if bs > i:
+            if octets:
+                parts.append(octets.decode("utf-8", "replace"))
+                octets = None
+            parts.append(s[i:bs])
+
+        e = s[bs + 1:bs + 2]
+        if "0" <= e <= "7":
+            # \ooo 는 원본 바이트 (UTF-8 조각일 수 있음)
+            j = bs + 1
+            while j < bs + 4 and "0" <= s[j:j + 1] <= "7":
+                j += 1
+            if octets is None:
+                octets = bytearray()
+            octets.append(int(s[bs + 1:j], 8) & 0xFF)
+            i = j
+        else:
+            if not e:
+                raise MIParseError(f"unterminated c-string: {s!r}")
+            if octets:
+                parts.append(octets.decode("utf-8", "replace"))
+                octets = None
+            parts.append(C_ESCAPES.get(e, e))
+            i = bs + 2
+
+        # 이스케이프된 따옴표를 지나쳤으면 닫는 따옴표를 다시 찾음
+        if end < i:
+            end = s.find('"', i)
+            if end < 0:
+                raise MIParseError(f"unterminated c-string: {s!r}")
+        bs = s.find("\\", i, end)
@@ -0,0 +1,648 @@
+import os
+import struct
+import tempfile
+import time
+
+from memory import PAGE_SIZE, MemoryDump, split_chunks
+from phys_read import (
+    CALIBRATE_SIZES, PMEMSAVE_DIR, XP_MAX_QWORDS, PhysReadPlan, parse_xp_qwords,
+    read_pmemsave_file, xp_requests,
+)
+
+# 엔트리에서 다음 테이블/페이지 물리주소 (bit 12..51; NX 등 상위 비트 제외)
+PHYS_ADDR_MASK = 0x000FFFFFFFFFF000
+ENTRIES_PER_TABLE = 512
+
+# 물리 덤프 / 검색 읽기 단위
+PHYS_CHUNK = 1 << 20
+
+# read_phys_many 에서 한 요청으로 합치는 구간 사이 최대 간격
+PHYS_MERGE_GAP = 256
+
+PTE_PRESENT = 1 << 0
+PTE_WRITABLE = 1 << 1
+PTE_USER = 1 << 2
+PTE_PAGE_SIZE = 1 << 7
+PTE_NX = 1 << 63
+
+# 주소 공간 맵의 레벨별 (VA shift, 큰 페이지 이름)
+MAP_LEVELS = ((39, None), (30, "1G"), (21, "2M"), (12, "4K"))
+
+CR0_PG = 1 << 31
+CR4_PAE = 1 << 5
+CR4_LA57 = 1 << 12
+EFER_LMA = 1 << 10
+
+# 권한 문자열 ("RWX (user)" 형식, Page Info의 perm과 같음)
+def perm_string(writable: bool, user: bool, nx: bool) -> str:
+    perm = "R" + ("W" if writable else "-") + ("-" if nx else "X")
+    return perm + (" (user)" if user else " (kernel)")
+
+# 포인터처럼 보이는 값 (canonical 이고 첫 페이지가 아닌 값)
+def looks_like_pointer(val: int) -> bool:
+    top = val >> 47
+    return val >= 0x1000 and (top == 0 or top == 0x1FFFF)
+
+# 상위 16비트 부호 확장 (canonical VA)
+def canonical_va(va: int) -> int:
+    if va & (1 << 47):
+        va |= 0xFFFF000000000000
+    return va
+
+class PageWalkMixin:
+    # read_cr3() / monitor_cmd() 를 제공하는 클라이언트에 x86_64 페이지 워크를 붙여 줌
+
+    # PhysicalMemory (QEMU RAM 파일 mmap) - 있으면 물리 메모리는 gdb/monitor 대신 여기서 읽음
+    phys = None
+
+    # QMPClient (-qmp unix:...) - 있으면 monitor 명령은 gdb 대신 QMP 소켓으로
+    qmp = None
+
+    # xp / pmemsave 선택 (PhysReadPlan, 처음 쓸 때 생성) 과 pmemsave 임시 파일 위치
+    read_plan = None
+    pmemsave_dir = PMEMSAVE_DIR
+
+    # 명령 계측 (CommandStats) - 있으면 xp 텍스트 파싱 시간도 더함
+    stats = None
+
+    # x86_64 페이지 오프셋 추출
+    def split_va(self, va: int):
+        pml4_i = (va >> 39) & 0x1FF
+        pdpt_i = (va >> 30) & 0x1FF
+        pd_i   = (va >> 21) & 0x1FF
+        pt_i   = (va >> 12) & 0x1FF
+        offset = va & 0xFFF
+        return pml4_i, pdpt_i, pd_i, pt_i, offset
+
+    # x86_64 페이지 엔트리 플래그 추출
+    def parse_pte_flags(self, entry: int) -> dict:
+        flags = {
+            "present":      bool(entry & (1 << 0)),
+            "writable":     bool(entry & (1 << 1)),
+            "user":         bool(entry & (1 << 2)),
+            "write_through":bool(entry & (1 << 3)),
+            "cache_disable":bool(entry & (1 << 4)),
+            "accessed":     bool(entry & (1 << 5)),
+            "dirty":        bool(entry & (1 << 6)),
+            "page_size":    bool(entry & (1 << 7)),
+            "global":       bool(entry & (1 << 8)),
+            "nx":           bool(entry & (1 << 63)),
+        }
+        return flags
+
+    # 제어 레지스터로 본 페이징 모드가 4-level 워크 대상이 아니면 이유 문자열 (모르면 None)
+    def paging_unsupported(self, regs):
+        cr0, cr4, efer = regs.get("cr0"), regs.get("cr4"), regs.get("efer")
+        if cr0 is not None and not cr0 & CR0_PG:
+            return "paging disabled (CR0.PG=0)"
+        if cr4 is not None and cr4 & CR4_LA57:
+            return "5-level paging (CR4.LA57) is not supported"
+        if cr4 is not None and not cr4 & CR4_PAE:
+            return "32-bit paging (CR4.PAE=0) is not supported"
+        if efer is not None and not efer & EFER_LMA:
+            return "PAE paging without long mode (EFER.LMA=0) is not supported"
+        return None
+
+    # Registers + CR3 (+ 테이블/엔트리 선읽기) 를 한 번에 읽기 - 백엔드가 더 빠른 경로를 제공하면 override
+    #   -> (regs, cr3, {테이블 주소: 엔트리 목록}, {엔트리 주소: 값})
+    def read_state(self, prefetch_tables=(), prefetch_qwords=()):
+        return (self.read_registers(), self.read_cr3()) + self.read_prefetch(prefetch_tables, prefetch_qwords)
+
+    # 선읽기 (실패한 항목은 빼고 돌려줌 - 워크에서 다시 읽음)
+    def read_prefetch(self, prefetch_tables=(), prefetch_qwords=()):
+        tables = self.read_phys_tables(prefetch_tables) if prefetch_tables else {}
+        qwords = self.read_phys_qword_many(prefetch_qwords) if prefetch_qwords else {}
+        return tables, qwords
+
+    # 물리 메모리 [pa, pa + size) 읽기 - 페이지 워크 / 물리 덤프 / 검색은 모두 여기를 거침
+    #   RAM 파일(phys) 이 있으면 mmap, 없으면 작은 읽기는 xp /Ngx, 큰 읽기는 pmemsave
+    #   (xp/pmemsave 교차점은 처음 큰 읽기를 할 때 실측으로 정함 - calibrate_phys_reads)
+    def read_phys_bytes(self, pa: int, size: int) -> bytes:
+        if size <= 0:
+            return b""
+        if self.phys is not None and self.phys.contains(pa, size):
+            return self.phys.read(pa, size)
+
+        plan = self.phys_read_plan()
+        if size > XP_MAX_QWORDS * 8 and not plan.calibrated:
+            self.calibrate_phys_reads()
+
+        if plan.use_pmemsave(size):
+            try:
+                return self.read_phys_pmemsave(pa, size)
+            except RuntimeError:
+                pass
+        return self.read_phys_xp(pa, size)
+
+    def phys_read_plan(self) -> PhysReadPlan:
+        if self.read_plan is None:
+            self.read_plan = PhysReadPlan()
+        return self.read_plan
+
+    # xp /Ngx 로 읽기 (정렬되지 않은 구간은 앞뒤 qword까지 읽고 잘라냄)
+    def read_phys_xp(self, pa: int, size: int) -> bytes:
+        data = self.read_phys_xp_many([(pa, size)])[0]
+        if isinstance(data, Exception):
+            raise data
+        return data
+
+    # 작은 구간 여러 개를 xp 한 배치로 -> 구간마다 bytes 또는 Exception
+    def read_phys_xp_many(self, ranges) -> list:
+        plans = [xp_requests(pa, size) for pa, size in ranges]
+        vals = iter(self.read_xp_many([req for _, reqs in plans for req in reqs]))
+
+        out = []
+        for (pa, size), (base, reqs) in zip(ranges, plans):
+            parts = [next(vals) for _ in reqs]
+            error = next((part for part in parts if isinstance(part, Exception)), None)
+            if error is not None:
+                out.append(error)
+                continue
+            data = b"".join(struct.pack(f"<{len(part)}Q", *part) for part in parts)
+            out.append(data[pa - base:pa - base + size])
+        return out
+
+    # 작은 구간 여러 개 (레지스터가 가리키는 바이트 등) -> 구간마다 bytes 또는 Exception
+    #   가까운 구간 (사이가 PHYS_MERGE_GAP 이하, 합쳐서 4KB 이하) 은 한 요청으로 합쳐 읽고 나눠 줌
+    def read_phys_many(self, ranges) -> list:
+        ranges = list(ranges)
+        if self.phys is None:
+            merged = []
+            for index in sorted(range(len(ranges)), key=lambda i: ranges[i][0]):
+                pa, size = ranges[index]
+                if merged:
+                    start, end, members = merged[-1]
+                    if pa - end <= PHYS_MERGE_GAP and max(end, pa + size) - start <= PAGE_SIZE:
+                        merged[-1] = (start, max(end, pa + size), members + [index])
+                        continue
+                merged.append((pa, pa + size, [index]))
+
+            out = [None] * len(ranges)
+            datas = self.read_phys_xp_many([(start, end - start) for start, end, _ in merged])
+            for (start, _end, members), data in zip(merged, datas):
+                for index in members:
+                    pa, size = ranges[index]
+                    out[index] = data if isinstance(data, Exception) else data[pa - start:pa - start + size]
+            return out
+
+        out = []
+        for pa, size in ranges:
+            try:
+                out.append(self.phys.read(pa, size))
+            except RuntimeError as e:
+                out.append(e)
+        return out
+
+    # 엔트리 여러 개 -> {물리주소: 값} (읽지 못한 것은 빠짐)
+    def read_phys_qword_many(self, pas) -> dict:
+        pas = list(pas)
+        return {
+            pa: int.from_bytes(data, "little")
+            for pa, data in zip(pas, self.read_phys_many([(pa, 8) for pa in pas]))
+            if not isinstance(data, Exception)
+        }
+
+    # xp 여러 개 -> 요청마다 qword 목록 또는 Exception
+    #   백엔드가 여러 요청을 한 번에 보낼 수 있으면 override
+    def read_xp_many(self, reqs) -> list:
+        if self.qmp is not None:
+            texts = self.qmp.hmp_many([f"xp /{count}gx {pa:#x}" for pa, count in reqs])
+            return [
+                text if isinstance(text, Exception) else self.try_parse_xp(text, pa, count)
+                for (pa, count), text in zip(reqs, texts)
+            ]
+
+        results = []
+        for pa, count in reqs:
+            try:
+                results.append(self.parse_xp_qwords(self.monitor_cmd(f"xp /{count}gx {pa:#x}"), pa, count))
+            except RuntimeError as e:
+                results.append(e)
+        return results
+
+    # pmemsave 로 임시 파일에 쓰게 한 뒤 mmap 해서 읽기 (QEMU 와 같은 호스트여야 함)
+    #   monitor 가 오류를 돌려주거나 (QMP error 포함) 파일을 못 읽으면 이후에는 pmemsave 를 쓰지 않음
+    def read_phys_pmemsave(self, pa: int, size: int) -> bytes:
+        fd, path = tempfile.mkstemp(prefix="qvhd-pmem-", dir=self.pmemsave_dir)
+        os.close(fd)
+        try:
+            if self.qmp is not None:
+                self.qmp.pmemsave(pa, size, path)
+            else:
+                out = self.monitor_cmd(f'pmemsave {pa:#x} {size} "{path}"').strip()
+                if out:
+                    raise RuntimeError(f"pmemsave 0x{pa:x}+0x{size:x}: {out}")
+            return read_pmemsave_file(path, size)
+        except (OSError, RuntimeError) as e:
+            self.phys_read_plan().disable_pmemsave()
+            raise RuntimeError(str(e)) from None
+        finally:
+            os.remove(path)
+
+    # xp / pmemsave 를 두 크기씩 읽어 보고 교차점 계산
+    def calibrate_phys_reads(self, pa: int = 0) -> PhysReadPlan:
+        plan = self.phys_read_plan()
+        plan.calibrated = True
+
+        def timed(read, size):
+            t0 = time.perf_counter()
+            read(pa, size)
+            return size, time.perf_counter() - t0
+
+        try:
+            plan.fit("xp", [timed(self.read_phys_xp, size) for size in CALIBRATE_SIZES])
+        except RuntimeError:
+            return plan
+
+        if plan.pmemsave_ok:
+            try:
+                plan.fit("pmemsave", [timed(self.read_phys_pmemsave, size) for size in CALIBRATE_SIZES])
+            except RuntimeError:
+                plan.disable_pmemsave()
+        plan.update_threshold()
+        return plan
+
+    # 물리 메모리 qword 여러 개
+    def read_phys_qwords(self, phys_addr: int, count: int) -> list:
+        return list(struct.unpack(f"<{count}Q", self.read_phys_bytes(phys_addr, 8 * count)))
+
+    # "addr: 0x... 0x..." 줄들에서 값만 추출
+    def parse_xp_qwords(self, text: str, phys_addr: int, count: int) -> list:
+        stats = self.stats
+        if stats is None:
+            return parse_xp_qwords(text, phys_addr, count)
+        t0 = time.perf_counter()
+        try:
+            return parse_xp_qwords(text, phys_addr, count)
+        finally:
+            stats.add_parse("xp", time.perf_counter() - t0)
+
+    # 파싱 실패는 Exception 으로 돌려줌 (pipeline 결과 목록용)
+    def try_parse_xp(self, text: str, phys_addr: int, count: int):
+        try:
+            return self.parse_xp_qwords(text, phys_addr, count)
+        except RuntimeError as e:
+            return e
+
+    # 물리 메모리 덤프 (주소가 PA 인 MemoryDump)
+    #   chunk 단위로 읽고, 실패한 chunk 는 page 단위로 다시 읽고, 그래도 실패한 page 는 구멍으로 남김
+    #   cancel: chunk 사이마다 호출, True면 RuntimeError("cancelled")
+    def read_phys_dump(self, pa: int, size: int, chunk: int = PHYS_CHUNK, cancel=None) -> MemoryDump:
+        dump = MemoryDump(pa, size)
+        for addr, n in split_chunks(pa, size, chunk):
+            if cancel is not None and cancel():
+                raise RuntimeError("cancelled")
+            try:
+                dump.fill(addr, self.read_phys_bytes(addr, n))
+                continue
+            except RuntimeError:
+                pass
+            for page, m in split_chunks(addr, n, PAGE_SIZE):
+                try:
+                    dump.fill(page, self.read_phys_bytes(page, m))
+                except RuntimeError:
+                    continue
+        return dump.finish()
+
+    # 물리 메모리에서 바이트 패턴 찾기 -> 찾은 PA 목록 (limit 개까지)
+    #   chunk 단위로 읽고, 경계에 걸친 패턴은 앞 chunk 의 끝 (len - 1 바이트) 를 붙여서 찾음
+    #   읽지 못한 chunk 는 건너뜀, progress(읽은 바이트, 전체) 는 chunk 마다 호출
+    def search_phys(self, pattern: bytes, pa: int, size: int, limit: int = 256,
+                    chunk: int = PHYS_CHUNK, cancel=None, progress=None) -> list:
+        if not pattern:
+            raise ValueError("empty search pattern")
+
+        hits = []
+        tail = b""
+        for addr, n in split_chunks(pa, size, chunk):
+            if cancel is not None and cancel():
+                raise RuntimeError("cancelled")
+            try:
+                data = self.read_phys_bytes(addr, n)
+            except RuntimeError:
+                tail = b""
+                continue
+
+            buf = tail + data
+            base = addr - len(tail)
+            pos = buf.find(pattern)
+            while pos >= 0:
+                hits.append(base + pos)
+                if len(hits) >= limit:
+                    return hits
+                pos = buf.find(pattern, pos + 1)
+
+            keep = len(pattern) - 1
+            tail = buf[-keep:] if keep else b""
+            if progress is not None:
+                progress(addr + n - pa, size)
+        return hits
+
+    # 페이지 테이블 1개 (4KB, 512 엔트리) 통째로 읽기
+    def read_phys_table(self, table_pa: int) -> list:
+        return self.read_phys_qwords(table_pa & PHYS_ADDR_MASK, ENTRIES_PER_TABLE)
+
+    # 페이지 테이블 여러 개 읽기 -> {주소: 엔트리 목록} (읽지 못한 테이블은 빠짐)
+    #   백엔드가 여러 요청을 한 번에 보낼 수 있으면 override
+    def read_phys_tables(self, table_pas) -> dict:
+        if self.phys is None and not self.phys_read_plan().use_pmemsave(ENTRIES_PER_TABLE * 8):
+            # xp 여러 개를 한 배치로 (백엔드가 pipeline 으로 보냄, 테이블 크기에서 pmemsave 가 더 빠르면 하나씩 pmemsave)
+            table_pas = list(table_pas)
+            reqs = [(pa & PHYS_ADDR_MASK, ENTRIES_PER_TABLE) for pa in table_pas]
+            return {
+                pa: vals for pa, vals in zip(table_pas, self.read_xp_many(reqs))
+                if not isinstance(vals, Exception)
+            }
+
+        tables = {}
+        for pa in table_pas:
+            try:
+                tables[pa] = self.read_phys_table(pa)
+            except RuntimeError:
+                pass
+        return tables
+
+    # 이전 워크에서 읽은 테이블 주소 (스텝 후에도 같은 테이블을 지나는 경우가 대부분)
+    def walk_table_addrs(self, info) -> list:
+        if not isinstance(info, dict) or not isinstance(info.get("tables"), dict):
+            return []
+        return [pa for pa, _ in info["tables"].values()]
+
+    # VA 1개 페이지 워크
+    #   tables: {테이블 물리주소: 엔트리 목록} - 여러 VA를 연달아 볼 때 공유하면 테이블당 1회만 읽음
+    #   cache: PageTableCache - generation 단위 테이블 캐시 + VA->PA 변환 캐시
+    def inspect_va(self, va: int, cr3: int = None, tables: dict = None, cache=None) -> dict:
+        # CR3
+        if cr3 is None:
+            cr3 = self.read_cr3()
+
+        if cache is not None:
+            cached = cache.get_translation(cr3, va, self.read_phys_qword)
+            if cached is not None:
+                return cached
+
+        result = self.walk_va(va, cr3, {} if tables is None else tables, cache)
+
+        if cache is not None:
+            cache.put_translation(cr3, va, result)
+        return result
+
+    def walk_va(self, va: int, cr3: int, tables: dict, cache=None) -> dict:
+        def table_at(table_pa):
+            entries = tables.get(table_pa)
+            if entries is None and cache is not None:
+                entries = cache.get_table(cr3, table_pa)
+            if entries is None:
+                entries = self.read_phys_table(table_pa)
+                if cache is not None:
+                    cache.put_table(cr3, table_pa, entries)
+            tables[table_pa] = entries
+            return entries
+
+        pml4_i, pdpt_i, pd_i, pt_i, offset = self.split_va(va)
+
+        result = {
+            "va": va,
+            "cr3": cr3,
+            "pml4_index": pml4_i,
+            "pdpt_index": pdpt_i,
+            "pd_index": pd_i,
+            "pt_index": pt_i,
+            "offset": offset,
+        }
+
+        # 워크 중 읽은 테이블 (UI에서 주변 엔트리 표시용)
+        walked = {}
+        result["tables"] = walked
+
+        # PML4
+        pml4_phys = cr3 & PHYS_ADDR_MASK
+        walked["pml4"] = (pml4_phys, table_at(pml4_phys))
+        pml4_entry = walked["pml4"][1][pml4_i]
+        result["pml4_entry"] = pml4_entry
+
+        if not (pml4_entry & 1):
+            result["level"] = "pml4"
+            result["present"] = False
+            result["page_size"] = None
+            return result
+
+        # PDPT
+        pdpt_phys = pml4_entry & PHYS_ADDR_MASK
+        walked["pdpt"] = (pdpt_phys, table_at(pdpt_phys))
+        pdpt_entry = walked["pdpt"][1][pdpt_i]
+        result["pdpt_entry"] = pdpt_entry
+
+        if not (pdpt_entry & 1):
+            result["level"] = "pdpt"
+            result["present"] = False
+            result["page_size"] = None
+            return result
+
+        if pdpt_entry & (1 << 7):
+            page_base = pdpt_entry & PHYS_ADDR_MASK & ~((1 << 30) - 1)
+            phys_addr = page_base + (va & ((1 << 30) - 1))
+            result["level"] = "1G"
+            result["present"] = True
+            result["page_size"] = "1G"
+            result["page_phys"] = page_base
+            result["phys_addr"] = phys_addr
+            result["flags"] = self.parse_pte_flags(pdpt_entry)
+            return result
+
+        # PD
+        pd_phys = pdpt_entry & PHYS_ADDR_MASK
+        walked["pd"] = (pd_phys, table_at(pd_phys))
+        pd_entry = walked["pd"][1][pd_i]
+        result["pd_entry"] = pd_entry
+
+        if not (pd_entry & 1):
+            result["level"] = "pd"
+            result["present"] = False
+            result["page_size"] = None
+            return result
+
+        if pd_entry & (1 << 7):
+            page_base = pd_entry & PHYS_ADDR_MASK & ~((1 << 21) - 1)
+            phys_addr = page_base + (va & ((1 << 21) - 1))
+            result["level"] = "2M"
+            result["present"] = True
+            result["page_size"] = "2M"
+            result["page_phys"] = page_base
+            result["phys_addr"] = phys_addr
+            result["flags"] = self.parse_pte_flags(pd_entry)
+            return result
+
+        # PT
+        pt_phys = pd_entry & PHYS_ADDR_MASK
+        walked["pt"] = (pt_phys, table_at(pt_phys))
+        pt_entry = walked["pt"][1][pt_i]
+        result["pt_entry"] = pt_entry
+
+        if not (pt_entry & 1):
+            result["level"] = "pt"
+            result["present"] = False
+            result["page_size"] = None
+            return result
+
+        # 최종 4KB 페이지
+        page_base = pt_entry & PHYS_ADDR_MASK
+        phys_addr = page_base + offset
+
+        result["level"] = "4K"
+        result["present"] = True
+        result["page_size"] = "4K"
+        result["page_phys"] = page_base
+        result["phys_addr"] = phys_addr
+        result["flags"] = self.parse_pte_flags(pt_entry)
+
+        return result
+
+    # 여러 VA 변환 -> {va: 워크 결과} (워크에 실패한 VA 는 {"va", "error"})
+    #   VA를 정렬해 같은 PML4/PDPT/PD 엔트리 아래의 VA 들이 상위 테이블을 함께 쓰게 하고,
+    #   레벨마다 아직 없는 테이블을 read_phys_tables 한 번으로 읽음 (레벨당 1 배치, 최대 4번)
+    #   cache: 캐시된 변환은 leaf 엔트리만 한 배치로 다시 읽어 검증
+    def translate_many(self, vas, cr3: int = None, tables: dict = None, cache=None) -> dict:
+        if cr3 is None:
+            cr3 = self.read_cr3()
+        if tables is None:
+            tables = {}
+        vas = sorted(set(vas))
+
+        results = {}
+        if cache is not None:
+            leaves = [cache.leaf_addr(cr3, va) for va in vas]
+            need = [pa for pa in dict.fromkeys(leaves) if pa is not None and pa not in cache.qwords]
+            if need:
+                cache.put_qwords(self.read_phys_qword_many(need))
+            for va in vas:
+                info = cache.get_translation(cr3, va, self.read_phys_qword)
+                if info is not None:
+                    results[va] = info
+
+        pending = [va for va in vas if va not in results]
+
+        # 레벨별로 각 VA 가 다음에 읽을 테이블
+        frontier = {va: cr3 & PHYS_ADDR_MASK for va in pending}
+        for level, (shift, page_size) in enumerate(MAP_LEVELS):
+            missing = []
+            for table_pa in dict.fromkeys(frontier.values()):
+                if table_pa in tables:
+                    continue
+                entries = cache.get_table(cr3, table_pa) if cache is not None else None
+                if entries is not None:
+                    tables[table_pa] = entries
+                else:
+                    missing.append(table_pa)
+
+            if missing:
+                fetched = self.read_phys_tables(missing)
+                tables.update(fetched)
+                if cache is not None:
+                    for table_pa, entries in fetched.items():
+                        cache.put_table(cr3, table_pa, entries)
+
+            below = {}
+            for va, table_pa in frontier.items():
+                entries = tables.get(table_pa)
+                if entries is None or level == len(MAP_LEVELS) - 1:
+                    continue
+                entry = entries[(va >> shift) & 0x1FF]
+                if entry & PTE_PRESENT and not (page_size and entry & PTE_PAGE_SIZE):
+                    below[va] = entry & PHYS_ADDR_MASK
+            frontier = below
+
+        # 필요한 테이블은 모두 tables 에 있으므로 워크는 더 읽지 않음 (못 읽은 테이블만 다시 시도)
+        for va in pending:
+            try:
+                info = self.walk_va(va, cr3, tables, cache)
+            except RuntimeError as e:
+                results[va] = {"va": va, "error": str(e)}
+                continue
+            if cache is not None:
+                cache.put_translation(cr3, va, info)
+            results[va] = info
+        return results
+
+    # 주소 공간 전체 맵: present 엔트리만 따라 내려가며 매핑 구간을 VA 순서대로 생성
+    #   -> (va_start, va_end, pa_start, perm, page_size), va_end는 포함하지 않음
+    #   같은 권한 / 같은 페이지 크기 / 물리 주소가 이어지는 페이지는 한 구간으로 합침
+    def walk_address_space(self, cr3: int = None):
+        if cr3 is None:
+            cr3 = self.read_cr3()
+
+        run = None
+        for va, pa, size, perm, page_size in self.iter_leaf_pages(cr3):
+            if (
+                run is not None
+                and run[1] == va
+                and run[3] == perm
+                and run[4] == page_size
+                and run[2] + (run[1] - run[0]) == pa
+            ):
+                run[1] = va + size
+                continue
+
+            if run is not None:
+                yield tuple(run)
+            run = [va, va + size, pa, perm, page_size]
+
+        if run is not None:
+            yield tuple(run)
+
+    # present leaf 엔트리 -> (va, pa, 크기, perm, 페이지 크기 이름)
+    #   한 테이블의 하위 테이블들은 read_phys_tables로 한 번에 읽음
+    #   테이블은 그 아래를 다 돌면 버림 (들고 있는 것은 지금 경로의 테이블과 그 형제들뿐)
+    def iter_leaf_pages(self, cr3: int):
+        tables = {}
+
+        def fetch(pas):
+            missing = [pa for pa in dict.fromkeys(pas) if pa not in tables]
+            if missing:
+                tables.update(self.read_phys_tables(missing))
+
+        pml4_pa = cr3 & PHYS_ADDR_MASK
+        fetch([pml4_pa])
+        if pml4_pa not in tables:
+            raise RuntimeError(f"failed to read PML4 at 0x{pml4_pa:x}")
+
+        # 상위 레벨 권한 누적: W/U는 모든 레벨에서 허용돼야 하고 NX는 한 레벨만 걸려도 적용
+        yield from self.iter_table_pages(pml4_pa, 0, 0, True, True, False, tables, fetch)
+
+    def iter_table_pages(self, table_pa, level, va_base, writable, user, nx, tables, fetch):
+        # 여러 엔트리가 같은 테이블을 가리키면 앞에서 이미 버렸을 수 있으므로 다시 읽음
+        if table_pa not in tables:
+            fetch([table_pa])
+        entries = tables.get(table_pa)
+        if entries is None:
+            return
+
+        shift, page_size = MAP_LEVELS[level]
+        is_last = level == len(MAP_LEVELS) - 1
+
+        # 하위 테이블 일괄 선읽기
+        if not is_last:
+            fetch([
+                e & PHYS_ADDR_MASK for e in entries
+                if e & PTE_PRESENT and not (page_size and e & PTE_PAGE_SIZE)
+            ])
+
+        for i, entry in enumerate(entries):
+            if not entry & PTE_PRESENT:
+                continue
+
+            va = canonical_va(va_base | (i << shift))
+            w = writable and bool(entry & PTE_WRITABLE)
+            u = user and bool(entry & PTE_USER)
+            x = nx or bool(entry & PTE_NX)
+
+            if is_last or (page_size and entry & PTE_PAGE_SIZE):
+                size = 1 << shift
+                pa = entry & PHYS_ADDR_MASK & ~(size - 1)
+                yield va, pa, size, perm_string(w, u, x), page_size
+            else:
+                yield from self.iter_table_pages(
+                    entry & PHYS_ADDR_MASK, level + 1, va, w, u, x, tables, fetch
+                )
+
+        tables.pop(table_pa, None)
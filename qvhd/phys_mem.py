@@ -0,0 +1,103 @@
+import mmap
+import os
+import struct
+
+from page_walk import ENTRIES_PER_TABLE, PHYS_ADDR_MASK
+
+FOUR_GB = 1 << 32
+
+MACHINES = ("pc", "q35")
+
+# QEMU x86 머신의 게스트 RAM 배치 -> [(pa 시작, pa 끝, 파일 offset), ...]
+#   RAM이 크면 4GB 아래 [below_4g, 4GB) 는 PCI hole 이고, 나머지 RAM은 4GB 부터 이어짐
+#   - pc  : RAM >= 0xE0000000 이면 below_4g = 0xC0000000 (gigabyte_align)
+#   - q35 : RAM >= 0xB0000000 이면 below_4g = 0x80000000
+#   (1MB 아래 VGA/ROM 구간은 파일에는 있지만 게스트에는 장치로 보임 - 페이지 테이블이 놓이지 않으므로 무시)
+def ram_layout(ram_size: int, machine: str = "pc", below_4g: int = None) -> list:
+    if below_4g is None:
+        if machine == "pc":
+            below_4g = 0xC0000000 if ram_size >= 0xE0000000 else ram_size
+        elif machine == "q35":
+            below_4g = 0x80000000 if ram_size >= 0xB0000000 else ram_size
+        else:
+            raise ValueError(f"unknown machine: {machine!r} (expected one of {MACHINES})")
+
+    below_4g = min(below_4g, ram_size)
+    ranges = [(0, below_4g, 0)]
+    if ram_size > below_4g:
+        ranges.append((FOUR_GB, FOUR_GB + ram_size - below_4g, below_4g))
+    return ranges
+
+class PhysicalMemory:
+    # QEMU memory-backend-file(share=on) 의 RAM 파일을 mmap 해서 게스트 물리 메모리를 직접 읽음
+    #   (-object memory-backend-file,id=ram0,size=...,mem-path=<path>,share=on -machine memory-backend=ram0)
+    #   view(): 복사 없는 memoryview 조각 - close() 전에 release 해야 함
+    def __init__(self, path: str, machine: str = "pc", below_4g: int = None, ram_size: int = None) -> None:
+        self.path = path
+        self.f = open(path, "rb")
+        try:
+            if ram_size is None:
+                ram_size = os.fstat(self.f.fileno()).st_size
+            self.mm = mmap.mmap(self.f.fileno(), ram_size, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            self.f.close()
+            raise
+
+        self.ram_size = ram_size
+        self.ranges = ram_layout(ram_size, machine, below_4g)
+        self.mem = memoryview(self.mm)
+
+    # [pa, pa + size) 의 파일 offset (한 RAM 구간 안에 있어야 함)
+    def offset(self, pa: int, size: int = 1) -> int:
+        for start, end, off in self.ranges:
+            if start <= pa and pa + size <= end:
+                return off + (pa - start)
+        raise RuntimeError(f"physical range 0x{pa:x}+0x{size:x} is not guest RAM")
+
+    def contains(self, pa: int, size: int = 1) -> bool:
+        return any(start <= pa and pa + size <= end for start, end, _ in self.ranges)
+
+    def view(self, pa: int, size: int) -> memoryview:
+        off = self.offset(pa, size)
+        return self.mem[off:off + size]
+
+    # RAM 구간 경계를 넘는 읽기도 허용 (RAM 이 아닌 부분은 RuntimeError)
+    def read(self, pa: int, size: int) -> bytes:
+        try:
+            return bytes(self.view(pa, size))
+        except RuntimeError:
+            pass
+
+        out = bytearray()
+        addr, end = pa, pa + size
+        while addr < end:
+            for start, stop, off in self.ranges:
+                if start <= addr < stop:
+                    n = min(stop, end) - addr
+                    out += self.mem[off + addr - start:off + addr - start + n]
+                    addr += n
+                    break
+            else:
+                raise RuntimeError(f"physical address 0x{addr:x} is not guest RAM")
+        return bytes(out)
+
+    def read_qwords(self, pa: int, count: int) -> list:
+        return list(struct.unpack_from(f"<{count}Q", self.mm, self.offset(pa, 8 * count)))
+
+    def read_table(self, table_pa: int) -> list:
+        return self.read_qwords(table_pa & PHYS_ADDR_MASK, ENTRIES_PER_TABLE)
+
+    def close(self) -> None:
+        try:
+            self.mem.release()
+            self.mm.close()
+        except BufferError:
+            # 밖에서 아직 view 를 잡고 있으면 mmap 은 GC 에 맡김
+            pass
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
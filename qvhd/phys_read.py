@@ -0,0 +1,119 @@
+import math
+import mmap
+import os
+import re
+
+# xp 한 번에 읽는 최대 qword 수 (4KB, 페이지 테이블 1개)
+XP_MAX_QWORDS = 512
+
+# 보정 전 기본 교차점 (이 크기 이상이면 pmemsave)
+PMEMSAVE_MIN = 64 * 1024
+
+# 보정에 쓰는 두 크기 (고정 비용 / 바이트당 비용을 맞추는 데 사용)
+CALIBRATE_SIZES = (4096, 256 * 1024)
+
+# pmemsave 임시 파일 위치 (tmpfs가 있으면 디스크를 거치지 않음)
+PMEMSAVE_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+# QEMU memory_dump() 의 값 토큰 ("0000000000001000: 0x... 0x..." 에서 주소 열은 0x 가 없음)
+XP_VALUE_RE = re.compile(r"0x([0-9a-fA-F]+)")
+
+# "xp /Ngx" 출력 -> qword 목록
+def parse_xp_qwords(text: str, phys_addr: int, count: int) -> list:
+    vals = [int(tok, 16) for tok in XP_VALUE_RE.findall(text)]
+    if len(vals) != count:
+        raise RuntimeError(
+            f"xp returned {len(vals)}/{count} qwords at 0x{phys_addr:x}: {text[:80]!r}"
+        )
+    return vals
+
+# [pa, pa + size) 를 xp 명령 단위 (8바이트 정렬 시작, XP_MAX_QWORDS 이하) 로 나눔
+#   -> (정렬된 시작 주소, [(pa, count), ...])
+def xp_requests(pa: int, size: int):
+    base = pa & ~7
+    total = (pa + size - base + 7) // 8
+    reqs = []
+    for i in range(0, total, XP_MAX_QWORDS):
+        reqs.append((base + 8 * i, min(XP_MAX_QWORDS, total - i)))
+    return base, reqs
+
+# QEMU가 pmemsave로 쓴 파일을 mmap 해서 읽음
+#   파일이 짧으면 QEMU가 다른 호스트/파일시스템에 쓴 것 - OSError
+def read_pmemsave_file(path: str, size: int) -> bytes:
+    with open(path, "rb") as f:
+        have = os.fstat(f.fileno()).st_size
+        if have < size:
+            raise OSError(f"pmemsave wrote {have}/{size} bytes to {path} (QEMU on another host?)")
+        with mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ) as mm:
+            return mm[:size]
+
+class PhysReadPlan:
+    # 물리 메모리 읽기 방법 선택 (xp /Ngx vs pmemsave)
+    #   방법마다 비용 = 고정 비용 + 바이트당 비용 으로 보고 두 크기 실측으로 맞춤 -> 싼 쪽을 고름
+    #   보정 전에는 PMEMSAVE_MIN 기준, pmemsave 가 안 되면 (QEMU가 다른 호스트 등) xp만 사용
+    def __init__(self) -> None:
+        self.costs = {}
+        self.threshold = PMEMSAVE_MIN
+        self.limit = None
+        self.calibrated = False
+        self.pmemsave_ok = True
+
+    # samples: [(크기, 초), (크기, 초)]
+    def fit(self, method: str, samples) -> None:
+        (s1, t1), (s2, t2) = samples
+        per_byte = max(0.0, (t2 - t1) / (s2 - s1))
+        fixed = max(0.0, t1 - per_byte * s1)
+        self.costs[method] = (fixed, per_byte)
+
+    def cost(self, method: str, size: int) -> float:
+        fixed, per_byte = self.costs[method]
+        return fixed + per_byte * size
+
+    # 두 비용 직선의 교차점으로 pmemsave 를 쓸 크기 구간 [threshold, limit) 을 정함
+    #   pmemsave 가 바이트당 더 싸면 교차점 이상, 더 비싸면 교차점 미만에서만 pmemsave
+    #   모든 크기에서 더 싸면 threshold 0 / limit None, 어디서도 더 싸지 않으면 threshold None
+    def update_threshold(self) -> None:
+        if not self.pmemsave_ok or "xp" not in self.costs or "pmemsave" not in self.costs:
+            return
+        xp_fixed, xp_byte = self.costs["xp"]
+        pm_fixed, pm_byte = self.costs["pmemsave"]
+        self.threshold, self.limit = 0, None
+
+        if pm_byte == xp_byte:
+            if pm_fixed >= xp_fixed:
+                self.threshold = None
+            return
+
+        cross = (pm_fixed - xp_fixed) / (xp_byte - pm_byte)
+        if pm_byte < xp_byte:
+            self.threshold = max(0, math.ceil(cross))
+        elif cross <= 0:
+            self.threshold = None
+        else:
+            self.limit = math.ceil(cross)
+
+    def disable_pmemsave(self) -> None:
+        self.pmemsave_ok = False
+        self.threshold = None
+
+    def use_pmemsave(self, size: int) -> bool:
+        return (
+            self.pmemsave_ok and self.threshold is not None and size >= self.threshold
+            and (self.limit is None or size < self.limit)
+        )
+
+    def summary(self) -> str:
+        parts = []
+        for method in ("xp", "pmemsave"):
+            if method in self.costs:
+                fixed, per_byte = self.costs[method]
+                parts.append(f"{method} {fixed * 1e3:.2f} ms + {per_byte * 1e9:.1f} ms/MB")
+        if not self.pmemsave_ok:
+            choice = "xp only (pmemsave unavailable)"
+        elif self.threshold is None:
+            choice = "xp only"
+        elif self.limit is not None:
+            choice = f"pmemsave < {self.limit} bytes"
+        else:
+            choice = f"pmemsave >= {self.threshold} bytes"
+        return ", ".join(parts + [choice])
@@ -0,0 +1,84 @@
+from collections import Counter
+
+from memory import PAGE_SIZE
+
+# 집계 기준 - page: RIP가 속한 4K 페이지, sym: 심볼 (모르면 page)
+PROFILE_KEYS = ("page", "sym")
+
+class PCProfile:
+    # RIP/CR3 샘플 모음 (통계적 PC 샘플링)
+    #   counts: Counter {(cr3, rip): 횟수} - 집계 기준은 보고할 때 정함
+    #   symbols: {rip: 심볼 이름} (sym 기준일 때 샘플링이 끝난 뒤 한 번에 조회)
+    def __init__(self, seconds: float, hz: float, key: str = "page") -> None:
+        if key not in PROFILE_KEYS:
+            raise ValueError(f"unknown profile key: {key!r} (expected one of {PROFILE_KEYS})")
+        self.seconds = seconds
+        self.hz = hz
+        self.key = key
+
+        self.counts = Counter()
+        self.samples = 0
+        self.symbols = {}
+
+        # 게스트를 멈춘 시간 합 (stop -> read -> resume)
+        self.pause_total = 0.0
+        self.elapsed = 0.0
+        self.done = False
+
+        # 다른 이유로 멈춰서 중단된 경우 그 이유
+        self.stopped_by = None
+
+    def add(self, rip, cr3, pause: float = 0.0) -> None:
+        if rip is None:
+            return
+        self.counts[(cr3, rip)] += 1
+        self.samples += 1
+        self.pause_total += pause
+
+    @property
+    def achieved_hz(self) -> float:
+        return self.samples / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def avg_pause(self) -> float:
+        return self.pause_total / self.samples if self.samples else 0.0
+
+    def rips(self) -> set:
+        return {rip for _, rip in self.counts}
+
+    def where(self, rip: int) -> str:
+        if self.key == "sym":
+            name = self.symbols.get(rip)
+            if name is not None:
+                return name
+        return f"0x{rip - rip % PAGE_SIZE:x}"
+
+    # (cr3, where) 기준으로 합친 Counter
+    def aggregate(self) -> Counter:
+        agg = Counter()
+        for (cr3, rip), count in self.counts.items():
+            agg[(cr3, self.where(rip))] += count
+        return agg
+
+    # 많이 나온 순서 [(횟수, cr3, where), ...]
+    def hot(self, n: int = None) -> list:
+        return [(count, cr3, where) for (cr3, where), count in self.aggregate().most_common(n)]
+
+    def summary(self) -> str:
+        text = (
+            f"{self.samples} samples in {self.elapsed:.2f}s, "
+            f"{self.achieved_hz:.1f} Hz achieved / {self.hz:g} Hz requested, "
+            f"pause avg {self.avg_pause * 1e3:.2f} ms"
+        )
+        if self.stopped_by:
+            text += f" (stopped: {self.stopped_by})"
+        return text
+
+    # folded-stack 텍스트 (flamegraph.pl 입력 형식: "프레임;프레임 횟수")
+    #   스택은 없으므로 프로세스(CR3) ; 위치 두 단계
+    def folded(self) -> str:
+        lines = []
+        for count, cr3, where in self.hot():
+            proc = "cr3=N/A" if cr3 is None else f"cr3=0x{cr3:x}"
+            lines.append(f"{proc};{where} {count}")
+        return "\n".join(lines) + ("\n" if lines else "")
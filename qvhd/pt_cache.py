@@ -0,0 +1,143 @@
+from collections import OrderedDict
+
+from page_walk import PHYS_ADDR_MASK
+
+PAGE_BYTES = {"4K": 1 << 12, "2M": 1 << 21, "1G": 1 << 30}
+
+class PageTableCache:
+    # 페이지 테이블 / VA->PA 변환 캐시
+    #   - 키: (CR3, 테이블 물리주소) / (CR3, VA 페이지 번호)
+    #   - generation: 게스트가 실행(step/continue)될 때마다 증가
+    #   - 테이블은 같은 generation 안에서만 유효
+    #   - 변환은 generation이 바뀌면 leaf 엔트리 1개만 다시 읽어 비교 후 재사용
+    def __init__(self, max_tables: int = 512, max_translations: int = 4096) -> None:
+        self.max_tables = max_tables
+        self.max_translations = max_translations
+
+        self.generation = 0
+        self.tables = OrderedDict()
+        self.translations = OrderedDict()
+
+        # 현재 generation에서 이미 읽은 엔트리 {물리주소: 값}
+        self.qwords = {}
+
+        self.stats = {
+            "table_hits": 0,
+            "table_misses": 0,
+            "hits": 0,
+            "revalidated": 0,
+            "misses": 0,
+            "evictions": 0,
+        }
+
+    # 게스트 실행 후 호출
+    def bump(self) -> None:
+        self.generation += 1
+        self.qwords.clear()
+
+    def clear(self) -> None:
+        self.tables.clear()
+        self.translations.clear()
+        self.qwords.clear()
+
+    # 테이블 캐시
+    def get_table(self, cr3: int, table_pa: int):
+        key = (cr3 & PHYS_ADDR_MASK, table_pa)
+        item = self.tables.get(key)
+        if item is None or item[0] != self.generation:
+            self.stats["table_misses"] += 1
+            return None
+
+        self.tables.move_to_end(key)
+        self.stats["table_hits"] += 1
+        return item[1]
+
+    def put_table(self, cr3: int, table_pa: int, entries) -> None:
+        key = (cr3 & PHYS_ADDR_MASK, table_pa)
+        self.tables[key] = (self.generation, entries)
+        self.tables.move_to_end(key)
+        self.evict(self.tables, self.max_tables)
+
+    # 현재 generation에서 미리 읽어 둔 엔트리 등록
+    def put_qwords(self, qwords: dict) -> None:
+        self.qwords.update(qwords)
+
+    # 변환 캐시 조회 (필요하면 leaf 엔트리를 read_qword로 다시 읽어 검증)
+    def get_translation(self, cr3: int, va: int, read_qword):
+        key = (cr3 & PHYS_ADDR_MASK, va >> 12)
+        item = self.translations.get(key)
+        if item is None:
+            self.stats["misses"] += 1
+            return None
+
+        gen, info, leaf_pa, leaf_entry = item
+        if gen != self.generation:
+            current = self.qwords.get(leaf_pa)
+            if current is None:
+                current = read_qword(leaf_pa)
+                self.qwords[leaf_pa] = current
+
+            if current != leaf_entry:
+                del self.translations[key]
+                self.stats["misses"] += 1
+                return None
+
+            item[0] = self.generation
+            self.stats["revalidated"] += 1
+        else:
+            self.stats["hits"] += 1
+
+        self.translations.move_to_end(key)
+        return self.rebase(info, va)
+
+    def put_translation(self, cr3: int, va: int, info: dict) -> None:
+        leaf = self.leaf_of(info)
+        if leaf is None:
+            return
+
+        key = (cr3 & PHYS_ADDR_MASK, va >> 12)
+        self.translations[key] = [self.generation, info, leaf[0], leaf[1]]
+        self.translations.move_to_end(key)
+        self.evict(self.translations, self.max_translations)
+
+    # 캐시된 변환의 leaf 엔트리 주소 (다음 refresh 때 레지스터와 같이 선읽기)
+    def leaf_addr(self, cr3: int, va: int):
+        item = self.translations.get((cr3 & PHYS_ADDR_MASK, va >> 12))
+        return None if item is None else item[2]
+
+    # 워크 결과에서 마지막으로 읽은 엔트리 (주소, 값)
+    def leaf_of(self, info: dict):
+        tables = info.get("tables")
+        if not tables:
+            return None
+
+        level = list(tables)[-1]
+        table_pa, entries = tables[level]
+        index = info.get(f"{level}_index")
+        if index is None:
+            return None
+        return table_pa + index * 8, entries[index]
+
+    # 같은 4K 페이지 안의 다른 VA로 결과 옮기기
+    def rebase(self, info: dict, va: int) -> dict:
+        out = dict(info)
+        out["va"] = va
+        out["offset"] = va & 0xFFF
+
+        size = PAGE_BYTES.get(out.get("page_size"))
+        if out.get("present") and size is not None and "page_phys" in out:
+            out["phys_addr"] = out["page_phys"] + (va & (size - 1))
+        return out
+
+    def evict(self, od: OrderedDict, limit: int) -> None:
+        while len(od) > limit:
+            od.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def summary(self) -> str:
+        st = self.stats
+        return (
+            f"gen={self.generation} hit={st['hits']} reval={st['revalidated']} "
+            f"miss={st['misses']} tbl={st['table_hits']}/{st['table_misses']} "
+            f"evict={st['evictions']}"
+        )
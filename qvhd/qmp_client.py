@@ -0,0 +1,189 @@
+import collections
+import itertools
+import json
+import socket
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+# 보관하는 최근 이벤트 수 (STOP / RESUME / SHUTDOWN ...)
+EVENT_HISTORY = 64
+
+class QMPError(RuntimeError):
+    # QMP {"error": {"class": ..., "desc": ...}} 응답
+    def __init__(self, cmd: str, error: dict) -> None:
+        self.cmd = cmd
+        self.error_class = error.get("class", "")
+        self.desc = error.get("desc", "")
+        super().__init__(f"QMP error for '{cmd}': {self.error_class}: {self.desc}")
+
+class QMPClient:
+    # QEMU QMP 클라이언트 (-qmp unix:<path>,server=on,wait=off)
+    #   gdb 와 별개의 소켓이라 monitor 명령이 gdb 명령 뒤에 줄 서지 않음 (게스트가 running 이어도 동작)
+    #   명령마다 id 를 붙이고 reader thread 가 응답을 Future 로 전달 -> 여러 명령을 pipeline 으로 보낼 수 있음
+    def __init__(self, path: str, timeout: float = 5.0) -> None:
+        self.path = path
+        self.timeout = timeout
+
+        self.sock = None
+        self.reader = None
+        self.greeting = None
+
+        self.ids = itertools.count(1)
+        self.pending = {}
+        self.pending_lock = threading.Lock()
+        self.write_lock = threading.Lock()
+
+        # 비동기 이벤트 (최근 EVENT_HISTORY 개)
+        self.events = collections.deque(maxlen=EVENT_HISTORY)
+
+    @property
+    def target(self) -> str:
+        return f"unix:{self.path}"
+
+    def connect(self) -> None:
+        if self.sock is not None:
+            return
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.path)
+            rfile = sock.makefile("rb")
+            line = rfile.readline()
+        except OSError:
+            sock.close()
+            raise
+
+        try:
+            self.greeting = json.loads(line)["QMP"]
+        except (ValueError, KeyError, TypeError):
+            sock.close()
+            raise RuntimeError(f"not a QMP socket: {self.path} ({line[:80]!r})") from None
+
+        # 응답 대기는 Future timeout 으로 (reader 는 블록 읽기)
+        sock.settimeout(None)
+        self.sock = sock
+        self.reader = threading.Thread(target=self.reader_loop, args=(rfile,), daemon=True)
+        self.reader.start()
+
+        # capabilities 협상 전에는 다른 명령을 받지 않음
+        self.execute("qmp_capabilities")
+
+    def close(self) -> None:
+        if self.sock is None:
+            return
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+        self.sock = None
+
+        if self.reader is not None:
+            self.reader.join(timeout=0.5)
+            self.reader = None
+
+    # 소켓 수신 루프 (id 기준으로 응답을 각 Future에 전달, 이벤트는 events 에 보관)
+    def reader_loop(self, rfile) -> None:
+        for line in rfile:
+            try:
+                msg = json.loads(line)
+            except ValueError:
+                continue
+
+            if "event" in msg:
+                self.events.append(msg)
+                continue
+
+            with self.pending_lock:
+                entry = self.pending.pop(msg.get("id"), None)
+            if entry is None:
+                continue
+            cmd, fut = entry
+            if fut.done():
+                continue
+            if "error" in msg:
+                fut.set_exception(QMPError(cmd, msg["error"]))
+            else:
+                fut.set_result(msg.get("return"))
+
+        # 소켓 닫힘: 대기 중인 명령 모두 실패 처리
+        with self.pending_lock:
+            pending = list(self.pending.values())
+            self.pending.clear()
+        for _cmd, fut in pending:
+            if not fut.done():
+                fut.set_exception(RuntimeError("QMP connection closed"))
+
+    # QMP 명령 송신 (id 부여, 응답은 Future로 전달)
+    def send(self, cmd: str, arguments: dict = None) -> Future:
+        if self.sock is None:
+            raise RuntimeError("QMP is not connected")
+
+        fut = Future()
+        msg = {"execute": cmd}
+        if arguments:
+            msg["arguments"] = arguments
+
+        with self.write_lock:
+            msg_id = next(self.ids)
+            msg["id"] = msg_id
+            with self.pending_lock:
+                self.pending[msg_id] = (cmd, fut)
+            try:
+                self.sock.sendall(json.dumps(msg).encode() + b"\n")
+            except OSError:
+                with self.pending_lock:
+                    self.pending.pop(msg_id, None)
+                raise RuntimeError("QMP connection closed") from None
+        return fut
+
+    def wait(self, fut: Future, cmd: str, timeout=None):
+        if timeout is None:
+            timeout = self.timeout
+        try:
+            return fut.result(timeout=max(0.0, timeout))
+        except FutureTimeoutError:
+            raise RuntimeError(f"QMP timeout for '{cmd}'") from None
+
+    # QMP 명령 실행 -> "return" 값 (dict / list / str)
+    def execute(self, cmd: str, arguments: dict = None, timeout=None):
+        return self.wait(self.send(cmd, arguments), cmd, timeout=timeout)
+
+    # 여러 명령을 한 번에 보내고 응답을 모아 받음 -> 명령마다 "return" 값 또는 Exception
+    #   cmds: [(명령, arguments 또는 None), ...]
+    def execute_many(self, cmds, timeout=None) -> list:
+        if timeout is None:
+            timeout = self.timeout
+
+        futs = [self.send(cmd, arguments) for cmd, arguments in cmds]
+        deadline = time.monotonic() + timeout
+
+        results = []
+        for (cmd, _arguments), fut in zip(cmds, futs):
+            try:
+                results.append(self.wait(fut, cmd, timeout=deadline - time.monotonic()))
+            except RuntimeError as e:
+                results.append(e)
+        return results
+
+    # HMP 명령 (info registers, xp ...) -> 출력 텍스트
+    def hmp(self, command_line: str, timeout=None) -> str:
+        return self.execute("human-monitor-command", {"command-line": command_line}, timeout=timeout)
+
+    def hmp_send(self, command_line: str) -> Future:
+        return self.send("human-monitor-command", {"command-line": command_line})
+
+    def hmp_many(self, command_lines, timeout=None) -> list:
+        return self.execute_many(
+            [("human-monitor-command", {"command-line": line}) for line in command_lines], timeout=timeout,
+        )
+
+    # 물리 메모리 [pa, pa + size) 를 파일로 (QEMU 쪽 경로)
+    def pmemsave(self, pa: int, size: int, path: str, timeout=None) -> None:
+        self.execute("pmemsave", {"val": pa, "size": size, "filename": path}, timeout=timeout)
+
+    # vCPU 목록 [{"cpu-index": 0, "thread-id": ..., "qom-path": ..., "props": {...}}, ...]
+    def query_cpus_fast(self) -> list:
+        return self.execute("query-cpus-fast")
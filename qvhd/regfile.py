@@ -0,0 +1,102 @@
+from array import array
+
+REG_ORDER = [
+    "rax", "rbx", "rcx", "rdx",
+    "rsi", "rdi", "rbp", "rsp",
+    "r8", "r9", "r10", "r11", "r12", "r13", "r14", "r15",
+    "rip", "eflags",
+    "cs", "ss", "ds", "es", "fs", "gs",
+]
+
+# 페이지 워크에 필요한 제어 레지스터 (Registers와 같은 명령으로 읽음)
+CONTROL_REGS = ["cr0", "cr3", "cr4", "efer"]
+STATE_REGS = REG_ORDER + CONTROL_REGS
+
+REG_INDEX = {name: i for i, name in enumerate(STATE_REGS)}
+
+# EFLAGS 비트 (bit, 이름)
+EFLAGS_BITS = [
+    (0, "CF"), (2, "PF"), (4, "AF"), (6, "ZF"), (7, "SF"), (8, "TF"),
+    (9, "IF"), (10, "DF"), (11, "OF"), (14, "NT"), (16, "RF"), (17, "VM"),
+    (18, "AC"), (19, "VIF"), (20, "VIP"), (21, "ID"),
+]
+
+class RegisterFile:
+    # STATE_REGS 순서의 레지스터 스냅샷 1개
+    #   values: array('Q') - 값을 모르는 레지스터는 0이고 valid 비트가 꺼져 있음
+    #   valid: STATE_REGS index 기준 비트마스크
+    # 한 번 만든 스냅샷은 바꾸지 않음 (refresh마다 새로 만들고 이전 것은 그대로 보관)
+    __slots__ = ("values", "valid")
+
+    def __init__(self, values=None, valid: int = 0) -> None:
+        self.values = array("Q", values if values is not None else bytes(8 * len(STATE_REGS)))
+        self.valid = valid
+
+    # {이름: int | None} -> RegisterFile
+    @classmethod
+    def from_ints(cls, by_name: dict) -> "RegisterFile":
+        values = array("Q", bytes(8 * len(STATE_REGS)))
+        valid = 0
+        for i, name in enumerate(STATE_REGS):
+            val = by_name.get(name)
+            if val is not None:
+                values[i] = val & 0xFFFFFFFFFFFFFFFF
+                valid |= 1 << i
+        return cls(values, valid)
+
+    def __getitem__(self, name: str):
+        return self.get(name)
+
+    def __contains__(self, name: str) -> bool:
+        i = REG_INDEX.get(name)
+        return i is not None and bool(self.valid >> i & 1)
+
+    def get(self, name: str, default=None):
+        i = REG_INDEX.get(name)
+        if i is None or not self.valid >> i & 1:
+            return default
+        return self.values[i]
+
+    # 화면 표시용 문자열
+    def hex(self, name: str) -> str:
+        val = self.get(name)
+        return "N/A" if val is None else f"0x{val:x}"
+
+    # 다른 스냅샷과 값(또는 유효 여부)이 다른 레지스터의 비트마스크
+    def diff(self, other: "RegisterFile") -> int:
+        if other is None:
+            return self.valid
+        mask = self.valid ^ other.valid
+        if self.values == other.values:
+            return mask
+
+        a, b = self.values, other.values
+        for i in range(len(a)):
+            if a[i] != b[i]:
+                mask |= 1 << i
+        return mask
+
+    @staticmethod
+    def changed_names(mask: int) -> list:
+        return [name for i, name in enumerate(STATE_REGS) if mask >> i & 1]
+
+    @staticmethod
+    def bit(name: str) -> int:
+        return 1 << REG_INDEX[name]
+
+    # EFLAGS에서 켜진 플래그 이름
+    def eflags_set(self) -> list:
+        val = self.get("eflags")
+        if val is None:
+            return []
+        return [name for bit, name in EFLAGS_BITS if val >> bit & 1]
+
+    def eflags_str(self) -> str:
+        val = self.get("eflags")
+        if val is None:
+            return "N/A"
+        return f"[{' '.join(self.eflags_set())}] IOPL={val >> 12 & 3}"
+
+    def __repr__(self) -> str:
+        regs = ", ".join(f"{name}={self.hex(name)}" for name in REG_ORDER[:17])
+        return f"RegisterFile({regs}, ...)"
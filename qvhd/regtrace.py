@@ -0,0 +1,218 @@
+import mmap
+import os
+import struct
+from array import array
+from collections import OrderedDict
+
+from regfile import REG_INDEX, REG_ORDER, STATE_REGS, RegisterFile
+
+# 스텝마다 기록하는 레지스터 (+ 마지막 열은 RegisterFile 유효 비트마스크)
+TRACE_REGS = REG_ORDER + ["cr3"]
+
+# 블록 하나의 스텝 수 (블록 첫 스텝이 keyframe)
+BLOCK_STEPS = 4096
+
+# 파일 형식 (little-endian)
+#   header : MAGIC, 열 수(I), 블록 스텝 수(I), 이름 길이(I), 이름들("," 로 연결)
+#   block  : BLOCK_MAGIC, 첫 스텝(Q), 스텝 수(I), 블록 바이트 수(I)
+#            keyframe - 열마다 첫 스텝 값(Q)
+#            열마다   - 바뀐 스텝 수(I), 바뀜 비트맵((count-1+7)//8 바이트), 이전 스텝과의 XOR 값(Q * 바뀐 스텝 수)
+#   footer : INDEX_MAGIC, 블록 offset 배열(Q * 블록 수), 그 offset(Q), 블록 수(Q), 전체 스텝 수(Q), END_MAGIC
+#            (footer 가 없으면 - 기록 중 종료 - 블록을 처음부터 훑어서 읽음)
+MAGIC = b"QVHDTRC1"
+BLOCK_MAGIC = b"BLK1"
+INDEX_MAGIC = b"QIDX"
+END_MAGIC = b"QEND"
+
+BLOCK_HEADER = struct.Struct("<4sQII")
+TRAILER = struct.Struct("<QQQ4s")
+
+class TraceWriter:
+    # 열(레지스터)마다 array('Q') 하나에 모았다가 BLOCK_STEPS 마다 블록으로 압축해 파일 끝에 추가
+    def __init__(self, path: str, names=TRACE_REGS, block_steps: int = BLOCK_STEPS) -> None:
+        self.path = path
+        self.names = list(names)
+        self.block_steps = block_steps
+
+        self.columns = [array("Q") for _ in range(len(self.names) + 1)]
+        self.reg_index = [REG_INDEX[name] for name in self.names]
+        self.valid_mask = sum(1 << i for i in self.reg_index)
+        self.offsets = array("Q")
+        self.steps = 0
+
+        self.f = open(path, "wb")
+        encoded = ",".join(self.names).encode("ascii")
+        self.f.write(MAGIC + struct.pack("<III", len(self.columns), block_steps, len(encoded)) + encoded)
+
+    def append(self, regs: RegisterFile) -> None:
+        columns = self.columns
+        values = regs.values
+        for col, i in zip(columns, self.reg_index):
+            col.append(values[i])
+        columns[-1].append(regs.valid & self.valid_mask)
+
+        self.steps += 1
+        if len(columns[0]) >= self.block_steps:
+            self.flush_block()
+
+    def flush_block(self) -> None:
+        count = len(self.columns[0])
+        if not count:
+            return
+
+        parts = [array("Q", (col[0] for col in self.columns)).tobytes()]
+        for col in self.columns:
+            bitmap = bytearray((count - 1 + 7) // 8)
+            changed = array("Q")
+
+            # 한 번도 안 바뀐 열은 비트맵만 (대부분의 레지스터)
+            if col.count(col[0]) == count:
+                parts += [struct.pack("<I", 0), bytes(bitmap)]
+                continue
+
+            prev = col[0]
+            for i in range(1, count):
+                x = col[i] ^ prev
+                prev = col[i]
+                if x:
+                    bitmap[(i - 1) >> 3] |= 1 << ((i - 1) & 7)
+                    changed.append(x)
+            parts += [struct.pack("<I", len(changed)), bytes(bitmap), changed.tobytes()]
+
+        body = b"".join(parts)
+        self.offsets.append(self.f.tell())
+        self.f.write(BLOCK_HEADER.pack(BLOCK_MAGIC, self.steps - count, count, BLOCK_HEADER.size + len(body)) + body)
+        self.f.flush()
+
+        self.columns = [array("Q") for _ in self.columns]
+
+    def close(self) -> None:
+        if self.f.closed:
+            return
+        self.flush_block()
+
+        index_at = self.f.tell()
+        self.f.write(INDEX_MAGIC + self.offsets.tobytes())
+        self.f.write(TRAILER.pack(index_at, len(self.offsets), self.steps, END_MAGIC))
+        self.f.close()
+
+class TraceReader:
+    # mmap 으로 열어 스텝 번호로 바로 접근 (열 때는 footer 의 블록 목록만 읽고, 블록은 처음 접근할 때 풀어서 캐시)
+    def __init__(self, path: str, cache_blocks: int = 8) -> None:
+        self.path = path
+        self.cache = OrderedDict()
+        self.cache_blocks = cache_blocks
+
+        # 빈 파일 / 헤더보다 짧은 파일은 mmap 전에 거름 (mmap 은 빈 파일에 ValueError)
+        self.f = open(path, "rb")
+        try:
+            size = os.fstat(self.f.fileno()).st_size
+            if size < len(MAGIC) + 12:
+                raise ValueError(f"not a QVHD trace: {path} ({size} bytes, shorter than the header)")
+            self.mm = mmap.mmap(self.f.fileno(), 0, access=mmap.ACCESS_READ)
+        except BaseException:
+            self.f.close()
+            raise
+
+        mm = self.mm
+        if mm[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"not a QVHD trace: {path}")
+
+        ncols, self.block_steps, name_len = struct.unpack_from("<III", mm, len(MAGIC))
+        pos = len(MAGIC) + 12
+        try:
+            self.names = mm[pos:pos + name_len].decode("ascii").split(",")
+        except UnicodeDecodeError:
+            self.close()
+            raise ValueError(f"corrupt QVHD trace header: {path}")
+        self.ncols = ncols
+        self.data_start = pos + name_len
+
+        if len(mm) >= self.data_start + TRAILER.size and mm[-4:] == END_MAGIC:
+            index_at, nblocks, self.steps, _ = TRAILER.unpack_from(mm, len(mm) - TRAILER.size)
+            start = index_at + len(INDEX_MAGIC)
+            self.offsets = array("Q", mm[start:start + 8 * nblocks])
+        else:
+            self.offsets, self.steps = self.scan_blocks()
+
+    # footer 가 없을 때: 온전한 블록만 앞에서부터
+    def scan_blocks(self):
+        mm = self.mm
+        offsets = array("Q")
+        steps = 0
+        pos = self.data_start
+        while pos + BLOCK_HEADER.size <= len(mm):
+            magic, first, count, nbytes = BLOCK_HEADER.unpack_from(mm, pos)
+            if magic != BLOCK_MAGIC or pos + nbytes > len(mm):
+                break
+            offsets.append(pos)
+            steps = first + count
+            pos += nbytes
+        return offsets, steps
+
+    def __len__(self) -> int:
+        return self.steps
+
+    # 블록 하나 -> 열마다 array('Q') (keyframe 에 XOR 값을 차례로 적용)
+    def decode_block(self, index: int) -> list:
+        block = self.cache.get(index)
+        if block is not None:
+            self.cache.move_to_end(index)
+            return block
+
+        mm = self.mm
+        pos = self.offsets[index]
+        _, _, count, _ = BLOCK_HEADER.unpack_from(mm, pos)
+        pos += BLOCK_HEADER.size
+
+        keyframe = array("Q", mm[pos:pos + 8 * self.ncols])
+        pos += 8 * self.ncols
+        bitmap_len = (count - 1 + 7) // 8
+
+        block = []
+        for c in range(self.ncols):
+            (nchanged,) = struct.unpack_from("<I", mm, pos)
+            pos += 4
+            bitmap = mm[pos:pos + bitmap_len]
+            pos += bitmap_len
+            changed = array("Q", mm[pos:pos + 8 * nchanged])
+            pos += 8 * nchanged
+
+            cur = keyframe[c]
+            col = array("Q", [cur]) * count
+            if nchanged:
+                j = 0
+                for i in range(1, count):
+                    if bitmap[(i - 1) >> 3] >> ((i - 1) & 7) & 1:
+                        cur ^= changed[j]
+                        j += 1
+                    col[i] = cur
+            block.append(col)
+
+        self.cache[index] = block
+        while len(self.cache) > self.cache_blocks:
+            self.cache.popitem(last=False)
+        return block
+
+    # step 번째 스텝의 열 값들 (마지막은 유효 비트마스크)
+    def row(self, step: int) -> list:
+        if not 0 <= step < self.steps:
+            raise IndexError(f"step {step} out of range (0..{self.steps - 1})")
+        block = self.decode_block(step // self.block_steps)
+        i = step % self.block_steps
+        return [col[i] for col in block]
+
+    def __getitem__(self, step: int) -> RegisterFile:
+        row = self.row(step)
+        values = array("Q", bytes(8 * len(STATE_REGS)))
+        for name, val in zip(self.names, row):
+            values[REG_INDEX[name]] = val
+        return RegisterFile(values, row[-1])
+
+    def close(self) -> None:
+        self.cache.clear()
+        try:
+            self.mm.close()
+        finally:
+            self.f.close()
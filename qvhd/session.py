@@ -1,26 +1,136 @@
-from gdb_mi_client import GdbMIClient, REG_ORDER
+import os
+import threading
+import time
+
+from cmd_stats import CommandStats
+from gdb_mi_client import GdbMIClient
+from gdb_rsp_client import GdbRSPClient
+from memory import PAGE_SIZE, ROW_BYTES
+from page_walk import looks_like_pointer, perm_string
+from phys_mem import PhysicalMemory
+from profiler import PCProfile
+from pt_cache import PageTableCache
+from qmp_client import QMPClient
+from regfile import REG_ORDER, RegisterFile
+from regtrace import TraceReader, TraceWriter
+
+BACKENDS = ("mi", "rsp")
+
+# 스크롤로 덤프 끝을 넘었을 때 더 읽는 최소 크기
+MEM_FETCH = 4096
+
+# trace 기본 파일
+TRACE_PATH = "qvhd.trace"
+
+# Register Deref 패널: 범용 레지스터와 가리키는 곳에서 읽는 바이트 수
+GPRS = REG_ORDER[:16]
+DEREF_BYTES = 16
 
 class DebugSession:
     # GDB/MI 클라이언트와 디버깅 세션 초기화
-    def __init__(self, target: str = "localhost:1234", gdb_path: str = "gdb") -> None:
-        self.client = GdbMIClient(target=target, gdb_path=gdb_path)
+    #   ram_file: QEMU memory-backend-file 경로 (있으면 페이지 워크/물리 읽기를 mmap 으로), machine: pc / q35
+    #   qmp: QEMU -qmp unix 소켓 경로 (있으면 monitor 명령 / pmemsave 를 gdb 대신 QMP 로)
+    def __init__(self, target: str = "localhost:1234", gdb_path: str = "gdb", backend: str = "mi",
+                 ram_file: str = None, machine: str = "pc", qmp: str = None) -> None:
+        # backend - mi: gdb 프로세스 경유, rsp: QEMU gdbstub 직접 연결
+        if backend == "mi":
+            self.client = GdbMIClient(target=target, gdb_path=gdb_path)
+        elif backend == "rsp":
+            self.client = GdbRSPClient(target=target)
+        else:
+            raise ValueError(f"unknown backend: {backend!r} (expected one of {BACKENDS})")
+        self.backend = backend
+        self.ram_file = ram_file
+        self.machine = machine
+        self.qmp_path = qmp
 
-        # Registers
-        self.regs = {name: "N/A" for name in REG_ORDER}
-        self.prev_regs = self.regs.copy()
+        # Registers (스냅샷은 바꾸지 않으므로 복사 없이 이전 것을 보관)
+        self.regs = RegisterFile()
+        self.prev_regs = self.regs
+        self.reg_changed = 0
 
         # Page Info
         self.inspect_mode = "rip"
         self.inspect_va = None
         self.page_info = None
         self.prev_page_info = None
+        self.pt_cache = PageTableCache()
+
+        # Register Deref (None이면 끔): [(레지스터, VA, 워크 결과, 가리키는 바이트 | Exception | None), ...]
+        self.deref_rows = None
+        self.deref_error = None
+
+        # Address Map (None이면 Page Info 표시)
+        self.map_ranges = None
+        self.map_scroll = 0
 
-        # Mem Dump
-        self.mem_dump_lines = []
+        # Mem Dump (raw bytes + 스크롤 위치, 줄 포맷은 화면에 보일 때만)
+        self.mem_dump = None
+        self.mem_scroll = 0
+        self.mem_error = None
+
+        # True면 Mem Dump 주소가 물리 주소 (pmd / pfind)
+        self.mem_phys = False
+
+        # pfind 결과 (찾은 PA 목록)
+        self.search_hits = []
+
+        # vCPU 목록 [(thread id, 이름), ...] (연결 때 / cpus 명령으로 갱신)
+        self.cpus = []
+
+        # True면 Registers 패널 위에 vCPU 별 RIP/CR3 표 (새로고침마다 모든 vCPU 를 한 번의 pipeline 으로 읽음)
+        self.cpu_grid = False
+        self.cpu_states = {}
+
+        # PgUp/PgDn 이 움직이는 패널 (map / mem)
+        self.focus = "mem"
 
         self.status = "init: not connected yet"
         self.is_running = False
 
+        # 실행 중 정지 감지 (client.stops 가 continue 때 본 값과 달라지면 멈춘 것)
+        self.stops_seen = 0
+        self.stop_reason = None
+
+        # peek 모드: 실행 중 peek_hz 로 잠깐 멈춰 RIP/CR3 샘플 후 재개 (0이면 끔)
+        self.peek_hz = 0
+        self.peek_next = 0.0
+        self.peek_last = None
+        self.peek_pause = 0.0
+
+        # Trace - 기록 중인 writer / 열어 둔 reader (reader 가 있으면 Registers 패널은 trace_pos 스텝을 표시)
+        self.trace_writer = None
+        self.trace = None
+        self.trace_pos = 0
+        self.trace_regs = RegisterFile()
+        self.trace_changed = 0
+
+        # PC 샘플링 프로파일 (None이 아니면 Page Info 자리에 hot-spot 패널)
+        self.profile = None
+
+        # 명령 계측 (client.stats 에 CommandStats) - stats_view 면 Page Info 자리에 stats 패널
+        self.stats_view = False
+
+        # 긴 작업 진행 상황 (worker 진행 표시에 같이 나옴, 작업 시작 때 None)
+        self.progress = None
+
+        # 백그라운드 작업 취소 요청 (SessionWorker.cancel 이 set, 긴 루프가 배치 사이마다 확인)
+        self.cancel_event = threading.Event()
+
+    # 상태줄 - 마지막 명령의 결과 문구 (status 에 쓰면 성공, fail() 로 쓰면 실패: status_error)
+    @property
+    def status(self) -> str:
+        return self.status_line
+
+    @status.setter
+    def status(self, text: str) -> None:
+        self.status_line = text
+        self.status_error = False
+
+    def fail(self, text: str) -> None:
+        self.status_line = text
+        self.status_error = True
+
     # GDB/MI 명령 실행
     def run_action(self, label: str, action, *, refresh_regs: bool = True) -> None:
         try:
@@ -28,31 +138,118 @@ class DebugSession:
 
             # Registers + Page Info 갱신
             if refresh_regs:
-                self.prev_regs = self.regs.copy()
-                self.regs = self.client.read_registers()
-                self.update_page_info()
+                self.refresh_state()
 
             self.status = f"{label} OK"
 
         except KeyboardInterrupt:
-            self.status = f"{label} CANCEL: KeyboardInterrupt"
+            self.fail(f"{label} CANCEL: KeyboardInterrupt")
 
         except Exception as e:
-            self.status = f"{label} ERROR: {e!s}"
+            self.fail(f"{label} ERROR: {e!s}")
 
     # GDB/MI 클라이언트 연결
     def connect(self) -> None:
         try:
             self.client.connect()
-            self.regs = self.client.read_registers()
-            self.prev_regs = self.regs.copy()
-            self.status = "connected to localhost:1234 (use n/c/p/r/q)"
-            self.update_page_info()
+
+            ram = ""
+            if self.ram_file and self.client.phys is None:
+                try:
+                    self.client.phys = PhysicalMemory(self.ram_file, self.machine)
+                    ram = f", RAM file {self.ram_file} ({self.client.phys.ram_size >> 20} MB)"
+                except (OSError, ValueError) as e:
+                    ram = f", RAM file ERROR: {e!s} (physical reads via gdb)"
+
+            if self.qmp_path and self.client.qmp is None:
+                qmp = QMPClient(self.qmp_path)
+                try:
+                    qmp.connect()
+                    self.client.qmp = qmp
+                    ram += f", QMP {qmp.target}"
+                except (OSError, RuntimeError) as e:
+                    qmp.close()
+                    ram += f", QMP ERROR: {e!s} (monitor via gdb)"
+
+            try:
+                self.cpus = self.client.list_threads()
+            except RuntimeError:
+                self.cpus = []
+            if len(self.cpus) > 1:
+                ram += f", {len(self.cpus)} vCPUs"
+
+            self.refresh_state()
+            self.prev_regs = self.regs
+            self.reg_changed = 0
+            self.status = f"connected to {self.client.target} via {self.backend}{ram} (use n/c/p/r/q)"
 
         except Exception as e:
-            self.status = f"init ERROR: {e!s}"
+            self.fail(f"init ERROR: {e!s}")
+
+    # Registers + CR3 + 직전 변환의 leaf 엔트리(없으면 테이블들)를 한 번에 읽고 Page Info 갱신
+    def refresh_state(self) -> None:
+        # 게스트가 실행됐을 수 있으므로 캐시된 테이블은 무효, 변환은 leaf 재검증 대상
+        self.pt_cache.bump()
+
+        prefetch_tables, prefetch_qwords = [], []
+        pi = self.page_info
+        if isinstance(pi, dict) and "cr3" in pi and "va" in pi:
+            leaf = self.pt_cache.leaf_addr(pi["cr3"], pi["va"])
+            if leaf is not None:
+                prefetch_qwords.append(leaf)
+            else:
+                prefetch_tables = self.client.walk_table_addrs(pi)
+
+        # deref 패널: 지난번 레지스터 값들의 leaf 엔트리도 같이 (값이 같은 페이지에 머물면 재검증만)
+        prev_cr3 = self.regs.get("cr3")
+        for _name, va, _info, _data in self.deref_rows or ():
+            leaf = self.pt_cache.leaf_addr(prev_cr3, va) if prev_cr3 is not None else None
+            if leaf is not None:
+                prefetch_qwords.append(leaf)
+
+        regs, cr3, tables, qwords = self.client.read_state(prefetch_tables, prefetch_qwords)
+        for table_pa, entries in tables.items():
+            self.pt_cache.put_table(cr3, table_pa, entries)
+        self.pt_cache.put_qwords(qwords)
+
+        self.prev_regs = self.regs
+        self.regs = regs
+        self.reg_changed = regs.diff(self.prev_regs)
+        self.update_deref(cr3=cr3)
+        self.update_page_info(cr3=cr3)
+        if self.cpu_grid and len(self.cpus) > 1:
+            self.update_cpu_states()
 
     def close(self) -> None:
+        if self.trace_writer is not None:
+            self.trace_stop()
+        self.trace_close()
+        self.stats_off()
+        self.close_connection()
+
+    # 연결이 살아 있는지 (mi: gdb 프로세스, rsp: gdbstub 소켓)
+    def alive(self) -> bool:
+        return self.client.alive()
+
+    # 끊긴 연결 다시 맺기 (QEMU 가 다시 떴을 수 있으므로 RAM 파일 / QMP 도 새로, trace 는 그대로)
+    def reconnect(self) -> None:
+        self.close_connection()
+        self.is_running = False
+        self.peek_last = None
+        self.pt_cache.clear()
+        self.connect()
+        if self.alive():
+            self.status = f"reconnected: {self.status}"
+
+    def close_connection(self) -> None:
+        if self.client.phys is not None:
+            self.client.phys.close()
+            self.client.phys = None
+
+        if self.client.qmp is not None:
+            self.client.qmp.close()
+            self.client.qmp = None
+
         try:
             self.client.close()
         except Exception:
@@ -61,7 +258,7 @@ class DebugSession:
     # n: stepi
     def cmd_step(self) -> None:
         if self.is_running:
-            self.status = "stepi 불가: 현재 running 상태입니다. 먼저 p로 멈춰주세요."
+            self.fail("stepi 불가: 현재 running 상태입니다. 먼저 p로 멈춰주세요.")
             return
 
         self.run_action(
@@ -69,19 +266,157 @@ class DebugSession:
             action=lambda: self.client.stepi(),
             refresh_regs=True,
         )
+        if self.trace_writer is not None and not self.status_error:
+            self.trace_writer.append(self.regs)
+
+    # n <count>: 스텝마다 새로고침하지 않고 count 번 실행한 뒤 한 번만 갱신
+    def cmd_step_many(self, count: int) -> None:
+        if self.is_running:
+            self.fail("stepi 불가: 현재 running 상태입니다. 먼저 p로 멈춰주세요.")
+            return
+
+        t0 = time.perf_counter()
+        done = 0
+
+        def action():
+            nonlocal done
+            progress = lambda n: setattr(self, "progress", f"{n}/{count} steps")
+            if self.trace_writer is not None:
+                # trace 중에는 스텝마다 레지스터를 읽어 기록
+                done = self.client.step_record(
+                    count, self.trace_writer.append, cancel=self.cancel_event.is_set, progress=progress,
+                )
+            else:
+                done = self.client.step_many(count, cancel=self.cancel_event.is_set, progress=progress)
+
+        self.run_action(label=f"n {count}", action=action, refresh_regs=True)
+        if not self.status_error:
+            elapsed = time.perf_counter() - t0
+            cancel = ""
+            if done < count:
+                cancel = " (cancelled)" if self.cancel_event.is_set() else f" (stopped: {self.client.stop_reason()})"
+            self.status = f"n {count}: {done} steps{cancel} in {elapsed:.2f}s ({done / elapsed:.0f} steps/s)"
+
+    # until rip==<addr>: breakpoint + continue 로 게스트 안에서 실행
+    def cmd_until_addr(self, addr: int) -> None:
+        if self.is_running:
+            self.fail("until 불가: 현재 running 상태입니다. 먼저 p로 멈춰주세요.")
+            return
+
+        t0 = time.perf_counter()
+        self.run_action(
+            label=f"until rip==0x{addr:x}",
+            action=lambda: self.client.run_until(addr, cancel=self.cancel_event.is_set),
+            refresh_regs=True,
+        )
+        if not self.status_error:
+            reached = "reached" if self.regs.get("rip") == addr else f"stopped at {self.regs.hex('rip')}"
+            self.status = f"until rip==0x{addr:x}: {reached} in {time.perf_counter() - t0:.2f}s"
+
+    # until <reg> changes: 스텝마다 레지스터 하나만 읽고, 바뀌면 전체 갱신
+    def cmd_until_change(self, reg: str, max_steps: int = 100000) -> None:
+        if self.is_running:
+            self.fail("until 불가: 현재 running 상태입니다. 먼저 p로 멈춰주세요.")
+            return
+
+        t0 = time.perf_counter()
+        result = None
+
+        def action():
+            nonlocal result
+            result = self.client.step_until_change(
+                reg, max_steps,
+                cancel=self.cancel_event.is_set,
+                progress=lambda n: setattr(self, "progress", f"{n} steps"),
+            )
+
+        self.run_action(label=f"until {reg} changes", action=action, refresh_regs=True)
+        if not self.status_error:
+            steps, old, new = result
+            elapsed = time.perf_counter() - t0
+            if new is None:
+                self.status = f"until {reg} changes: unchanged after {steps} steps ({elapsed:.2f}s)"
+            else:
+                self.status = f"until {reg} changes: 0x{old:x} -> 0x{new:x} after {steps} steps ({elapsed:.2f}s)"
+
+    # trace start: 지금 레지스터를 0번 스텝으로, 이후 n / n <count> 의 스텝마다 기록
+    def trace_start(self, path: str = TRACE_PATH) -> None:
+        if self.trace_writer is not None:
+            self.fail(f"trace: already recording to {self.trace_writer.path}")
+            return
+        try:
+            self.trace_writer = TraceWriter(path)
+        except OSError as e:
+            self.fail(f"trace ERROR: {e!s}")
+            return
+        self.trace_writer.append(self.regs)
+        self.status = f"trace: recording to {path} (n / n <count>, trace stop)"
+
+    def trace_stop(self) -> None:
+        writer = self.trace_writer
+        if writer is None:
+            self.fail("trace: not recording")
+            return
+        self.trace_writer = None
+        writer.close()
+
+        steps = writer.steps
+        try:
+            per_step = f", {os.path.getsize(writer.path) / steps:.1f} bytes/step"
+        except OSError:
+            per_step = ""
+        self.status = f"trace: {steps} steps saved to {writer.path}{per_step} (trace open {writer.path})"
+
+    # trace open: 파일을 열어 Registers 패널에서 스텝 이동 (게스트는 건드리지 않음)
+    def trace_open(self, path: str = TRACE_PATH) -> None:
+        try:
+            reader = TraceReader(path)
+        except (OSError, ValueError) as e:
+            self.fail(f"trace open ERROR: {e!s}")
+            return
+        if not len(reader):
+            reader.close()
+            self.fail(f"trace open: {path} has no steps")
+            return
+
+        self.trace_close()
+        self.trace = reader
+        self.trace_seek(0)
+
+    def trace_close(self) -> None:
+        if self.trace is not None:
+            self.trace.close()
+            self.trace = None
+
+    # step 번째 스텝으로 이동 (범위 밖이면 양 끝으로)
+    def trace_seek(self, step: int) -> None:
+        reader = self.trace
+        if reader is None:
+            self.fail("trace: run 'trace open [path]' first")
+            return
+
+        step = max(0, min(step, len(reader) - 1))
+        regs = reader[step]
+        self.trace_pos = step
+        self.trace_regs = regs
+        self.trace_changed = regs.diff(reader[step - 1]) if step > 0 else 0
+        self.status = f"trace {reader.path}: step {step}/{len(reader) - 1} (←/→, ts <step>, trace close)"
 
     # c: continue
     def cmd_continue(self) -> None:
         if self.is_running:
-            self.status = "이미 running 상태입니다. (계속 실행 중)"
+            self.fail("이미 running 상태입니다. (계속 실행 중)")
             return
 
+        self.stops_seen = self.client.poll_stop()[0]
         self.run_action(
             label="continue",
             action=lambda: self.client.cont(),
             refresh_regs=False,
         )
         self.is_running = True
+        self.peek_last = None
+        self.peek_next = time.monotonic()
 
     # p: pause
     def cmd_pause(self) -> None:
@@ -91,11 +426,194 @@ class DebugSession:
             refresh_regs=True,
         )
         self.is_running = False
+        self.stops_seen = self.client.poll_stop()[0]
+
+    # 실행 중 게스트가 스스로 멈췄는지 (breakpoint, fault 등) - 멈췄으면 True
+    #   worker 가 쉬고 있을 때만 호출 (RSP는 소켓을 직접 확인)
+    def check_stopped(self) -> bool:
+        if not self.is_running:
+            return False
+
+        stops, reason = self.client.poll_stop()
+        if stops == self.stops_seen:
+            return False
+
+        self.stops_seen = stops
+        self.stop_reason = reason
+        self.is_running = False
+        return True
+
+    # 정지 감지 후 Registers + Page Info 갱신
+    def cmd_stopped(self) -> None:
+        self.run_action(
+            label=f"stopped ({self.stop_reason or 'unknown'})",
+            action=lambda: None,
+            refresh_regs=True,
+        )
+
+    # peek 모드 설정 (hz=0 이면 끔)
+    def set_peek(self, hz: float) -> None:
+        self.peek_hz = max(0.0, float(hz))
+        self.peek_next = time.monotonic()
+        self.peek_last = None
+        self.status = f"peek: {self.peek_hz:g} Hz" if self.peek_hz else "peek off"
+
+    def peek_due(self) -> bool:
+        return self.is_running and self.peek_hz > 0 and time.monotonic() >= self.peek_next
+
+    # peek 1회: 멈춘 시간(guest pause)을 재서 상태줄에 표시
+    def cmd_peek(self) -> None:
+        now = time.monotonic()
+        self.peek_next = now + 1.0 / self.peek_hz if self.peek_hz else now
+        if not self.is_running:
+            return
+
+        try:
+            t0 = time.perf_counter()
+            sample = self.client.peek()
+            pause = time.perf_counter() - t0
+        except Exception as e:
+            self.fail(f"peek ERROR: {e!s}")
+            return
+
+        # 다른 이유로 멈춤 -> check_stopped 가 처리
+        if sample is None:
+            return
+
+        self.stops_seen = self.client.poll_stop()[0]
+        self.peek_last = sample
+        self.peek_pause = pause
+
+        rip, cr3 = sample
+        rip = "N/A" if rip is None else f"0x{rip:x}"
+        cr3 = "N/A" if cr3 is None else f"0x{cr3:x}"
+        self.status = (
+            f"running (peek {self.peek_hz:g} Hz): RIP={rip} CR3={cr3}, "
+            f"pause {pause * 1e3:.2f} ms ({pause * self.peek_hz * 100:.2f}% of guest time)"
+        )
+
+    # profile: seconds 동안 hz 로 RIP/CR3 샘플 (peek 반복, 멈춰 있었으면 실행 후 다시 멈춤)
+    def cmd_profile(self, seconds: float, hz: float, key: str = "page") -> None:
+        if seconds <= 0 or hz <= 0:
+            self.fail("usage: profile <seconds> <hz> [page|sym]")
+            return
+        try:
+            prof = PCProfile(seconds, hz, key)
+        except ValueError as e:
+            self.fail(f"profile ERROR: {e!s}")
+            return
+
+        self.profile = prof
+        resumed = False
+        try:
+            if not self.is_running:
+                self.stops_seen = self.client.poll_stop()[0]
+                self.client.cont()
+                self.is_running = True
+                resumed = True
+
+            period = 1.0 / hz
+            t0 = time.monotonic()
+            deadline = t0 + seconds
+            next_at = t0
+
+            while not self.cancel_event.is_set():
+                now = time.monotonic()
+                if now >= deadline:
+                    break
+                if now < next_at:
+                    time.sleep(min(next_at - now, deadline - now))
+                    continue
+
+                t1 = time.perf_counter()
+                sample = self.client.peek()
+                pause = time.perf_counter() - t1
+
+                # 다른 이유로 멈춤 -> 중단 (check_stopped 가 갱신 처리)
+                if sample is None:
+                    prof.stopped_by = self.client.poll_stop()[1] or "stopped"
+                    break
+                prof.add(sample[0], sample[1], pause)
+                prof.elapsed = time.monotonic() - t0
+
+                # 늦어진 샘플을 몰아서 찍지 않음
+                next_at = max(next_at + period, time.monotonic())
+
+            prof.elapsed = time.monotonic() - t0
+            if prof.stopped_by is None:
+                self.stops_seen = self.client.poll_stop()[0]
+
+        except Exception as e:
+            self.fail(f"profile ERROR: {e!s}")
+            return
+
+        if resumed and prof.stopped_by is None:
+            self.cmd_pause()
+
+        if key == "sym" and hasattr(self.client, "symbolize"):
+            try:
+                prof.symbols = self.client.symbolize(sorted(prof.rips()))
+            except Exception:
+                prof.symbols = {}
+
+        prof.done = True
+        cancel = " CANCEL" if self.cancel_event.is_set() else ""
+        self.status = f"profile{cancel}: {prof.summary()} (profile save <path>, profile off)"
+
+    def close_profile(self) -> None:
+        self.profile = None
+
+    # folded-stack 텍스트로 저장
+    def save_profile(self, path: str) -> None:
+        if self.profile is None:
+            self.fail("profile save: run 'profile <seconds> <hz>' first")
+            return
+        try:
+            with open(path, "w") as f:
+                f.write(self.profile.folded())
+        except OSError as e:
+            self.fail(f"profile save ERROR: {e!s}")
+            return
+        self.status = f"profile saved: {path} ({len(self.profile.counts)} addresses)"
+
+    # stats [log <path>]: GdbMIClient 명령 계측 켜기 + 패널 (log: 명령마다 JSONL 한 줄)
+    def stats_on(self, log_path: str = None) -> None:
+        if self.backend != "mi":
+            self.fail("stats: mi backend only (gdb/MI 명령 계측)")
+            return
+
+        stats = self.client.stats
+        if stats is None:
+            stats = CommandStats()
+        try:
+            if log_path:
+                stats.open_log(log_path)
+        except OSError as e:
+            self.fail(f"stats log ERROR: {e!s}")
+            return
+        self.client.stats = stats
+        self.stats_view = True
+        self.status = f"stats: {stats.summary()} (stats reset, stats log <path>, stats off)"
+
+    def stats_reset(self) -> None:
+        if self.client.stats is not None:
+            self.client.stats.reset()
+            self.status = "stats reset"
+
+    # 계측 끄기 (로그는 분류별 합계를 쓰고 닫음)
+    def stats_off(self) -> None:
+        stats = self.client.stats
+        self.stats_view = False
+        if stats is None:
+            return
+        self.client.stats = None
+        stats.close()
+        self.status = f"stats off: {stats.summary()}"
 
     # r: refresh
     def cmd_refresh(self) -> None:
         if self.is_running:
-            self.status = "refresh 불가: 현재 running 상태입니다. 먼저 p로 멈춰주세요."
+            self.fail("refresh 불가: 현재 running 상태입니다. 먼저 p로 멈춰주세요.")
             return
 
         self.run_action(
@@ -107,13 +625,7 @@ class DebugSession:
     # Page Info Mode
     def current_inspect_va(self):
         if self.inspect_mode == "rip":
-            rip_val = self.regs.get("rip")
-            if not rip_val or rip_val == "N/A":
-                return None
-            try:
-                return int(str(rip_val), 16)
-            except ValueError:
-                return None
+            return self.regs.get("rip")
         
         elif self.inspect_mode == "manual" and self.inspect_va is not None:
             return self.inspect_va
@@ -122,7 +634,7 @@ class DebugSession:
     # Page Info Mode - rip
     def set_inspect_rip(self) -> None:
         if self.is_running:
-            self.status = "inspect 모드 변경 불가: 현재 running 상태입니다. 먼저 p로 멈춰주세요."
+            self.fail("inspect 모드 변경 불가: 현재 running 상태입니다. 먼저 p로 멈춰주세요.")
             return
 
         self.inspect_mode = "rip"
@@ -132,7 +644,7 @@ class DebugSession:
     # Page Info Mode - manual
     def set_inspect_va(self, va: int) -> None:
         if self.is_running:
-            self.status = "inspect 모드 변경 불가: 현재 running 상태입니다. 먼저 p로 멈춰주세요."
+            self.fail("inspect 모드 변경 불가: 현재 running 상태입니다. 먼저 p로 멈춰주세요.")
             return
 
         self.inspect_mode = "manual"
@@ -140,7 +652,7 @@ class DebugSession:
         self.update_page_info()
 
     # Page Info Update
-    def update_page_info(self) -> None:
+    def update_page_info(self, cr3: int = None) -> None:
         va = self.current_inspect_va()
         if va is None:
             self.prev_page_info = self.page_info
@@ -149,7 +661,18 @@ class DebugSession:
 
         try:
             self.prev_page_info = self.page_info
-            info = self.client.inspect_va(va)
+
+            # CR0/CR4/EFER 로 본 페이징 모드 확인
+            unsupported = self.client.paging_unsupported(self.regs)
+            if unsupported is not None:
+                self.page_info = {"error": unsupported}
+                return
+
+            # 마지막 refresh에서 같이 읽은 CR3 (멈춘 상태에서는 그대로 유효)
+            if cr3 is None:
+                cr3 = self.regs.get("cr3")
+
+            info = self.client.inspect_va(va, cr3=cr3, cache=self.pt_cache)
 
             if isinstance(info, dict):
                 flags = info.get("flags")
@@ -186,6 +709,62 @@ class DebugSession:
             self.prev_page_info = self.page_info
             self.page_info = {"error": str(e)}
 
+    # deref / deref off
+    def set_deref(self, on: bool) -> None:
+        if not on:
+            self.deref_rows = None
+            self.deref_error = None
+            self.status = "deref closed"
+            return
+
+        self.deref_rows = []
+        if self.is_running:
+            self.status = "deref: 멈추면 갱신됩니다"
+            return
+        self.update_deref()
+        self.status = f"deref: {len(self.deref_rows)} pointer registers"
+
+    # Register Deref: 포인터처럼 보이는 범용 레지스터마다 매핑 / 권한 / 가리키는 바이트
+    #   모든 VA (+ Page Info VA) 를 translate_many 한 번으로 변환하고 바이트도 한 배치로 읽음
+    #   (Page Info 워크는 같은 generation 캐시에서 바로 나옴)
+    def update_deref(self, cr3: int = None) -> None:
+        if self.deref_rows is None:
+            return
+
+        regs = self.regs
+        if cr3 is None:
+            cr3 = regs.get("cr3")
+        ptrs = [(name, regs[name]) for name in GPRS if name in regs and looks_like_pointer(regs[name])]
+
+        try:
+            unsupported = self.client.paging_unsupported(regs)
+            if unsupported is not None:
+                raise RuntimeError(unsupported)
+
+            vas = [va for _, va in ptrs]
+            inspect = self.current_inspect_va()
+            if inspect is not None:
+                vas.append(inspect)
+            infos = self.client.translate_many(vas, cr3=cr3, cache=self.pt_cache)
+
+            ranges = []
+            for _name, va in ptrs:
+                info = infos[va]
+                if info.get("present"):
+                    pa = info["phys_addr"]
+                    ranges.append((pa, min(DEREF_BYTES, PAGE_SIZE - pa % PAGE_SIZE)))
+            datas = iter(self.client.read_phys_many(ranges))
+
+            rows = []
+            for name, va in ptrs:
+                info = infos[va]
+                rows.append((name, va, info, next(datas) if info.get("present") else None))
+            self.deref_rows = rows
+            self.deref_error = None
+        except Exception as e:
+            self.deref_rows = []
+            self.deref_error = str(e)
+
     # flags를 기반으로 RWX + (user/kernel) 생성
     def perm_from_flags(self, flags):
         if not isinstance(flags, dict):
@@ -193,48 +772,297 @@ class DebugSession:
         if not flags.get("present", False):
             return None
 
-        # RWX
-        r = "R"
-        w = "W" if flags.get("writable", False) else "-"
-        x = "X" if not flags.get("nx", False) else "-"
+        return perm_string(
+            flags.get("writable", False),
+            flags.get("user", False),
+            flags.get("nx", False),
+        )
 
-        perm = f"{r}{w}{x}"
+    # map: 주소 공간 전체 맵 생성
+    def cmd_map(self) -> None:
+        if self.is_running:
+            self.fail("map 불가: 현재 running 상태입니다. 먼저 p로 멈춰주세요.")
+            return
 
-        # user/kernel
-        if flags.get("user", False):
-            perm += " (user)"
-        else:
-            perm += " (kernel)"
+        try:
+            t0 = time.perf_counter()
+            ranges = []
+            for region in self.client.walk_address_space():
+                if self.cancel_event.is_set():
+                    self.fail(f"map CANCEL: {len(ranges)} regions in {time.perf_counter() - t0:.2f}s")
+                    return
+                ranges.append(region)
+            elapsed = time.perf_counter() - t0
+        except Exception as e:
+            self.fail(f"map ERROR: {e!s}")
+            return
+
+        self.map_ranges = ranges
+        self.map_scroll = 0
+        self.focus = "map"
+        self.status = f"map OK: {len(ranges)} regions in {elapsed:.2f}s (PgUp/PgDn, mj <#n|va>, map off)"
+
+    def close_map(self) -> None:
+        self.map_ranges = None
+        self.map_scroll = 0
+        self.focus = "mem"
+
+    def scroll_map(self, delta: int) -> None:
+        if self.map_ranges:
+            self.map_scroll = max(0, min(len(self.map_ranges) - 1, self.map_scroll + delta))
+
+    # 맵에서 구간 찾기: "#n" 은 n번째 구간, 아니면 VA를 포함하는(없으면 그 다음) 구간
+    def find_map_region(self, arg: str):
+        if not self.map_ranges:
+            return None
+
+        if arg.startswith("#"):
+            index = int(arg[1:], 0)
+            return index if 0 <= index < len(self.map_ranges) else None
+
+        va = int(arg, 0)
+        for index, (start, end, *_rest) in enumerate(self.map_ranges):
+            if va < end:
+                return index
+        return None
+
+    # mj: 구간으로 이동 (맵 스크롤 + Page Info / Mem Dump 를 구간 시작 VA로)
+    def jump_map_region(self, arg: str) -> None:
+        try:
+            index = self.find_map_region(arg)
+        except ValueError:
+            self.fail(f"invalid region: {arg!r}")
+            return
+
+        if index is None:
+            self.fail(f"no region for {arg!r}")
+            return
+
+        self.map_scroll = index
+        va = self.map_ranges[index][0]
+        self.set_inspect_va(va)
+        self.memdump(va)
+        if self.status_error:
+            return
+        self.status = f"region #{index}: VA=0x{va:x}"
+
+    # 모든 vCPU 의 레지스터 (지금 vCPU 는 방금 읽은 값, 나머지는 한 번의 pipeline 으로)
+    def update_cpu_states(self) -> None:
+        current = self.client.current_thread()
+        others = [tid for tid, _ in self.cpus if tid != current]
+        try:
+            states = self.client.read_thread_states(others) if others else {}
+        except RuntimeError as e:
+            states = {tid: e for tid in others}
+        if current is not None:
+            states[current] = self.regs
+        self.cpu_states = states
+
+    # 지금 vCPU 이름 (vCPU 가 1개면 None)
+    def cpu_label(self):
+        if len(self.cpus) < 2:
+            return None
+        current = self.client.current_thread()
+        for tid, label in self.cpus:
+            if tid == current:
+                return label
+        return None
+
+    # vCPU 표 [(지금 vCPU 여부, 이름, RegisterFile 또는 Exception 또는 None), ...]
+    def cpu_rows(self) -> list:
+        current = self.client.current_thread()
+        return [(tid == current, label, self.cpu_states.get(tid)) for tid, label in self.cpus]
+
+    # CPU 번호 -> thread id ("CPU#n" 이름이 없으면 목록 순서)
+    def find_cpu(self, index: int):
+        for tid, label in self.cpus:
+            if label == f"CPU#{index}":
+                return tid, label
+        if 0 <= index < len(self.cpus):
+            return self.cpus[index]
+        return None
+
+    # cpu <n>: vCPU 고르기 (Registers / 스텝 / Page Info 가 그 vCPU 기준)
+    def cmd_select_cpu(self, index: int) -> None:
+        if self.is_running:
+            self.fail("cpu 불가: 현재 running 상태입니다. 먼저 p로 멈춰주세요.")
+            return
+
+        found = self.find_cpu(index)
+        if found is None:
+            self.fail(f"cpu: no CPU#{index} ({len(self.cpus)} vCPUs)")
+            return
+        tid, label = found
 
-        return perm
+        self.run_action(f"cpu {index}", lambda: self.client.select_thread(tid))
+        if not self.status_error:
+            # 다른 vCPU 의 값이므로 바뀐 레지스터 표시는 하지 않음
+            self.prev_regs = self.regs
+            self.reg_changed = 0
+            self.status = f"cpu {index}: {label} (thread {tid})"
 
-    # Mem Dump
-    def memdump(self, va: int, size: int = 64) -> None:
+    # cpu grid / cpu grid off: vCPU 표
+    def set_cpu_grid(self, on: bool) -> None:
+        self.cpu_grid = on
+        self.cpu_states = {}
+        if not on:
+            self.status = "cpu grid off"
+            return
+        if len(self.cpus) < 2:
+            self.status = f"cpu grid: {len(self.cpus)} vCPU"
+            return
         if self.is_running:
-            self.status = "memdump 불가: 현재 running 상태입니다. 먼저 p로 멈춰주세요."
+            self.status = "cpu grid: 멈추면 표시합니다"
+            return
+        self.update_cpu_states()
+        self.status = f"cpu grid: {len(self.cpus)} vCPUs"
+
+    # cpus: vCPU 목록 + vCPU 별 RIP/CR3 (멈춰 있을 때) - running 중이면 QMP query-cpus-fast
+    def cmd_cpus(self) -> None:
+        if self.is_running:
+            self.cmd_cpus_qmp()
             return
 
         try:
-            data = self.client.read_virt_bytes(va, size)
-            lines = []
-            base = va
+            self.cpus = self.client.list_threads()
+            self.update_cpu_states()
+        except Exception as e:
+            self.fail(f"cpus ERROR: {e!s}")
+            return
 
-            for i in range(0, len(data), 16):
-                chunk = data[i:i+16]
-                addr = base + i
+        desc = []
+        for current, label, regs in self.cpu_rows():
+            mark = "*" if current else ""
+            if isinstance(regs, RegisterFile):
+                desc.append(f"{mark}{label} rip={regs.hex('rip')} cr3={regs.hex('cr3')}")
+            else:
+                desc.append(f"{mark}{label} ERROR: {regs!s}")
+        self.status = f"cpus: {len(self.cpus)} - " + ", ".join(desc)
 
-                hexpart = " ".join(f"{b:02x}" for b in chunk)
-                asciipart = "".join(
-                    chr(b) if 32 <= b < 127 else "."
-                    for b in chunk
-                )
-                
-                # 16바이트 기준 한 줄
-                lines.append(f"0x{addr:016x}: {hexpart:<47}  {asciipart}")
+    def cmd_cpus_qmp(self) -> None:
+        if self.client.qmp is None:
+            self.fail("cpus: running 중에는 QMP 소켓이 필요합니다 (--qmp)")
+            return
+        try:
+            cpus = self.client.qmp.query_cpus_fast()
+        except Exception as e:
+            self.fail(f"cpus ERROR: {e!s}")
+            return
+
+        desc = []
+        for cpu in cpus:
+            props = cpu.get("props", {})
+            where = f"socket {props.get('socket-id', '?')} core {props.get('core-id', '?')}"
+            desc.append(f"#{cpu.get('cpu-index')} thread {cpu.get('thread-id')} ({where})")
+        self.status = f"cpus: {len(cpus)} - " + ", ".join(desc)
 
-            self.mem_dump_lines = lines
-            self.status = f"memdump 0x{va:x} ({size} bytes) OK, lines={len(lines)}"
+    # Mem Dump (phys=True 면 물리 주소 덤프)
+    def memdump(self, va: int, size: int = 64, phys: bool = False) -> None:
+        label = "pmd" if phys else "memdump"
+        if self.is_running:
+            self.fail(f"{label} 불가: 현재 running 상태입니다. 먼저 p로 멈춰주세요.")
+            return
+
+        try:
+            t0 = time.perf_counter()
+            dump = self.read_mem_dump(va, size, phys)
+            elapsed = time.perf_counter() - t0
+
+            self.mem_dump = dump
+            self.mem_phys = phys
+            self.mem_scroll = 0
+            self.mem_error = None
+            self.focus = "mem"
+
+            rate = size / elapsed / 1e6 if elapsed > 0 else 0.0
+            self.status = (
+                f"{label} 0x{va:x} ({size} bytes) OK, lines={dump.rows}, "
+                f"holes={dump.hole_bytes()} bytes, {rate:.1f} MB/s"
+            )
+
+        except Exception as e:
+            if self.cancel_event.is_set():
+                # 취소면 이전 덤프를 그대로 둠
+                self.fail(f"{label} 0x{va:x} ({size} bytes) CANCEL")
+                return
+            self.mem_dump = None
+            self.mem_error = f"{label} ERROR: {e}"
+            self.fail(f"{label} ERROR: {e}")
+
+    def read_mem_dump(self, addr: int, size: int, phys: bool):
+        if phys:
+            return self.client.read_phys_dump(addr, size, cancel=self.cancel_event.is_set)
+        return self.client.read_virt_dump(addr, size, cancel=self.cancel_event.is_set)
 
+    # pfind: 물리 메모리 [pa, pa + size) 에서 패턴 검색 -> 첫 위치를 물리 덤프로
+    def cmd_search(self, pattern: bytes, pa: int, size: int) -> None:
+        if self.is_running:
+            self.fail("pfind 불가: 현재 running 상태입니다. 먼저 p로 멈춰주세요.")
+            return
+
+        def progress(done, total):
+            self.progress = f"{done >> 20}/{total >> 20} MB"
+
+        try:
+            t0 = time.perf_counter()
+            hits = self.client.search_phys(pattern, pa, size, cancel=self.cancel_event.is_set, progress=progress)
+            elapsed = time.perf_counter() - t0
         except Exception as e:
-            self.mem_dump_lines = [f"memdump ERROR: {e}"]
-            self.status = f"memdump ERROR: {e}"
\ No newline at end of file
+            self.fail(f"pfind {'CANCEL' if self.cancel_event.is_set() else 'ERROR'}: {e!s}")
+            return
+
+        self.search_hits = hits
+        if not hits:
+            self.status = f"pfind: no match in 0x{pa:x}+0x{size:x} ({elapsed:.2f}s)"
+            return
+
+        self.memdump(hits[0] - hits[0] % ROW_BYTES, MEM_FETCH, phys=True)
+        if self.status_error:
+            return
+        shown = ", ".join(f"0x{hit:x}" for hit in hits[:4])
+        more = f", ... ({len(hits)} hits)" if len(hits) > 4 else ""
+        self.status = f"pfind: {shown}{more} in {elapsed:.2f}s"
+
+    # Mem Dump - 보이는 줄만 포맷
+    def mem_rows(self, count: int) -> list:
+        if self.mem_dump is None:
+            return [self.mem_error] if self.mem_error else []
+        return self.mem_dump.format_rows(self.mem_scroll, count)
+
+    # Mem Dump - 스크롤하면 덤프 끝을 넘어 더 읽어야 하는지 (읽어야 하면 백그라운드로)
+    def mem_scroll_fetches(self, delta: int, visible: int) -> bool:
+        dump = self.mem_dump
+        if dump is None:
+            return False
+        return (max(0, self.mem_scroll + delta) + visible) * ROW_BYTES > dump.size
+
+    # Mem Dump - 스크롤 (덤프 끝을 넘으면 뒤쪽 메모리를 더 읽음)
+    def scroll_mem(self, delta: int, visible: int) -> None:
+        dump = self.mem_dump
+        if dump is None:
+            return
+
+        scroll = max(0, self.mem_scroll + delta)
+        need = (scroll + visible) * ROW_BYTES - dump.size
+        if need > 0:
+            if self.is_running:
+                self.fail("memdump 불가: 현재 running 상태입니다. 먼저 p로 멈춰주세요.")
+            else:
+                try:
+                    dump.append(self.read_mem_dump(dump.end, max(need, MEM_FETCH), self.mem_phys))
+                except Exception as e:
+                    self.fail(f"memdump ERROR: {e}")
+
+        self.mem_scroll = max(0, min(scroll, dump.rows - visible))
+
+    # goto: 덤프 안의 주소면 그 줄로 스크롤, 아니면 그 주소부터 새로 읽음
+    def goto_mem(self, va: int, visible: int) -> None:
+        dump = self.mem_dump
+        if dump is not None and dump.va <= va < dump.end:
+            self.mem_scroll = 0
+            self.scroll_mem((va - dump.va) // ROW_BYTES, visible)
+            self.focus = "mem"
+            self.status = f"goto 0x{va:x}"
+            return
+
+        self.memdump(va - va % ROW_BYTES, MEM_FETCH, phys=self.mem_phys)
@@ -0,0 +1,122 @@
+import time
+
+from session import DebugSession
+from worker import SessionWorker
+
+# 끊긴 대상 재연결 간격 (실패할 때마다 두 배, 최대 RECONNECT_MAX 초)
+RECONNECT_MIN = 1.0
+RECONNECT_MAX = 30.0
+
+class SessionManager:
+    # 여러 QEMU 게스트를 한 번에 디버깅 (대상마다 DebugSession + SessionWorker)
+    #   - 대상마다 worker 스레드가 따로라 연결 / 새로고침 / 재연결이 서로를 기다리지 않음
+    #   - 화면은 지금 대상(active)의 세션 상태를 그대로 그리므로 대상 전환은 I/O 없이 바로
+    #   - gdb 프로세스(rsp: 소켓) 가 죽은 대상은 그 대상의 worker 에서 재연결 (간격은 점점 늘림)
+    #   session_args: 대상마다 다른 값은 리스트 (ram_file / qmp), 나머지는 모든 대상에 공통
+    def __init__(self, targets, ram_files=(), qmps=(), **session_args) -> None:
+        self.sessions = []
+        for i, target in enumerate(targets):
+            ram_file = ram_files[i] if i < len(ram_files) else None
+            qmp = qmps[i] if i < len(qmps) else None
+            self.sessions.append(DebugSession(target=target, ram_file=ram_file, qmp=qmp, **session_args))
+        if not self.sessions:
+            raise ValueError("no targets")
+        self.workers = [SessionWorker(sess) for sess in self.sessions]
+        self.index = 0
+
+        # 재연결: 대상별 연속 실패 횟수 / 다음 시도 시각
+        self.failures = [0] * len(self.sessions)
+        self.retry_at = [0.0] * len(self.sessions)
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+    @property
+    def active(self) -> DebugSession:
+        return self.sessions[self.index]
+
+    @property
+    def worker(self) -> SessionWorker:
+        return self.workers[self.index]
+
+    # 모든 대상에 동시에 연결 (대상마다 자기 worker 에서)
+    def connect_all(self) -> None:
+        for i, (sess, worker) in enumerate(zip(self.sessions, self.workers)):
+            sess.status = f"init: connecting to {sess.client.target} via {sess.backend} ..."
+            worker.submit("connect", self.connect_job(i))
+
+    # 멈춰 있는 모든 대상을 동시에 새로고침 (작업 중 / running 인 대상은 건너뜀) -> 요청한 대상 수
+    def refresh_all(self) -> int:
+        count = 0
+        for sess, worker in zip(self.sessions, self.workers):
+            if worker.busy or sess.is_running or not sess.alive():
+                continue
+            worker.submit("refresh", sess.cmd_refresh)
+            count += 1
+        return count
+
+    # 대상 전환 (캐시된 상태를 그대로 보여 줌)
+    def switch(self, index: int) -> bool:
+        if not 0 <= index < len(self.sessions):
+            return False
+        self.index = index
+        return True
+
+    # UI 루프마다 호출: 끝난 작업의 오류 표시, 스스로 멈춘 대상 갱신, peek, 끊긴 대상 재연결
+    def poll(self) -> None:
+        now = time.monotonic()
+        for i, (sess, worker) in enumerate(zip(self.sessions, self.workers)):
+            for label, _elapsed, error in worker.poll():
+                if error is not None:
+                    sess.fail(f"{label} ERROR: {error!s}")
+
+            if worker.busy:
+                continue
+            if not sess.alive():
+                if now >= self.retry_at[i]:
+                    worker.submit("reconnect", self.connect_job(i, reconnect=True))
+            elif sess.check_stopped():
+                worker.submit("stopped", sess.cmd_stopped)
+            elif sess.peek_due():
+                worker.submit("peek", sess.cmd_peek)
+
+    # 연결 / 재연결 작업 (실패하면 다음 시도 시각을 늦춤)
+    def connect_job(self, index: int, reconnect: bool = False):
+        sess = self.sessions[index]
+
+        def job():
+            if reconnect:
+                sess.reconnect()
+            else:
+                sess.connect()
+
+            if sess.alive():
+                self.failures[index] = 0
+                return
+            self.failures[index] += 1
+            delay = min(RECONNECT_MAX, RECONNECT_MIN * 2 ** (self.failures[index] - 1))
+            self.retry_at[index] = time.monotonic() + delay
+            sess.fail(sess.status + f" (retry in {delay:.0f}s)")
+        return job
+
+    # 대상 표시 ("1:localhost:1234*" - * 지금 대상, run: 실행 중, down: 끊김)
+    def labels(self) -> list:
+        out = []
+        for i, (sess, worker) in enumerate(zip(self.sessions, self.workers)):
+            state = ""
+            if not sess.alive():
+                state = " down"
+            elif sess.is_running:
+                state = " run"
+            elif worker.busy:
+                state = " busy"
+            mark = "*" if i == self.index else ""
+            out.append(f"{i}:{sess.client.target}{mark}{state}")
+        return out
+
+    # 모든 대상 정리 (worker 를 먼저 멈춘 뒤 연결을 닫음)
+    def close(self) -> None:
+        for worker in self.workers:
+            worker.stop()
+        for sess in self.sessions:
+            sess.close()
@@ -0,0 +1,81 @@
+import os
+import sys
+
+import pytest
+
+# 테스트는 qvhd/ 에서 실행하는 스크립트와 같은 평평한 import 를 씀
+QVHD_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if QVHD_DIR not in sys.path:
+    sys.path.insert(0, QVHD_DIR)
+
+from fake_gdbstub import FakeGdbStub, build_demo_guest
+from gdb_mi_client import GdbMIClient
+from gdb_rsp_client import GdbRSPClient
+from phys_mem import PhysicalMemory
+from session import DebugSession
+
+# mi 백엔드가 gdb 대신 실행하는 가짜 gdb
+FAKE_GDB = os.path.join(QVHD_DIR, "fake_gdb.py")
+
+@pytest.fixture
+def guest():
+    return build_demo_guest(cpus=2)
+
+@pytest.fixture
+def stub(guest):
+    with FakeGdbStub(guest) as stub:
+        yield stub
+
+@pytest.fixture
+def rsp(stub):
+    client = GdbRSPClient(target=stub.target)
+    client.connect()
+    yield client
+    client.close()
+
+@pytest.fixture
+def gdb_path():
+    return FAKE_GDB
+
+# mi 백엔드: GdbMIClient -> fake_gdb.py (MI 를 RSP 로 바꿈) -> FakeGdbStub
+@pytest.fixture
+def mi(stub, gdb_path):
+    client = GdbMIClient(target=stub.target, gdb_path=gdb_path)
+    client.connect()
+    yield client
+    client.close()
+
+# 두 백엔드 클라이언트 (같은 결과를 내야 하는 테스트용)
+@pytest.fixture(params=["rsp", "mi"])
+def client(request):
+    return request.getfixturevalue(request.param)
+
+# 게스트 RAM 을 QEMU memory-backend-file 처럼 파일로
+#   sync_ram(): 게스트를 고친 뒤 파일을 제자리에서 다시 씀 (mmap 에도 바로 보임)
+@pytest.fixture
+def ram_file(guest, tmp_path):
+    path = tmp_path / "ram"
+    path.write_bytes(guest.ram)
+    return path
+
+@pytest.fixture
+def sync_ram(guest, ram_file):
+    def sync():
+        with open(ram_file, "r+b") as f:
+            f.write(guest.ram)
+    return sync
+
+@pytest.fixture
+def phys(ram_file):
+    mem = PhysicalMemory(str(ram_file))
+    yield mem
+    mem.close()
+
+# 두 백엔드로 연결한 DebugSession
+@pytest.fixture(params=["rsp", "mi"])
+def sess(request, stub, gdb_path):
+    sess = DebugSession(target=stub.target, gdb_path=gdb_path, backend=request.param)
+    sess.connect()
+    assert sess.alive() and not sess.status_error, sess.status
+    yield sess
+    sess.close()
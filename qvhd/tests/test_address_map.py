@@ -0,0 +1,42 @@
+def test_regions(rsp):
+    regions = {start: (end, perm, size) for start, end, _pa, perm, size in rsp.walk_address_space()}
+    assert regions == {
+        0xFFFFFFFF81000000: (0xFFFFFFFF81040000, "R-X (kernel)", "4K"),
+        0xFFFF888000000000: (0xFFFF888000400000, "RW- (kernel)", "2M"),
+        0x400000: (0x410000, "R-X (user)", "4K"),
+        0x7FFFFFFDE000: (0x7FFFFFFFF000, "RW- (user)", "4K"),
+    }
+
+# 물리 주소가 끊기면 권한이 같아도 다른 구간
+def test_split_on_physical_gap(rsp, guest):
+    guest.map_page(0x600000, 0x300000)
+    guest.map_page(0x601000, 0x302000)
+    regions = [r for r in rsp.walk_address_space() if 0x600000 <= r[0] < 0x700000]
+    assert [(start, end, pa) for start, end, pa, _perm, _size in regions] == [
+        (0x600000, 0x601000, 0x300000), (0x601000, 0x602000, 0x302000),
+    ]
+
+# 같은 테이블을 가리키는 엔트리가 여럿이어도 (앞에서 버린 테이블은 다시 읽어) 모두 나옴
+def test_shared_table(rsp, guest):
+    pml4 = guest.regs["cr3"]
+    guest.write_qword(pml4 + 300 * 8, guest.read_qword(pml4 + 511 * 8))
+    regions = {start: end for start, end, *_ in rsp.walk_address_space()}
+
+    low = (1 << 39) - 1
+    alias = 0xFFFF000000000000 | (300 << 39)
+    assert regions[alias | (0xFFFFFFFF81000000 & low)] == alias | (0xFFFFFFFF81040000 & low)
+    assert regions[0xFFFFFFFF81000000] == 0xFFFFFFFF81040000
+    assert len(regions) == 5
+
+def test_session_map(stub, guest):
+    from session import DebugSession
+    sess = DebugSession(target=stub.target, backend="rsp")
+    sess.connect()
+    try:
+        sess.cmd_map()
+        assert not sess.status_error, sess.status
+        assert len(sess.map_ranges) == 4
+        sess.jump_map_region("2")
+        assert not sess.status_error, sess.status
+    finally:
+        sess.close()
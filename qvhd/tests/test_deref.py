@@ -0,0 +1,23 @@
+from fake_gdbstub import PTE_P, PTE_W
+
+# 레벨별로 모아 읽는 일괄 변환은 VA 마다 따로 워크한 결과와 같음
+def test_translate_many_matches_inspect_va(client, guest):
+    guest.map_page(0xFFFFC90000000000, 0x300000, PTE_P | PTE_W)
+    vas = [guest.regs["rip"], 0xFFFF888000000000, 0xFFFF888000345678, 0x400000,
+           0x7FFFFFFFE000, 0x7FFF00000000, 0xFFFFC90000000010]
+    cr3 = client.read_cr3()
+    batch = client.translate_many(vas, cr3=cr3)
+    assert [batch[va] for va in vas] == [client.inspect_va(va, cr3=cr3) for va in vas]
+
+# 주소로 보이는 레지스터만 행으로 (매핑이 없으면 데이터 없이)
+def test_deref_rows(sess, guest):
+    guest.regs["rbx"] = 0xFFFF888000001000
+    guest.regs["rsi"] = 0x10000000
+    guest.write_virt(0xFFFF888000001000, b"deref target 16b")
+    sess.set_deref(True)
+    sess.cmd_step()
+    rows = {name: (va, info, data) for name, va, info, data in sess.deref_rows}
+    assert rows["rbx"][1]["phys_addr"] == guest.translate(0xFFFF888000001000)
+    assert rows["rbx"][2] == guest.read_virt(0xFFFF888000001000, 16)
+    assert not rows["rsi"][1]["present"] and rows["rsi"][2] is None
+    assert set(rows) == {"rbx", "rsi", "rsp"}
@@ -0,0 +1,115 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+import headless
+from headless import API_VERSION, HeadlessSession
+
+@pytest.fixture(params=["rsp", "mi"])
+def h(request, stub, gdb_path):
+    h = HeadlessSession(stub.target, request.param, gdb_path, events=("regs", "page", "dump", "map"))
+    hello = h.connect()
+    assert hello[-1]["type"] == "hello" and hello[-1]["ok"], hello
+    yield h
+    h.close()
+
+def last(events) -> dict:
+    assert events[-1]["type"] == "cmd"
+    return events[-1]
+
+def test_hello(stub, gdb_path):
+    with HeadlessSession(stub.target, "rsp", gdb_path) as h:
+        events = h.connect()
+    types = [e["type"] for e in events]
+    assert types[-1] == "hello" and "regs" in types
+    hello = events[-1]
+    assert (hello["version"], hello["backend"], hello["seq"]) == (API_VERSION, "rsp", 0)
+    assert len(hello["cpus"]) == 2
+
+def test_step_emits_changed_regs(h, guest):
+    events = h.run("n 100")
+    cmd = last(events)
+    assert cmd["ok"] and not cmd["running"] and cmd["seq"] == 1
+    regs = [e for e in events if e["type"] == "regs"]
+    assert len(regs) == 1
+    assert regs[0]["regs"]["rax"] == guest.regs["rax"] == 100
+    assert "rax" in regs[0]["changed"]
+    assert all(e["seq"] == 1 for e in events)
+
+    # 바뀐 것이 없으면 데이터 이벤트 없음, regs 는 강제로 다시 보냄
+    assert [e["type"] for e in h.run("sleep 0")] == ["cmd"]
+    assert h.run("# comment") == []
+    assert [e["type"] for e in h.run("regs")] == ["regs", "cmd"]
+
+def test_dump_and_map_events(h, guest):
+    events = h.run("md 0xffffffff81000100 64")
+    assert last(events)["ok"], last(events)
+    dump = next(e for e in events if e["type"] == "dump")
+    assert (dump["va"], dump["size"]) == (0xFFFFFFFF81000100, 64)
+    assert bytes.fromhex(dump["data"]) == guest.read_virt(0xFFFFFFFF81000100, 64)
+    json.dumps(events)
+
+    # 매핑 없는 VA 는 실패가 아니라 구멍
+    events = h.run("md 0x10000000 64")
+    assert last(events)["ok"]
+    assert next(e for e in events if e["type"] == "dump")["holes"] == [[0x10000000, 0x10000040]]
+
+    events = h.run("map")
+    regions = next(e for e in events if e["type"] == "map")["regions"]
+    assert {r["va_start"] for r in regions} >= {0x400000, 0xFFFFFFFF81000000}
+
+# 실패는 DebugSession.fail() 로 표시된 명령만 (상태줄 문구와 무관)
+@pytest.mark.parametrize("line", ["bogus", "n x", "sleep soon", "wait x", "trace stop", "md zz"])
+def test_failing_commands(h, line):
+    cmd = last(h.run(line))
+    assert not cmd["ok"], cmd
+    assert h.errors == 1
+
+def test_continue_wait_pause(h):
+    assert last(h.run("c"))["running"]
+    cmd = last(h.run("wait 0.05"))
+    assert not cmd["ok"] and cmd["running"]
+    cmd = last(h.run("p"))
+    assert cmd["ok"] and not cmd["running"]
+    assert last(h.run("wait"))["ok"]
+
+def test_run_until_and_wait(h, guest):
+    target = guest.code_base + 0x12
+    cmd = last(h.run(f"until rip==0x{target:x}"))
+    assert cmd["ok"], cmd
+    assert last(h.run("wait 2"))["ok"]
+    regs = [e for e in h.run("regs") if e["type"] == "regs"]
+    assert regs[0]["regs"]["rip"] == target
+
+def test_run_script_stop_on_error(h):
+    events = list(h.run_script(["n 2", "bogus", "n 3"], stop_on_error=True))
+    cmds = [e for e in events if e["type"] == "cmd"]
+    assert [(e["cmd"], e["ok"]) for e in cmds] == [("n 2", True), ("bogus", False)]
+    events = list(h.run_script(["n 1", "q", "n 3"]))
+    assert [e["cmd"] for e in events if e["type"] == "cmd"] == ["n 1"]
+
+def test_unknown_event_type():
+    with pytest.raises(ValueError):
+        HeadlessSession(events=("regs", "bogus"))
+
+def test_cli(stub, gdb_path):
+    script = "n 10\nbogus\nregs\n"
+    proc = subprocess.run(
+        [sys.executable, headless.__file__, "--target", stub.target, "--backend", "rsp", "--gdb", gdb_path,
+         "--events", "regs", "-"],
+        input=script, capture_output=True, text=True, timeout=60,
+    )
+    events = [json.loads(line) for line in proc.stdout.splitlines()]
+    assert proc.returncode == 1, proc.stderr
+    assert events[0]["type"] == "regs" and events[1]["type"] == "hello"
+    cmds = [(e["cmd"], e["ok"]) for e in events if e["type"] == "cmd"]
+    assert cmds == [("n 10", True), ("bogus", False), ("regs", True)]
+    assert {e["type"] for e in events} <= {"hello", "regs", "cmd"}
+
+    proc = subprocess.run(
+        [sys.executable, headless.__file__, "--target", stub.target, "--backend", "rsp", "-e", "n 1"],
+        capture_output=True, text=True, timeout=60,
+    )
+    assert proc.returncode == 0, proc.stderr
@@ -0,0 +1,61 @@
+import pytest
+
+# 유저 스택은 0x7FFFFFFFF000 에서 끝남: 그 뒤는 구멍
+STACK_TAIL = 0x7FFFFFFFD000
+
+def test_read_virt_dump_holes(client, guest):
+    va = STACK_TAIL
+    guest.write_virt(va, bytes(range(256)) * 32)
+    dump = client.read_virt_dump(va, 0x3000)
+    assert bytes(dump.data[:0x2000]) == guest.read_virt(va, 0x2000)
+    assert dump.holes == [(va + 0x2000, va + 0x3000)]
+
+# 한 번 실패한 chunk 는 페이지 단위로 다시 읽어 채움 (한 페이지짜리 chunk 도)
+@pytest.mark.parametrize("chunk", [0x1000, 0x4000])
+def test_read_virt_dump_retries_failed_chunk(rsp, guest, chunk):
+    va = 0xFFFFFFFF81000000
+    bad = va + 0x1000
+    read_virt = guest.read_virt
+    failed = []
+
+    def flaky(addr, size):
+        if addr <= bad < addr + size and not failed:
+            failed.append(addr)
+            return None
+        return read_virt(addr, size)
+
+    guest.read_virt = flaky
+    dump = rsp.read_virt_dump(va, 0x8000, chunk=chunk)
+    assert failed
+    assert not dump.holes
+    assert bytes(dump.data) == read_virt(va, 0x8000)
+
+# chunk 가 페이지 경계를 넘지 않으므로 다시 읽는 것은 실패한 페이지뿐
+@pytest.mark.parametrize("packet_size", [0x1000, 0x4000, 0x8000])
+def test_read_virt_dump_page_aligned_chunks(rsp, guest, packet_size):
+    rsp.packet_size = packet_size
+    va = 0xFFFFFFFF81000800
+    bad = 0xFFFFFFFF81002000
+    read_virt = guest.read_virt
+    reads = []
+
+    def flaky(addr, size):
+        reads.append((addr, size))
+        if addr <= bad < addr + size and len([r for r in reads if r[0] <= bad < r[0] + r[1]]) == 1:
+            return None
+        return read_virt(addr, size)
+
+    guest.read_virt = flaky
+    dump = rsp.read_virt_dump(va, 0x6000)
+    assert not dump.holes
+    assert bytes(dump.data) == read_virt(va, 0x6000)
+    # 한 페이지 안이거나, 양 끝이 페이지 경계 (또는 덤프의 양 끝)
+    edges = {va, va + 0x6000}
+    for addr, size in reads:
+        end = addr + size
+        assert addr >> 12 == (end - 1) >> 12 or (
+            (addr in edges or addr % 0x1000 == 0) and (end in edges or end % 0x1000 == 0)
+        ), (hex(addr), size)
+    # 다시 읽은 것은 실패한 페이지 안쪽만
+    addr, size = reads[-1]
+    assert addr == bad and size <= 0x1000
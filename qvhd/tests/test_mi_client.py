@@ -0,0 +1,37 @@
+import time
+
+def test_connect_reads_registers(mi, guest):
+    regs = mi.read_registers()
+    assert regs["rip"] == guest.regs["rip"]
+    assert regs["rcx"] == guest.regs["rcx"]
+    assert mi.read_cr3() == guest.regs["cr3"]
+
+def test_stepi(mi, guest):
+    rip = guest.regs["rip"]
+    mi.stepi()
+    assert guest.steps == 1
+    assert mi.read_registers()["rip"] == guest.regs["rip"] != rip
+
+# 응답은 token 으로 짝지음 - 한꺼번에 보낸 명령도 보낸 순서대로 결과가 돌아옴
+def test_pipeline_keeps_order(mi, guest):
+    cmds = [f"-data-read-memory-bytes 0x{guest.code_base + i * 16:x} 16" for i in range(32)]
+    results = mi.mi_pipeline(cmds)
+    got = [bytes.fromhex(result.get("memory")[0]["contents"]) for result, _streams in results]
+    assert got == [guest.read_virt(guest.code_base + i * 16, 16) for i in range(32)]
+
+def test_run_until(mi, guest):
+    target = guest.code_base + 0x12
+    mi.run_until(target)
+    assert mi.read_registers()["rip"] == target
+
+def test_cont_and_interrupt(mi, guest):
+    mi.cont()
+    time.sleep(0.05)
+    mi.interrupt()
+    assert guest.steps > 0
+    assert mi.read_registers()["rip"] == guest.regs["rip"]
+
+def test_monitor_and_inspect_va(mi, rsp, guest):
+    assert "CR3=" in mi.monitor_cmd("info registers")
+    vas = [guest.regs["rip"], 0xFFFF888000123456, 0x400000, 0x10000000]
+    assert [mi.inspect_va(va) for va in vas] == [rsp.inspect_va(va) for va in vas]
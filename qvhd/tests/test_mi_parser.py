@@ -0,0 +1,35 @@
+import pytest
+
+from mi_parser import MIParseError, parse_record
+
+def test_result_record():
+    rec = parse_record('12^done,value="0x10",regs=[{number="0",value="0x1"},{number="1",value="0x2"}]')
+    assert (rec.token, rec.kind, rec.cls) == (12, "result", "done")
+    assert rec.get("value") == "0x10"
+    assert rec.get("regs") == [{"number": "0", "value": "0x1"}, {"number": "1", "value": "0x2"}]
+
+def test_result_without_results():
+    rec = parse_record("3^running")
+    assert (rec.token, rec.kind, rec.cls, rec.results) == (3, "result", "running", {})
+
+# frame={...},frame={...} 처럼 이름 붙은 list 항목은 값만 남김
+def test_named_list_items():
+    rec = parse_record('^done,stack=[frame={level="0"},frame={level="1"}],names=["rax","",""]')
+    assert rec.get("stack") == [{"level": "0"}, {"level": "1"}]
+    assert rec.get("names") == ["rax", "", ""]
+
+def test_async_and_stream_records():
+    rec = parse_record('*stopped,reason="end-stepping-range",frame={addr="0xffffffff81000103"}')
+    assert (rec.token, rec.kind, rec.cls) == (None, "exec", "stopped")
+    assert rec.get("frame") == {"addr": "0xffffffff81000103"}
+
+    rec = parse_record(r'~"RAX=0000 \"x\"\n"')
+    assert (rec.kind, rec.text) == ("console", 'RAX=0000 "x"\n')
+    assert parse_record(r'&"\101\302\251"').text == "A©"
+    assert parse_record("(gdb) ").kind == "prompt"
+    assert parse_record("garbage").kind == "raw"
+
+@pytest.mark.parametrize("line", ['^done,value="1"junk', '^done,value="1', "^done,list=[1,2", "^done,value"])
+def test_rejects_malformed_records(line):
+    with pytest.raises(MIParseError):
+        parse_record(line)
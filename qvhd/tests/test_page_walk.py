@@ -0,0 +1,32 @@
+import struct
+
+def table_of(guest, pa) -> list:
+    return list(struct.unpack("<512Q", guest.read_phys(pa, 4096)))
+
+def test_read_phys_tables(rsp, guest):
+    pml4 = guest.regs["cr3"]
+    pdpt = guest.read_qword(pml4 + 511 * 8) & 0x000FFFFFFFFFF000
+    tables = rsp.read_phys_tables([pml4, pdpt])
+    assert tables == {pml4: table_of(guest, pml4), pdpt: table_of(guest, pdpt)}
+
+# 레벨마다 4KB 테이블을 통째로 읽어 두므로 같은 테이블을 지나는 다음 워크는 더 읽지 않음
+def test_walks_share_tables(rsp, stub, guest):
+    cr3 = rsp.read_cr3()
+    tables = {}
+    info = rsp.inspect_va(0xFFFFFFFF81000000, cr3=cr3, tables=tables)
+    assert list(info["tables"]) == ["pml4", "pdpt", "pd", "pt"]
+    assert len(tables) == 4 and all(len(entries) == 512 for entries in tables.values())
+
+    n0 = stub.packets
+    for off in range(0, 0x40000, 0x1000):
+        info = rsp.inspect_va(0xFFFFFFFF81000000 + off, cr3=cr3, tables=tables)
+        assert info["phys_addr"] == guest.translate(0xFFFFFFFF81000000 + off)
+    assert stub.packets == n0
+
+def test_walk_reports_level_of_missing_entry(rsp, guest):
+    info = rsp.inspect_va(0xFFFFFFFF81040000)
+    assert not info["present"]
+    assert info["level"] == "pt"
+    info = rsp.inspect_va(0x0000100000000000)
+    assert not info["present"]
+    assert info["level"] == "pml4"
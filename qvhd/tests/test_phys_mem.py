@@ -0,0 +1,36 @@
+import pytest
+
+from fake_gdbstub import PTE_NX, PTE_P, PTE_W
+from phys_mem import FOUR_GB, ram_layout
+
+def test_ram_layout():
+    assert ram_layout(64 << 20) == [(0, 64 << 20, 0)]
+    assert ram_layout(4 << 30, "pc") == [(0, 0xC0000000, 0), (FOUR_GB, FOUR_GB + (1 << 30), 0xC0000000)]
+    assert ram_layout(4 << 30, "q35") == [(0, 0x80000000, 0), (FOUR_GB, FOUR_GB + (2 << 30), 0x80000000)]
+    with pytest.raises(ValueError):
+        ram_layout(64 << 20, "virt")
+
+def test_physical_memory_reads_ram_file(phys, guest):
+    assert phys.ram_size == len(guest.ram)
+    assert phys.read(guest.regs["cr3"], 4096) == guest.read_phys(guest.regs["cr3"], 4096)
+    assert not phys.contains(len(guest.ram) - 4, 8)
+    with pytest.raises(RuntimeError):
+        phys.offset(len(guest.ram))
+
+# RAM 파일이 있으면 페이지 워크 / 맵 / 일괄 변환이 xp 와 같은 결과를 패킷 없이
+def test_walks_via_mmap_match_xp(rsp, stub, guest, sync_ram, phys):
+    for off in range(0, 4 << 20, 0x1000):
+        guest.map_page(0xFFFFC90000000000 + off, off, PTE_P | PTE_W | PTE_NX)
+    sync_ram()
+    cr3 = rsp.read_cr3()
+    vas = [guest.regs["rip"], 0xFFFF888000123456, 0xFFFFC90000123456, 0x7FFFFFFFE010, 0x10000000]
+    xp_walks = [rsp.inspect_va(va, cr3=cr3) for va in vas]
+    xp_map = list(rsp.walk_address_space(cr3=cr3))
+    xp_batch = rsp.translate_many(vas, cr3=cr3)
+
+    rsp.phys = phys
+    n0 = stub.packets
+    assert [rsp.inspect_va(va, cr3=cr3) for va in vas] == xp_walks
+    assert list(rsp.walk_address_space(cr3=cr3)) == xp_map
+    assert rsp.translate_many(vas, cr3=cr3) == xp_batch
+    assert stub.packets == n0
@@ -0,0 +1,95 @@
+import pytest
+
+from phys_read import XP_MAX_QWORDS, PhysReadPlan, parse_xp_qwords, xp_requests
+
+def plan_with(xp, pmemsave) -> PhysReadPlan:
+    plan = PhysReadPlan()
+    plan.costs = {"xp": xp, "pmemsave": pmemsave}
+    plan.update_threshold()
+    return plan
+
+# (고정 비용, 바이트당 비용) 두 직선 -> pmemsave 를 쓰는 크기 구간 [threshold, limit)
+def test_plan_pmemsave_cheaper_per_byte():
+    plan = plan_with((0.001, 1e-8), (0.003, 1e-9))
+    assert plan.limit is None
+    assert not plan.use_pmemsave(plan.threshold - 1)
+    assert plan.use_pmemsave(plan.threshold) and plan.use_pmemsave(1 << 30)
+    for size in (4096, plan.threshold - 1, plan.threshold, 8 << 20):
+        assert plan.use_pmemsave(size) == (plan.cost("pmemsave", size) <= plan.cost("xp", size))
+
+def test_plan_pmemsave_cheaper_fixed_cost_only():
+    plan = plan_with((0.003, 1e-9), (0.001, 1e-8))
+    assert plan.threshold == 0
+    assert plan.use_pmemsave(64) and not plan.use_pmemsave(plan.limit)
+    for size in (64, plan.limit - 1, plan.limit, 8 << 20):
+        assert plan.use_pmemsave(size) == (plan.cost("pmemsave", size) < plan.cost("xp", size))
+    assert f"pmemsave < {plan.limit} bytes" in plan.summary()
+
+def test_plan_one_method_always_cheaper():
+    assert plan_with((0.001, 1e-9), (0.002, 2e-9)).threshold is None
+    plan = plan_with((0.002, 2e-9), (0.001, 1e-9))
+    assert (plan.threshold, plan.limit) == (0, None)
+    plan = plan_with((0.001, 1e-9), (0.001, 1e-9))
+    assert plan.threshold is None
+
+def test_plan_without_pmemsave():
+    plan = plan_with((0.003, 1e-8), (0.001, 1e-9))
+    plan.disable_pmemsave()
+    plan.update_threshold()
+    assert not plan.use_pmemsave(1 << 20)
+    assert "xp only" in plan.summary()
+
+def test_xp_requests_align_and_split():
+    base, reqs = xp_requests(0x1003, 8 * XP_MAX_QWORDS)
+    assert base == 0x1000
+    assert reqs == [(0x1000, XP_MAX_QWORDS), (0x1000 + 8 * XP_MAX_QWORDS, 1)]
+
+def test_parse_xp_qwords():
+    text = "0000000000001000: 0x0000000000002003 0x0000000000000000\n0000000000001010: 0x8000000000003063\n"
+    assert parse_xp_qwords(text, 0x1000, 3) == [0x2003, 0, 0x8000000000003063]
+    with pytest.raises(RuntimeError):
+        parse_xp_qwords("Cannot access memory\n", 0x1000, 3)
+
+@pytest.mark.parametrize("size", [1, 64, 4096, 4104, 64 << 10, 1 << 20])
+def test_read_phys_bytes(rsp, guest, size):
+    guest.write_phys(0x100000, bytes(range(256)) * 4096)
+    pa = 0x100000 + 5
+    assert rsp.read_phys_bytes(pa, size) == guest.read_phys(pa, size)
+    assert rsp.read_phys_xp(pa, size) == guest.read_phys(pa, size)
+
+def test_read_phys_pmemsave(rsp, guest):
+    guest.write_phys(0x200000, bytes(range(256)) * 1024)
+    assert rsp.read_phys_pmemsave(0x200000, 256 << 10) == guest.read_phys(0x200000, 256 << 10)
+    assert rsp.phys_read_plan().pmemsave_ok
+
+# monitor 가 오류 문자열을 돌려주면 이후로는 xp 만 씀
+def test_pmemsave_error_disables_pmemsave(rsp, guest):
+    with pytest.raises(RuntimeError, match="pmemsave"):
+        rsp.read_phys_pmemsave(len(guest.ram) - 4096, 8192)
+    plan = rsp.phys_read_plan()
+    assert not plan.pmemsave_ok and not plan.use_pmemsave(1 << 20)
+
+def test_calibrate_phys_reads(rsp):
+    plan = rsp.calibrate_phys_reads()
+    assert plan.calibrated
+    assert set(plan.costs) == {"xp", "pmemsave"}
+
+def test_search_phys_across_chunks(rsp, guest):
+    needle = b"qvhd-needle"
+    guest.write_phys(0x2345678, needle)
+    guest.write_phys(0x400000 - 4, needle)
+    assert rsp.search_phys(needle, 0, len(guest.ram)) == [0x3FFFFC, 0x2345678]
+    assert rsp.search_phys(needle, 0, len(guest.ram), limit=1) == [0x3FFFFC]
+    with pytest.raises(ValueError):
+        rsp.search_phys(b"", 0, 0x1000)
+
+def test_read_phys_dump(rsp, guest):
+    guest.write_phys(0x2345678, b"qvhd-needle")
+    dump = rsp.read_phys_dump(0x2345000, 0x2000)
+    assert bytes(dump.data[0x678:0x683]) == b"qvhd-needle"
+    assert not dump.holes
+
+    # RAM 끝을 넘는 부분은 페이지 단위 구멍
+    end = len(guest.ram)
+    dump = rsp.read_phys_dump(end - 0x2000, 0x4000)
+    assert dump.holes == [(end, end + 0x2000)]
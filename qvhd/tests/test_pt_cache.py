@@ -0,0 +1,73 @@
+import pytest
+
+from fake_gdbstub import PTE_P
+from pt_cache import PageTableCache
+
+# generation 이 바뀌면 leaf 엔트리만 다시 읽어 같으면 재사용, 다르면 다시 워크 (RAM 파일 mmap 경로)
+@pytest.mark.parametrize("batch", [False, True])
+def test_revalidates_after_remap(rsp, guest, phys, sync_ram, batch):
+    rsp.phys = phys
+    cache = PageTableCache()
+    va = 0xFFFFFFFF81003010
+    cr3 = rsp.read_cr3()
+
+    def translate():
+        if batch:
+            return rsp.translate_many([va], cr3=cr3, cache=cache)[va]
+        return rsp.inspect_va(va, cr3=cr3, cache=cache)
+
+    first = translate()
+    assert first["phys_addr"] == guest.translate(va)
+    assert cache.stats["misses"] == 1
+
+    cache.bump()
+    assert translate() == first
+    assert cache.stats["revalidated"] == 1
+
+    # 게스트가 페이지를 다른 프레임으로 옮김 (leaf PTE 만 바뀜)
+    new_frame = guest.alloc_frames(0x1000)
+    guest.map_page(va & ~0xFFF, new_frame, PTE_P)
+    sync_ram()
+
+    cache.bump()
+    moved = translate()
+    assert moved["phys_addr"] == new_frame + 0x010 == guest.translate(va)
+    assert cache.stats["misses"] == 2
+
+    # 같은 generation 안에서는 다시 읽지 않음
+    assert translate() == moved
+    assert cache.stats["hits"] == 1
+
+def test_unmapped_page(rsp, guest, phys, sync_ram):
+    rsp.phys = phys
+    cache = PageTableCache()
+    va = 0x400000
+    cr3 = rsp.read_cr3()
+    assert rsp.inspect_va(va, cr3=cr3, cache=cache)["present"]
+
+    guest.write_qword(cache.leaf_addr(cr3, va), 0)
+    sync_ram()
+
+    cache.bump()
+    assert not rsp.inspect_va(va, cr3=cr3, cache=cache)["present"]
+
+# 같은 4K 페이지의 다른 VA 는 캐시된 결과를 옮겨서 씀
+def test_rebase_within_page(rsp, guest):
+    cache = PageTableCache()
+    cr3 = rsp.read_cr3()
+    rsp.inspect_va(0xFFFFFFFF81000010, cr3=cr3, cache=cache)
+    info = rsp.inspect_va(0xFFFFFFFF81000ABC, cr3=cr3, cache=cache)
+    assert cache.stats["hits"] == 1
+    assert (info["va"], info["offset"]) == (0xFFFFFFFF81000ABC, 0xABC)
+    assert info["phys_addr"] == guest.translate(0xFFFFFFFF81000ABC)
+
+def test_table_eviction_and_generation():
+    cache = PageTableCache(max_tables=2)
+    for pa in (0x1000, 0x2000, 0x3000):
+        cache.put_table(0x1000, pa, [0] * 512)
+    assert cache.get_table(0x1000, 0x1000) is None
+    assert cache.get_table(0x1000, 0x3000) == [0] * 512
+    assert cache.stats["evictions"] == 1
+
+    cache.bump()
+    assert cache.get_table(0x1000, 0x3000) is None
@@ -0,0 +1,80 @@
+import time
+
+import pytest
+
+from fake_gdbstub import FakeQMPServer
+from qmp_client import QMPClient, QMPError
+from session import DebugSession
+
+@pytest.fixture
+def server(guest):
+    with FakeQMPServer(guest, cpus=2) as server:
+        yield server
+
+@pytest.fixture
+def qmp(server):
+    client = QMPClient(server.path)
+    client.connect()
+    yield client
+    client.close()
+
+def test_execute_and_errors(qmp):
+    assert qmp.greeting["version"]["qemu"]["major"] == 8
+    assert [cpu["cpu-index"] for cpu in qmp.query_cpus_fast()] == [0, 1]
+
+    with pytest.raises(QMPError) as err:
+        qmp.execute("no-such-command")
+    assert err.value.error_class == "CommandNotFound"
+
+def test_execute_many_keeps_order(qmp, guest):
+    results = qmp.execute_many([
+        ("human-monitor-command", {"command-line": f"xp /1gx 0x{guest.regs['cr3']:x}"}),
+        ("no-such-command", None),
+        ("query-cpus-fast", None),
+    ])
+    assert results[0].startswith(f"{guest.regs['cr3']:016x}:")
+    assert isinstance(results[1], QMPError)
+    assert len(results[2]) == 2
+
+# monitor 명령 / 페이지 워크 / 물리 읽기는 qRcmd 를 거치든 QMP 를 거치든 결과가 같음
+def test_qmp_matches_gdbstub(rsp, qmp, guest):
+    cr3 = rsp.read_cr3()
+    vas = [guest.regs["rip"], 0xFFFF888000000000, 0x400000, 0x7FFFFFFFE000, 0x10000000]
+
+    def run():
+        return (
+            rsp.monitor_cmd("info registers"),
+            [rsp.inspect_va(va, cr3=cr3) for va in vas],
+            rsp.read_phys_bytes(0x100000, 1 << 20),
+            rsp.read_phys_pmemsave(0x100000, 64 << 10),
+        )
+
+    over_gdbstub = run()
+    rsp.qmp = qmp
+    assert run() == over_gdbstub
+
+# gdbstub 은 멈출 때까지 monitor 를 못 받지만 QMP 는 running 중에도 응답
+def test_monitor_while_running(rsp, qmp):
+    rsp.cont()
+    try:
+        with pytest.raises(RuntimeError):
+            rsp.monitor_cmd("info registers")
+        rsp.qmp = qmp
+        assert "CR3=" in rsp.monitor_cmd("info registers")
+    finally:
+        rsp.interrupt()
+
+def test_session_cpus_while_running(stub, server):
+    sess = DebugSession(target=stub.target, backend="rsp", qmp=server.path)
+    sess.connect()
+    try:
+        assert not sess.status_error, sess.status
+        sess.cmd_continue()
+        time.sleep(0.01)
+        sess.cmd_cpus()
+        assert not sess.status_error, sess.status
+        assert sess.status.startswith("cpus: 2 - #0 thread 1000")
+        sess.cmd_pause()
+        assert not sess.is_running
+    finally:
+        sess.close()
@@ -0,0 +1,99 @@
+import os
+
+import pytest
+
+from regfile import RegisterFile
+from regtrace import MAGIC, TRACE_REGS, TraceReader, TraceWriter
+
+def fake_steps(count: int) -> list:
+    rows = []
+    for i in range(count):
+        regs = {name: 0 for name in TRACE_REGS}
+        regs.update(rax=i, rcx=0x1000 - i, rip=0xFFFFFFFF81000100 + 3 * (i % 16), rdx=i // 8 & 1, cr3=0x1000)
+        if i % 5 == 0:
+            # 못 읽은 레지스터 (유효 비트가 꺼진 채로 기록)
+            regs["r15"] = None
+        rows.append(RegisterFile.from_ints(regs))
+    return rows
+
+def open_fds() -> int:
+    return len(os.listdir("/proc/self/fd"))
+
+@pytest.mark.parametrize("count", [1, 63, 64, 200])
+def test_round_trip(tmp_path, count):
+    path = str(tmp_path / "t.trace")
+    rows = fake_steps(count)
+    writer = TraceWriter(path, block_steps=64)
+    for regs in rows:
+        writer.append(regs)
+    writer.close()
+
+    reader = TraceReader(path)
+    try:
+        assert len(reader) == count
+        # 블록 캐시보다 많은 블록을 앞뒤로 오가도 같은 값
+        for step in list(range(count)) + list(reversed(range(count))):
+            got = reader[step]
+            assert (got.values, got.valid) == (rows[step].values, rows[step].valid)
+        with pytest.raises(IndexError):
+            reader[count]
+    finally:
+        reader.close()
+
+# footer 없이 끝난 파일 (기록 중 종료): 온전한 블록까지만 읽음
+def test_reads_file_without_footer(tmp_path):
+    path = str(tmp_path / "t.trace")
+    rows = fake_steps(150)
+    writer = TraceWriter(path, block_steps=64)
+    for regs in rows:
+        writer.append(regs)
+    writer.f.close()
+
+    with open(path, "ab") as f:
+        f.write(b"BLK1 torn")
+
+    reader = TraceReader(path)
+    try:
+        assert len(reader) == 128
+        assert reader[127].values == rows[127].values
+    finally:
+        reader.close()
+
+@pytest.mark.parametrize("content", [b"", MAGIC, b"NOTATRACE" * 4, MAGIC + b"\x01\0\0\0\0\x10\0\0\x04\0\0\0\xff\xfe\xfd\xfc"])
+def test_rejects_bad_files(tmp_path, content):
+    path = tmp_path / "bad.trace"
+    path.write_bytes(content)
+    before = open_fds()
+    with pytest.raises(ValueError):
+        TraceReader(str(path))
+    assert open_fds() == before
+
+# 스텝마다 레지스터 전체를 stop reply 뒤에 읽음 (pipeline 하지 않음 / MI 는 window 단위)
+def test_step_record(client, stub, guest):
+    rows = []
+    assert client.step_record(50, rows.append) == 50
+    assert stub.dropped == 0
+    assert [regs["rax"] for regs in rows] == list(range(1, 51))
+    assert rows[-1]["rip"] == guest.regs["rip"]
+
+# DebugSession: trace start -> n <count> (스텝마다 기록) -> trace stop -> trace open
+def test_session_trace(sess, stub, guest, tmp_path):
+    path = str(tmp_path / "s.trace")
+    sess.trace_start(path)
+    sess.cmd_step()
+    sess.cmd_step_many(100)
+    assert not sess.status_error, sess.status
+    sess.trace_stop()
+    assert sess.status.startswith(f"trace: 102 steps saved to {path}")
+    assert stub.dropped == 0
+
+    sess.trace_open(path)
+    assert not sess.status_error, sess.status
+    assert sess.trace_regs["rax"] == 0
+    sess.trace_seek(10 ** 6)
+    assert sess.trace_pos == 101
+    assert sess.trace_regs["rip"] == guest.regs["rip"]
+    assert sess.trace_regs["rax"] == guest.regs["rax"] == 101
+
+    sess.trace_open(str(tmp_path / "missing.trace"))
+    assert sess.status_error
@@ -0,0 +1,55 @@
+import time
+
+def test_connect_reads_registers(rsp, guest):
+    regs = rsp.read_registers()
+    assert regs["rip"] == guest.regs["rip"]
+    assert regs["rsp"] == guest.regs["rsp"]
+    assert rsp.read_cr3() == guest.regs["cr3"]
+
+def test_read_register(rsp, guest):
+    assert rsp.read_register("rcx") == guest.regs["rcx"]
+    assert rsp.read_register("cr3") == guest.regs["cr3"]
+
+def test_stepi(rsp, guest):
+    rip = guest.regs["rip"]
+    rsp.stepi()
+    assert guest.steps == 1
+    assert rsp.read_register("rip") == guest.regs["rip"] != rip
+
+def test_run_until(rsp, guest):
+    target = guest.code_base + 0x12
+    rsp.run_until(target)
+    assert not rsp.running
+    assert rsp.read_register("rip") == target
+    assert "breakpoint-hit" in rsp.stop_reason()
+    assert not guest.breakpoints
+
+def test_cont_and_interrupt(rsp, guest):
+    rsp.cont()
+    assert rsp.running
+    time.sleep(0.02)
+    rsp.interrupt()
+    assert not rsp.running
+    assert rsp.last_stop.startswith("T02")
+    assert guest.steps > 0
+
+def test_read_and_write_virt_bytes(rsp, guest):
+    assert rsp.read_virt_bytes(guest.code_base, 64) == guest.read_virt(guest.code_base, 64)
+    rsp.write_virt_bytes(0xFFFF888000001000, b"qvhd" * 600)
+    assert guest.read_virt(0xFFFF888000001000, 2400) == b"qvhd" * 600
+    assert rsp.read_virt_bytes(0xFFFF888000001000, 2400) == b"qvhd" * 600
+
+def test_monitor_cmd(rsp, guest):
+    assert f"CR3={guest.regs['cr3']:016x}" in rsp.monitor_cmd("info registers")
+
+def test_inspect_va(rsp, guest):
+    info = rsp.inspect_va(guest.regs["rip"])
+    assert info["present"] and info["page_size"] == "4K"
+    assert info["phys_addr"] == guest.translate(guest.regs["rip"])
+
+    info = rsp.inspect_va(0xFFFF888000123456)
+    assert info["page_size"] == "2M"
+    assert info["phys_addr"] == guest.translate(0xFFFF888000123456)
+    assert info["flags"]["nx"]
+
+    assert not rsp.inspect_va(0x10000000)["present"]
@@ -0,0 +1,54 @@
+import time
+
+def test_commands_refused_while_running(sess):
+    sess.cmd_continue()
+    assert sess.is_running
+    sess.cmd_step()
+    assert sess.status_error
+    sess.cmd_pause()
+    assert not sess.status_error and not sess.is_running
+
+# 게스트가 스스로 멈추면 (브레이크포인트) running 이 풀림
+def test_detects_guest_stop(sess, guest):
+    guest.breakpoints.add(guest.code_base + 0x12)
+    sess.cmd_continue()
+    deadline = time.monotonic() + 5
+    while not sess.check_stopped():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    sess.cmd_stopped()
+    assert not sess.is_running and not sess.status_error, sess.status
+    assert sess.regs["rip"] == guest.code_base + 0x12
+
+def test_profile_rejects_bad_arguments(sess):
+    sess.cmd_profile(0, 100)
+    assert sess.status_error and sess.profile is None
+    sess.cmd_profile(0.05, 200, key="bogus")
+    assert sess.status_error and sess.profile is None
+    assert not sess.is_running
+
+def test_status_and_fail(sess):
+    sess.fail("x ERROR")
+    assert sess.status_error
+    sess.status = "x OK"
+    assert not sess.status_error and sess.status == "x OK"
+
+# 뒤따르는 상태줄이 앞선 fail() 을 덮어쓰지 않음
+def test_map_jump_keeps_failure(sess):
+    sess.cmd_map()
+    assert not sess.status_error, sess.status
+    sess.cmd_continue()
+    sess.jump_map_region("#0")
+    assert sess.status_error and "running" in sess.status
+    sess.cmd_pause()
+
+def test_search_keeps_dump_failure(sess, guest):
+    guest.write_phys(0x2345678, b"qvhd-needle")
+
+    def broken(addr, size, phys):
+        raise RuntimeError("dump broken")
+
+    sess.read_mem_dump = broken
+    sess.cmd_search(b"qvhd-needle", 0x2000000, 0x1000000)
+    assert sess.status_error and "dump broken" in sess.status
+    assert sess.search_hits == [0x2345678]
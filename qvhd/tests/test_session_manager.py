@@ -0,0 +1,54 @@
+import socket
+import time
+
+import pytest
+
+from fake_gdbstub import FakeGdbStub, build_demo_guest
+from session_manager import SessionManager
+
+def wait_idle(mgr, timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+    while any(worker.busy for worker in mgr.workers):
+        assert time.monotonic() < deadline
+        mgr.poll()
+        time.sleep(0.001)
+    mgr.poll()
+
+@pytest.fixture
+def stubs():
+    stubs = [FakeGdbStub(build_demo_guest()).start() for _ in range(3)]
+    yield stubs
+    for stub in stubs:
+        stub.stop()
+
+def test_connect_refresh_and_switch(stubs):
+    mgr = SessionManager([stub.target for stub in stubs], backend="rsp")
+    try:
+        mgr.connect_all()
+        wait_idle(mgr)
+        assert all(sess.alive() for sess in mgr.sessions), [sess.status for sess in mgr.sessions]
+
+        assert mgr.refresh_all() == 3
+        wait_idle(mgr)
+        assert [sess.status for sess in mgr.sessions] == ["refresh OK"] * 3
+
+        assert mgr.switch(2) and not mgr.switch(3)
+        assert mgr.active is mgr.sessions[2]
+        assert mgr.labels()[2].endswith("*")
+    finally:
+        mgr.close()
+
+# 연결 실패는 재시도 안내를 붙여도 실패로 남음
+def test_connect_failure_stays_failed():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        target = f"127.0.0.1:{sock.getsockname()[1]}"
+    mgr = SessionManager([target], backend="rsp")
+    try:
+        mgr.connect_all()
+        wait_idle(mgr)
+        sess = mgr.sessions[0]
+        assert not sess.alive()
+        assert sess.status_error and "(retry in 1s)" in sess.status
+    finally:
+        mgr.close()
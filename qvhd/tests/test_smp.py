@@ -0,0 +1,28 @@
+def test_read_thread_states(client, guest):
+    tids = [tid for tid, _ in client.list_threads()]
+    assert len(tids) == 2
+    states = client.read_thread_states(tids)
+    assert [states[tid]["rip"] for tid in tids] == [regs["rip"] for regs in guest.cpus]
+    assert [states[tid]["rsp"] for tid in tids] == [regs["rsp"] for regs in guest.cpus]
+
+# 고른 vCPU 만 스텝 (다른 vCPU 는 그대로)
+def test_step_selected_cpu(rsp, stub, guest):
+    tids = [tid for tid, _ in rsp.list_threads()]
+    rsp.select_thread(tids[1])
+    rip0 = guest.cpus[0]["rip"]
+    assert rsp.step_many(10) == 10
+    assert guest.cpus[0]["rip"] == rip0
+    assert guest.cpus[1]["rax"] == 10
+    assert stub.dropped == 0
+
+def test_select_cpu(sess, guest):
+    sess.cmd_select_cpu(1)
+    assert not sess.status_error, sess.status
+    assert sess.regs["rip"] == guest.cpus[1]["rip"]
+    sess.cmd_select_cpu(5)
+    assert sess.status_error
+
+def test_cpu_grid(sess, guest):
+    sess.set_cpu_grid(True)
+    rips = [state["rip"] for _current, _label, state in sess.cpu_rows()]
+    assert rips == [regs["rip"] for regs in guest.cpus]
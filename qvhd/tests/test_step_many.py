@@ -0,0 +1,102 @@
+import pytest
+
+from fake_gdbstub import FakeGdbStub
+from gdb_rsp_client import GdbRSPClient
+from session import DebugSession
+
+# QEMU gdbstub 은 all-stop: 스텝 중에 보낸 바이트는 버려지고 게스트가 멈춤 (stub.dropped)
+def test_step_many_waits_for_each_stop(rsp, stub, guest):
+    seen = []
+    assert rsp.step_many(200, progress=seen.append) == 200
+    assert guest.steps == 200
+    assert seen == [64, 128, 192]
+    assert stub.dropped == 0
+
+# 위 검사가 의미 있으려면 stub 이 스텝 중에 온 패킷을 실제로 버려야 함
+def test_stub_drops_packet_sent_while_stepping(guest):
+    with FakeGdbStub(guest, step_time=0.05) as stub:
+        client = GdbRSPClient(target=stub.target)
+        client.connect()
+        try:
+            client.send_packet("s")
+            client.send_packet("g")
+            assert client.wait_stop().startswith("T02")
+            assert stub.dropped == 1
+            assert guest.steps == 0
+        finally:
+            client.close()
+
+def test_step_many_cancel(rsp, guest):
+    assert rsp.step_many(100, cancel=lambda: guest.steps >= 10) == 10
+
+def test_step_until_change(rsp, stub, guest):
+    old = guest.regs["rdx"]
+    assert rsp.step_until_change("rdx", 100) == (8, old, old ^ 1)
+    assert guest.steps == 8
+    assert stub.dropped == 0
+
+def test_step_until_change_gives_up(rsp, guest):
+    assert rsp.step_until_change("rbx", 20) == (20, guest.regs["rbx"], None)
+
+def test_mi_step_many(mi, stub, guest):
+    assert mi.step_many(300, chunk=100) == 300
+    assert guest.steps == 300
+    assert mi.read_registers()["rax"] == 300
+    assert stub.dropped == 0
+
+def test_mi_step_until_change(mi, guest):
+    old = guest.regs["rdx"]
+    assert mi.step_until_change("rdx", 100) == (8, old, old ^ 1)
+
+def test_session_step_many(sess, stub, guest):
+    sess.cmd_step()
+    assert not sess.status_error, sess.status
+    sess.cmd_step_many(100)
+    assert not sess.status_error, sess.status
+    assert sess.status.startswith("n 100: 100 steps")
+    assert sess.regs["rax"] == guest.regs["rax"] == 101
+    assert stub.dropped == 0
+
+def test_session_until_change(sess, guest):
+    sess.cmd_until_change("rdx")
+    assert not sess.status_error, sess.status
+    assert "0x0 -> 0x1 after 8 steps" in sess.status
+    assert sess.regs["rdx"] == 1
+
+# 읽을 수 없는 레지스터는 "바뀌지 않음" 이 아니라 오류
+def test_step_until_change_unreadable(client, guest):
+    guest.regs["rbx"] = None
+    with pytest.raises(RuntimeError, match="cannot read register 'rbx'"):
+        client.step_until_change("rbx", 20)
+
+def test_session_until_change_unreadable(sess, guest):
+    guest.regs["rbx"] = None
+    sess.cmd_until_change("rbx", 20)
+    assert sess.status_error and "cannot read register" in sess.status
+
+# gdb 의 "stepi N" 은 breakpoint 에서 일찍 끝남: 그 chunk 는 세지 않고 멈춤
+def test_mi_step_many_stops_at_breakpoint(mi, guest):
+    target = guest.code_base + 0x12
+    mi.mi_cmd(f"-break-insert *0x{target:x}")
+    assert mi.step_many(300, chunk=100) == 0
+    assert guest.steps < 100
+    assert guest.regs["rip"] == target
+    assert mi.stop_reason().startswith("breakpoint-hit")
+
+# trace 의 pipeline 은 이미 보낸 stepi 를 모두 실행하고 기록: 그 window 까지만
+def test_mi_step_record_stops_at_breakpoint(mi, guest):
+    mi.mi_cmd(f"-break-insert *0x{guest.code_base + 0x12:x}")
+    rows = []
+    assert mi.step_record(200, rows.append, window=16) == len(rows) == 16
+    assert guest.steps == 16
+
+def test_session_step_many_reports_early_stop(stub, gdb_path, guest):
+    sess = DebugSession(target=stub.target, gdb_path=gdb_path, backend="mi")
+    sess.connect()
+    try:
+        sess.client.mi_cmd(f"-break-insert *0x{guest.code_base + 0x12:x}")
+        sess.cmd_step_many(300)
+        assert not sess.status_error, sess.status
+        assert "(stopped: breakpoint-hit" in sess.status
+    finally:
+        sess.close()
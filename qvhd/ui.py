@@ -1,230 +1,483 @@
+import argparse
 import curses
-from gdb_mi_client import REG_ORDER
+import os
+from cmd_stats import HIST_BOUNDS_MS
+from commands import run_command, split_list
+from memory import ASCII_TABLE
+from regfile import REG_ORDER, RegisterFile
 from session import DebugSession
+from phys_mem import MACHINES
+from regtrace import TRACE_REGS
+from session_manager import SessionManager
+from worker import SessionWorker
+
+# Page Info - 워크에서 마지막으로 읽은 테이블의 주변 엔트리 (index ± radius)
+def table_neighbour_lines(pi: dict, radius: int = 2) -> list:
+    tables = pi.get("tables")
+    if not tables:
+        return []
+
+    level = list(tables)[-1]
+    table_pa, entries = tables[level]
+    index = pi.get(f"{level}_index")
+    if index is None:
+        return []
+
+    lines = [f"{level} table @ 0x{table_pa:x}:"]
+    for i in range(max(0, index - radius), min(len(entries), index + radius + 1)):
+        mark = ">" if i == index else " "
+        lines.append(f" {mark}[{i:3d}] 0x{entries[i]:016x}")
+    return lines
+
+# Address Map - 한 줄 요약
+def map_region_line(index: int, region) -> str:
+    va_start, va_end, pa_start, perm, page_size = region
+    size = va_end - va_start
+    if size >= 1 << 30:
+        size_str = f"{size >> 30}G"
+    elif size >= 1 << 20:
+        size_str = f"{size >> 20}M"
+    else:
+        size_str = f"{size >> 10}K"
+    return f"#{index:<4} {va_start:016x}-{va_end:016x} {size_str:>6} pa {pa_start:#x} {perm} {page_size}"
+
+def draw_map(win, sess: DebugSession) -> None:
+    height, width = win.getmaxyx()
+    ranges = sess.map_ranges
+    title = f"Address Map ({len(ranges)} regions)" + (" *" if sess.focus == "map" else "")
+    help_ = "[PgUp/PgDn  Tab  mj <#n|va>  map off]"
+    put_center(win, 0, f"{title}  {help_}")
+
+    row = 2
+    if not ranges:
+        put(win, row, 0, "(no present mappings)")
+        return
+
+    for index in range(sess.map_scroll, len(ranges)):
+        if row >= height:
+            break
+        put(win, row, 0, map_region_line(index, ranges[index]))
+        row += 1
 
-def draw_ui(stdscr, sess: DebugSession, cmd_buf: str) -> None:
-    stdscr.erase()
-    h, w = stdscr.getmaxyx()
-
-    # 화면 비율 조정
-    top_margin = 1
-    bottom_margin = 1
-    title_row = top_margin 
-    hline_row = title_row + 1 + bottom_margin
-    content_top = hline_row + 1
-
-    mid = w * 2 // 5
-    left_width = mid - 1
-    right_x = mid + 1
-    right_width = w - right_x - 1
-
-    # 상단바
-    main_title = "[QVHD] QEMU based x86_64 Virtual Hardware Debugger"
-    title_x = max(0, (w - len(main_title)) // 2)
-    stdscr.addstr(title_row, title_x, main_title[: w - 1])
-
-    # 구분선
-    stdscr.hline(hline_row, 0, ord("-"), w)
-    stdscr.vline(content_top, mid - 1, ord("|"), h - content_top - 3)
-
-    # 왼쪽 레이아웃 - Registers
-    row = content_top
-    reg_title = "Registers"
-    reg_help = "[n:step  c:cont  p:pause  r:refresh  q:quit]"
-    reg_label = f"{reg_title}  {reg_help}"
-    reg_x = max(1, (left_width - len(reg_label)) // 2)
-    stdscr.addstr(row, reg_x, reg_label[: left_width - 1])
-    row += 2
+# Register Deref - 레지스터 1개 -> 두 줄 (매핑 / 가리키는 바이트)
+def deref_row_lines(sess: DebugSession, row) -> list:
+    name, va, info, data = row
+    if "error" in info:
+        desc = f"ERROR: {info['error']}"
+    elif not info.get("present"):
+        desc = f"not mapped ({info.get('level')})"
+    else:
+        desc = f"{sess.perm_from_flags(info.get('flags'))} {info.get('page_size')}  pa 0x{info['phys_addr']:x}"
+    lines = [f"{name:<4} 0x{va:016x}  {desc}"]
+
+    if isinstance(data, Exception):
+        lines.append(f"     ?? ({data})")
+    elif data is not None:
+        lines.append(f"     {data.hex(' '):<47}  {data.translate(ASCII_TABLE).decode('ascii')}")
+    return lines
+
+# Page Info 자리 - 포인터처럼 보이는 범용 레지스터의 매핑 / 권한 / 가리키는 바이트
+def draw_deref(win, sess: DebugSession) -> None:
+    height, width = win.getmaxyx()
+    put_center(win, 0, "Register Deref  [deref off]")
+
+    row = 2
+    if sess.deref_error:
+        put(win, row, 0, f"ERROR: {sess.deref_error}")
+        return
+    if not sess.deref_rows:
+        put(win, row, 0, "(no pointer-like registers)")
+        return
+
+    for deref in sess.deref_rows:
+        attr = curses.color_pair(2) if sess.reg_changed & RegisterFile.bit(deref[0]) else 0
+        for line in deref_row_lines(sess, deref):
+            if row >= height:
+                return
+            put(win, row, 0, line, attr)
+            row += 1
+
+# Page Info 자리 - PC 샘플링 hot-spot (샘플 수가 바뀔 때마다 다시 그림)
+def draw_profile(win, sess: DebugSession) -> None:
+    height, width = win.getmaxyx()
+    prof = sess.profile
+    state = "" if prof.done else " (sampling ...)"
+    put_center(win, 0, f"Hot Spots by {prof.key}{state}  [profile save <path>  profile off]")
+    put(win, 1, 0, prof.summary())
+
+    put(win, 2, 0, f"{'count':>7} {'%':>6}  {'cr3':<18} where")
+    total = prof.samples or 1
+    for row, (count, cr3, where) in enumerate(prof.hot(max(0, height - 3)), start=3):
+        cr3 = "N/A" if cr3 is None else f"0x{cr3:x}"
+        put(win, row, 0, f"{count:>7} {count * 100 / total:>5.1f}%  {cr3:<18} {where}")
+
+# 히스토그램 한 칸 -> 문자 (칸 중 최댓값 대비)
+HIST_CHARS = " .:-=+*#%@"
+
+def hist_bar(hist: list) -> str:
+    top = max(hist) or 1
+    return "".join(HIST_CHARS[0 if not n else max(1, n * (len(HIST_CHARS) - 1) // top)] for n in hist)
+
+# Page Info 자리 - 명령 분류별 지연 / 바이트 / 파싱 시간 (명령이 끝날 때마다 다시 그림)
+def draw_stats(win, sess: DebugSession) -> None:
+    height, width = win.getmaxyx()
+    stats = sess.client.stats
+    put_center(win, 0, "Command Stats  [stats reset  stats log <path>  stats off]")
+    put(win, 1, 0, stats.summary())
+
+    snap = stats.snapshot()
+    put(win, 2, 0, f"{'class':<7}{'n':>5}{'mean':>8}{'p95':>8}{'parse':>8}{'in KB':>8}")
+    row = 3
+    for cls, c in snap.items():
+        put(win, row, 0, (
+            f"{cls:<7}{c['count']:>5}{c['mean_ms']:>8.2f}{c['p95_ms']:>8.2f}"
+            f"{c['parse_ms']:>8.1f}{c['bytes_in'] / 1024:>8.0f}"
+        ))
+        row += 1
+    if not snap:
+        put(win, row, 0, "(no commands yet)")
+        return
+
+    # 지연 분포 (칸: HIST_BOUNDS_MS 0.1 ms ~ 1 s, 마지막 칸은 1 s 초과)
+    row += 1
+    put(win, row, 0, f"{'ms':<7}|{HIST_BOUNDS_MS[0]:<{len(HIST_BOUNDS_MS) - 2}g}1s+|")
+    for cls, c in snap.items():
+        row += 1
+        put(win, row, 0, f"{cls:<7}|{hist_bar(c['hist'])}|")
+
+# 창 안에 한 줄 쓰기 (창 폭에 맞게 자르고, 마지막 칸 쓰기 오류는 무시)
+def put(win, row: int, col: int, text: str, attr: int = 0) -> None:
+    height, width = win.getmaxyx()
+    if row >= height or col >= width:
+        return
+    try:
+        win.addstr(row, col, text[: max(0, width - col - 1)], attr)
+    except curses.error:
+        pass
+
+def put_center(win, row: int, text: str) -> None:
+    _, width = win.getmaxyx()
+    put(win, row, max(0, (width - len(text)) // 2), text)
+
+# Page Info 패널 내용 -> [(문자열, 강조 여부, 줄바꿈 여부)]
+def page_info_lines(sess: DebugSession) -> list:
+    pi = sess.page_info
+    prev_pi = sess.prev_page_info if isinstance(sess.prev_page_info, dict) else None
+
+    if pi is None:
+        return [("(no page info)", False, False)]
+    if isinstance(pi, dict) and "error" in pi and len(pi) == 1:
+        return [(f"ERROR: {pi['error']}", False, False)]
+
+    lines = []
+
+    # Page Info - va
+    va = pi.get("va", None)
+    if va is not None:
+        prev_va = prev_pi.get("va", None) if prev_pi is not None else None
+        header = f"va: 0x{va:x}  (mode: {sess.inspect_mode})"
+        lines.append((header, prev_va is not None and prev_va != va, False))
+
+    # Page Info - perm
+    if "perm" in pi:
+        perm = pi["perm"]
+        prev_perm = prev_pi.get("perm") if prev_pi else None
+        lines.append((f"perm: {perm}", prev_perm is not None and prev_perm != perm, False))
+
+    # 나머지 key/value 출력 (우선순위에 있는 것들 먼저)
+    preferred_order = [
+        "present",
+        "page_size",
+        "level",
+        "cr3",
+        "pml4_index",
+        "pdpt_index",
+        "pd_index",
+        "pt_index",
+        "offset",
+        "pml4_entry",
+        "pdpt_entry",
+        "pd_entry",
+        "pt_entry",
+        "flags",
+    ]
+    printed = {"va", "perm", "tables"}
+    keys = [k for k in preferred_order if k in pi] + [k for k in pi if k not in preferred_order]
+
+    for k in keys:
+        if k in printed:
+            continue
+        printed.add(k)
+
+        v = pi[k]
+        changed = prev_pi is not None and k in prev_pi and prev_pi.get(k) != v
+        lines.append((f"{k}: {v}", changed, True))
 
-    for name in REG_ORDER:
-        if row >= h - 3:
+    # 마지막으로 지나간 테이블의 주변 엔트리
+    for line in table_neighbour_lines(pi):
+        lines.append((line, False, False))
+
+    # 페이지 테이블 캐시 통계
+    lines.append((f"pt cache: {sess.pt_cache.summary()}", False, False))
+    return lines
+
+def draw_page_info(win, sess: DebugSession) -> None:
+    height, width = win.getmaxyx()
+    page_title = f"Page Info (mode: {sess.inspect_mode})"
+    page_help = "[va <addr> OR va rip]"
+    put_center(win, 0, f"{page_title}  {page_help}")
+
+    row = 2
+    span = max(1, width - 1)
+    for text, changed, wrap in page_info_lines(sess):
+        if row >= height:
             break
+        attr = curses.color_pair(2) if changed else 0
 
-        val = sess.regs.get(name, "N/A")
-        prev = sess.prev_regs.get(name, None)
+        if not wrap:
+            put(win, row, 0, text, attr)
+            row += 1
+            continue
 
-        line = f"{name:>4} : {val}"
-        if prev is not None and prev != val and val != "N/A":
-            stdscr.attron(curses.color_pair(2))
-            stdscr.addstr(row, 2, line[: left_width - 4])
-            stdscr.attroff(curses.color_pair(2))
+        while text and row < height:
+            put(win, row, 0, text[:span], attr)
+            text = text[span:]
+            row += 1
+
+# vCPU 표 한 줄씩 ("*CPU#0  rip ...  cr3 ..." - 지금 vCPU 는 * 와 강조)
+def cpu_grid_lines(sess: DebugSession) -> list:
+    lines = []
+    for current, label, regs in sess.cpu_rows():
+        mark = "*" if current else " "
+        if isinstance(regs, RegisterFile):
+            line = f"{mark}{label:<7} rip {regs.hex('rip')}  cr3 {regs.hex('cr3')}"
+        elif regs is None:
+            line = f"{mark}{label:<7} -"
         else:
-            stdscr.addstr(row, 2, line[: left_width - 4])
+            line = f"{mark}{label:<7} ERROR: {regs!s}"
+        lines.append((line, curses.A_BOLD if current else 0))
+    return lines
+
+def draw_registers(win, sess: DebugSession) -> None:
+    height, width = win.getmaxyx()
+
+    # trace 를 열어 두면 기록된 스텝의 레지스터 (게스트 대신)
+    if sess.trace is not None:
+        regs, changed_mask, names = sess.trace_regs, sess.trace_changed, TRACE_REGS
+        reg_title = f"Registers (trace step {sess.trace_pos}/{len(sess.trace) - 1})"
+        reg_help = "[←/→  Home/End  ts <step>  trace close]"
+    else:
+        regs, changed_mask, names = sess.regs, sess.reg_changed, REG_ORDER
+        cpu = sess.cpu_label()
+        reg_title = f"Registers ({cpu})" if cpu else "Registers"
+        reg_help = "[n:step  c:cont  p:pause  r:refresh  q:quit]"
+    reg_label = f"{reg_title}  {reg_help}"
+    put(win, 0, max(1, (width - len(reg_label)) // 2), reg_label)
 
+    row = 2
+    if sess.cpu_grid and sess.cpu_states and sess.trace is None:
+        for line, attr in cpu_grid_lines(sess):
+            if row >= height:
+                return
+            put(win, row, 2, line[: width - 4], attr)
+            row += 1
         row += 1
 
-    # 화면 비율 조정
-    content_bottom = h - 3
-    content_height = content_bottom - content_top
-    page_height = (content_height * 3) // 5
+    for name in names:
+        if row >= height:
+            break
 
-    page_top = content_top
-    page_bottom = page_top + page_height
-    mem_top = page_bottom
-    mem_bottom = content_bottom
+        line = f"{name:>4} : {regs.hex(name)}"
+        if name == "eflags":
+            line += f" {regs.eflags_str()}"
 
-    # 오른쪽 상단 레이아웃 - Page Info
-    row2 = page_top
-    page_title = f"Page Info (mode: {sess.inspect_mode})"
-    page_help = "[va <addr> OR va rip]"
-    page_label = f"{page_title}  {page_help}"
-    page_x = right_x + max(0, (right_width - len(page_label)) // 2)
-    stdscr.addstr(row2, page_x, page_label[: right_width])
-    row2 += 2
+        attr = 0
+        if changed_mask & RegisterFile.bit(name) and name in regs:
+            attr = curses.color_pair(2)
+        put(win, row, 2, line[: width - 4], attr)
+        row += 1
 
-    pi = sess.page_info
-    prev_pi = sess.prev_page_info if isinstance(sess.prev_page_info, dict) else None
+def draw_mem(win, sess: DebugSession) -> None:
+    height, width = win.getmaxyx()
+    win.hline(0, 0, ord("-"), width)
 
-    if pi is None:
-        if row2 < page_bottom:
-            stdscr.addstr(row2, right_x, "(no page info)")
-            row2 += 1
-    else:
-        if isinstance(pi, dict) and "error" in pi and len(pi) == 1:
-            if row2 < page_bottom:
-                stdscr.addstr(row2, right_x, f"ERROR: {pi['error']}"[: right_width])
-                row2 += 1
+    mem_title = "Mem Dump" + (" (PA)" if sess.mem_phys else "")
+    mem_title += " *" if sess.focus == "mem" and sess.map_ranges is not None else ""
+    mem_help = "[md <va> / pmd <pa> [size]  pfind <hex|\"text\">  goto <addr>  PgUp/PgDn]"
+    put_center(win, 1, f"{mem_title}  {mem_help}")
+
+    # 보이는 줄만 포맷
+    row = 3
+    for line in sess.mem_rows(max(0, height - row)):
+        put(win, row, 0, line)
+        row += 1
+
+def draw_status(win, sess: DebugSession, busy: str = None) -> None:
+    put(win, 0, 0, busy if busy is not None else sess.status)
+
+# 백그라운드 작업 진행 표시 (없으면 None)
+def busy_line(worker: SessionWorker):
+    progress = worker.progress()
+    if progress is None:
+        return None
+    label, elapsed = progress
+    # 짧은 작업(peek 등)은 상태줄을 깜빡이지 않도록 표시하지 않음
+    if elapsed < 0.1 and not worker.pending():
+        return None
+    queued = worker.pending()
+    more = f", queued {queued}" if queued else ""
+    progress = f" {worker.sess.progress}" if worker.sess.progress else ""
+    return f"{label} ...{progress} {elapsed:.1f}s (Ctrl-C: cancel{more})"
+
+class Screen:
+    # 패널(Registers / Page Info / Mem Dump / 상태줄 / 프롬프트)마다 curses 창을 따로 두고,
+    # 패널이 보여 주는 세션 상태가 바뀐 경우에만 다시 그림 (noutrefresh 후 doupdate 한 번)
+    def __init__(self, stdscr) -> None:
+        self.stdscr = stdscr
+        self.drawn = {}
+        self.busy = None
+        self.targets = ()
+        self.tick = 100
+        self.layout()
+
+    # 화면 크기에 맞춰 창 배치 (처음 + 터미널 크기 변경 시)
+    def layout(self) -> None:
+        stdscr = self.stdscr
+        h, w = stdscr.getmaxyx()
+        self.drawn.clear()
+
+        # 화면 비율 조정
+        top_margin = 1
+        bottom_margin = 1
+        title_row = top_margin
+        hline_row = title_row + 1 + bottom_margin
+        content_top = hline_row + 1
+        content_bottom = max(content_top + 2, h - 3)
+
+        mid = w * 2 // 5
+        right_x = mid + 1
+        right_width = max(1, w - right_x - 1)
+
+        content_height = content_bottom - content_top
+        page_height = max(1, (content_height * 3) // 5)
+        mem_top = content_top + page_height
+
+        # 고정 프레임: 구분선 (layout 때만 그림, 상단바는 대상 목록이 바뀌면 다시 그림)
+        stdscr.erase()
+        stdscr.hline(hline_row, 0, ord("-"), w)
+        stdscr.vline(content_top, mid - 1, ord("|"), max(1, content_height))
+        stdscr.hline(content_bottom, 0, ord("-"), w)
+        stdscr.noutrefresh()
+
+        self.title_win = curses.newwin(1, w, title_row, 0)
+        self.regs_win = curses.newwin(content_height, max(1, mid - 1), content_top, 0)
+        self.page_win = curses.newwin(page_height, right_width, content_top, right_x)
+        self.mem_win = curses.newwin(max(1, content_bottom - mem_top), right_width, mem_top, right_x)
+        self.status_win = curses.newwin(1, w, h - 2, 0)
+        self.prompt_win = curses.newwin(1, w, h - 1, 0)
+        self.prompt_win.keypad(True)
+
+        # 작업 중에도 경과 시간을 갱신하도록 getch는 tick(ms)마다 돌아옴
+        self.prompt_win.timeout(self.tick)
+
+        # 스크롤 단위 (map 구간 수, Mem Dump 줄 수)
+        self.map_rows = max(1, page_height - 2)
+        self.mem_rows = max(1, content_bottom - mem_top - 3)
+
+    # 패널별 상태 서명 (이전에 그린 서명과 같으면 그 패널은 건너뜀)
+    def panes(self, sess: DebugSession) -> list:
+        dump = sess.mem_dump
+        prof = sess.profile
+        stats = sess.client.stats
+        if prof is not None:
+            page = (draw_profile, ("profile", prof, prof.samples, prof.done, len(prof.symbols)))
+        elif sess.stats_view and stats is not None:
+            page = (draw_stats, ("stats", stats, stats.version, stats.log_path))
+        elif sess.map_ranges is not None:
+            page = (draw_map, ("map", sess.map_ranges, sess.map_scroll, sess.focus))
+        elif sess.deref_rows is not None:
+            page = (draw_deref, ("deref", sess.deref_rows, sess.deref_error, sess.reg_changed))
         else:
-            va = None
-            if isinstance(pi, dict):
-                va = pi.get("va", None)
-
-            # Page Info - va
-            if va is not None and row2 < page_bottom:
-                header = f"va: 0x{va:x}  (mode: {sess.inspect_mode})"
-                prev_va = None
-                if prev_pi is not None:
-                    prev_va = prev_pi.get("va", None)
-
-                if prev_va is not None and prev_va != va:
-                    stdscr.attron(curses.color_pair(2))
-                    stdscr.addstr(row2, right_x, header[: right_width])
-                    stdscr.attroff(curses.color_pair(2))
-                else:
-                    stdscr.addstr(row2, right_x, header[: right_width])
-                row2 += 1
-
-            # Page Info - perm
-            if isinstance(pi, dict) and "perm" in pi and row2 < page_bottom:
-                perm = pi["perm"]
-                prev_perm = prev_pi.get("perm") if prev_pi else None
-                line = f"perm: {perm}"
-
-                if prev_perm is not None and prev_perm != perm:
-                    stdscr.attron(curses.color_pair(2))
-                    stdscr.addstr(row2, right_x, line[: right_width])
-                    stdscr.attroff(curses.color_pair(2))
-                else:
-                    stdscr.addstr(row2, right_x, line[: right_width])
-                row2 += 1
-
-            # 나머지 key/value 출력
-            if isinstance(pi, dict):
-                preferred_order = [
-                    "present",
-                    "page_size",
-                    "level",
-                    "cr3",
-                    "pml4_index",
-                    "pdpt_index",
-                    "pd_index",
-                    "pt_index",
-                    "offset",
-                    "pml4_entry",
-                    "pdpt_entry",
-                    "pd_entry",
-                    "pt_entry",
-                    "flags",
-                ]
-
-                printed = {"va", "perm"}
-
-                # 우선순위에 있는 것들 먼저 출력
-                for k in preferred_order:
-                    if k not in pi or k in printed or row2 >= page_bottom:
-                        continue
-
-                    v = pi[k]
-                    line = f"{k}: {v}"
-                    printed.add(k)
-
-                    changed = (
-                        prev_pi is not None
-                        and k in prev_pi
-                        and prev_pi.get(k) != v
-                    )
-
-                    if changed:
-                        stdscr.attron(curses.color_pair(2))
-
-                    tmp = line
-                    while tmp and row2 < page_bottom:
-                        stdscr.addstr(row2, right_x, tmp[: right_width])
-                        tmp = tmp[right_width:]
-                        row2 += 1
-
-                    if changed:
-                        stdscr.attroff(curses.color_pair(2))
-
-                # 나머지 출력
-                for k, v in pi.items():
-                    if k in printed:
-                        continue
-                    if row2 >= page_bottom:
-                        break
-
-                    line = f"{k}: {v}"
-                    changed = (
-                        prev_pi is not None
-                        and k in prev_pi
-                        and prev_pi.get(k) != v
-                    )
-
-                    if changed:
-                        stdscr.attron(curses.color_pair(2))
-
-                    tmp = line
-                    while tmp and row2 < page_bottom:
-                        stdscr.addstr(row2, right_x, tmp[: right_width])
-                        tmp = tmp[right_width:]
-                        row2 += 1
-
-                    if changed:
-                        stdscr.attroff(curses.color_pair(2))
-
-    # 구분선
-    stdscr.hline(mem_top, right_x, ord("-"), right_width)
-
-    # 오른쪽 하단 레이아웃 - Mem Dump
-    row_mem = mem_top + 1
-
-    if row_mem < mem_bottom:
-        mem_title = "Mem Dump"
-        mem_help = "[md <va> [size]]"
-        mem_label = f"{mem_title}  {mem_help}"
-        mem_x = right_x + max(0, (right_width - len(mem_label)) // 2)
-        stdscr.addstr(row_mem, mem_x, mem_label[: right_width])
-        row_mem += 2
-
-    if sess.mem_dump_lines:
-        for line in sess.mem_dump_lines:
-            if row_mem >= mem_bottom:
-                break
-            stdscr.addstr(row_mem, right_x, line[: right_width])
-            row_mem += 1
-
-    # 커맨드 프롬프트
-    stdscr.hline(h - 3, 0, ord("-"), w)
-    status_line = sess.status
-    stdscr.addstr(h - 2, 0, status_line[: w - 1])
-
-    prompt = f"cmd> {cmd_buf}"
-    stdscr.addstr(h - 1, 0, prompt[: w - 1])
-    stdscr.move(h - 1, len("cmd> ") + len(cmd_buf))
-
-    stdscr.refresh()
-
-def tui_main(stdscr) -> None:
+            page = (draw_page_info, (
+                "page", sess.page_info, sess.prev_page_info, sess.inspect_mode,
+                sess.pt_cache.summary(),
+            ))
+        return [
+            ("title", self.title_win, self.draw_title, self.targets),
+            ("regs", self.regs_win, draw_registers, (
+                sess.regs, sess.reg_changed, sess.trace, sess.trace_pos,
+                sess.cpu_label(), sess.cpu_grid, sess.cpu_states,
+            )),
+            ("page", self.page_win) + page,
+            ("mem", self.mem_win, draw_mem, (
+                dump, dump.size if dump is not None else 0, sess.mem_scroll,
+                sess.mem_error, sess.mem_phys, sess.focus, sess.map_ranges is None,
+            )),
+            ("status", self.status_win, self.draw_status, (sess.status, self.busy)),
+        ]
+
+    def draw_status(self, win, sess: DebugSession) -> None:
+        draw_status(win, sess, self.busy)
+
+    # 상단바 (대상이 여러 개면 "0:localhost:1234* 1:localhost:1235 run ..." 를 덧붙임)
+    def draw_title(self, win, sess: DebugSession) -> None:
+        title = "[QVHD] QEMU based x86_64 Virtual Hardware Debugger"
+        if self.targets:
+            title += "  |  " + "  ".join(self.targets)
+        put_center(win, 0, title)
+
+    # 다음 draw 에서 모든 패널을 다시 그림 (대상 전환)
+    def invalidate(self) -> None:
+        self.drawn.clear()
+
+    # busy: 백그라운드 작업 진행 표시 (있으면 상태줄 대신 표시), targets: 대상 목록 (SessionManager.labels)
+    def draw(self, sess: DebugSession, cmd_buf: str, busy: str = None, targets=()) -> None:
+        self.busy = busy
+        self.targets = tuple(targets)
+        for name, win, draw, key in self.panes(sess):
+            if name in self.drawn and self.drawn[name] == key:
+                continue
+            win.erase()
+            draw(win, sess)
+            win.noutrefresh()
+            self.drawn[name] = key
+
+        # 프롬프트는 항상 마지막 (커서 위치)
+        self.draw_prompt(cmd_buf)
+        curses.doupdate()
+
+    # 입력 중에는 프롬프트 줄만 바뀜
+    def draw_prompt(self, cmd_buf: str) -> None:
+        win = self.prompt_win
+        _, width = win.getmaxyx()
+        prompt = f"cmd> {cmd_buf}"
+
+        if self.drawn.get("prompt") != prompt:
+            win.erase()
+            put(win, 0, 0, prompt)
+            self.drawn["prompt"] = prompt
+        win.move(0, min(len(prompt), width - 1))
+        win.noutrefresh()
+
+    def set_tick(self, ms: int) -> None:
+        self.tick = max(1, int(ms))
+        self.prompt_win.timeout(self.tick)
+
+    def getch(self) -> int:
+        return self.prompt_win.getch()
+
+# 대상이 여러 개면 대상마다 다른 파일 (stats.jsonl -> stats.0.jsonl, stats.1.jsonl, ...)
+def target_path(path: str, index: int, count: int) -> str:
+    if count == 1:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}.{index}{ext}"
+
+# target / ram_file / qmp 는 쉼표로 여러 대상 ("localhost:1234,localhost:1235" - ram_file / qmp 는 같은 순서)
+def tui_main(stdscr, target: str = "localhost:1234", backend: str = "mi", gdb_path: str = "gdb",
+             ram_file: str = None, machine: str = "pc", qmp: str = None, stats_log: str = None) -> None:
+    # raw: Ctrl-C 를 SIGINT 대신 키(3)로 받아 작업 취소에 사용 (gdb 자식 프로세스로 신호가 가지 않음)
+    curses.raw()
     curses.curs_set(1)
     stdscr.keypad(True)
     curses.start_color()
@@ -232,16 +485,47 @@ def tui_main(stdscr) -> None:
     curses.init_pair(1, curses.COLOR_WHITE, -1)
     curses.init_pair(2, curses.COLOR_YELLOW, -1)
 
-    sess = DebugSession(target="localhost:1234", gdb_path="gdb")
+    screen = Screen(stdscr)
+    mgr = SessionManager(
+        split_list(target), ram_files=split_list(ram_file), qmps=split_list(qmp),
+        gdb_path=gdb_path, backend=backend, machine=machine,
+    )
     cmd_buf = ""
-    sess.status = "init: connecting to gdb at localhost:1234 ..."
-    sess.connect()
+
+    # --stats-log: 처음부터 명령 계측 (대상마다 JSONL 파일)
+    if stats_log:
+        for i, target_sess in enumerate(mgr.sessions):
+            target_sess.stats_on(target_path(stats_log, i, len(mgr)))
+
+    # GDB 와 통신하는 명령은 모두 대상별 worker 스레드에서 순서대로 실행
+    # (그동안 화면은 계속 갱신되고, 입력한 명령은 큐에 쌓임)
+    mgr.connect_all()
+    sess, worker = mgr.active, mgr.worker
 
     while True:
-        draw_ui(stdscr, sess, cmd_buf)
-        ch = stdscr.getch()
+        # 끝난 작업 오류 / 스스로 멈춘 대상 / peek / 끊긴 대상 재연결 (모든 대상)
+        mgr.poll()
+
+        screen.draw(sess, cmd_buf, busy_line(worker), mgr.labels() if len(mgr) > 1 else ())
+        ch = screen.getch()
 
-        if ch in (curses.KEY_BACKSPACE, 127, 8):
+        if ch == -1:
+            continue
+
+        elif ch == curses.KEY_RESIZE:
+            screen.layout()
+            continue
+
+        # Ctrl-C: 실행 중인 작업 취소 + 대기 중인 명령 버림
+        elif ch == 3:
+            if worker.busy:
+                dropped = worker.cancel()
+                sess.status = f"cancel requested (dropped {dropped} queued)"
+            else:
+                cmd_buf = ""
+            continue
+
+        elif ch in (curses.KEY_BACKSPACE, 127, 8):
             cmd_buf = cmd_buf[:-1]
             continue
 
@@ -251,80 +535,84 @@ def tui_main(stdscr) -> None:
 
             if cmd == "q":
                 sess.status = "quit requested ... closing gdb and ui"
-                draw_ui(stdscr, sess, "")
-                stdscr.refresh()
-                sess.close()
+                screen.draw(sess, "")
+                mgr.close()
                 stdscr.erase()
                 stdscr.refresh()
                 return
 
-            elif cmd == "n":
-                sess.status = "stepi ... (GDB 응답 대기 중; 입력 잠시 비활성화)"
-                draw_ui(stdscr, sess, "[GDB 응답 대기 중 ...]")
-                sess.cmd_step()
-                draw_ui(stdscr, sess, "")
-
-            elif cmd == "c":
-                sess.status = "continue ... (GDB 응답 대기 중; 입력 잠시 비활성화)"
-                draw_ui(stdscr, sess, "[GDB 응답 대기 중 ...]")
-                sess.cmd_continue()
-                draw_ui(stdscr, sess, "")
-
-            elif cmd == "p":
-                sess.status = "pause ... (GDB 응답 대기 중; 입력 잠시 비활성화)"
-                draw_ui(stdscr, sess, "[GDB 응답 대기 중 ...]")
-                sess.cmd_pause()
-                draw_ui(stdscr, sess, "")
-
-            elif cmd == "r":
-                sess.status = "refresh ... (GDB 응답 대기 중; 입력 잠시 비활성화)"
-                draw_ui(stdscr, sess, "[GDB 응답 대기 중 ...]")
-                sess.cmd_refresh()
-                draw_ui(stdscr, sess, "")
-
-            elif cmd.startswith("va "):
-                arg = cmd[3:].strip()
-                if arg.lower() == "rip":
-                    sess.set_inspect_rip()
-                    sess.status = "inspect 모드: RIP-follow"
-                else:
-                    try:
-                        va = int(arg, 0)
-                        sess.set_inspect_va(va)
-                        sess.status = f"inspect 모드: VA=0x{va:x}"
-                    except ValueError:
-                        sess.status = f"invalid VA: {arg!r}"
-
-            elif cmd.startswith("md "):
-                parts = cmd.split()
-                if len(parts) < 2:
-                    sess.status = "usage: md <va> [size]"
+            elif cmd == "targets":
+                sess.status = "targets: " + "  ".join(mgr.labels())
+
+            elif cmd.startswith("target "):
+                arg = cmd[7:].strip()
+                try:
+                    index = int(arg, 0)
+                except ValueError:
+                    index = -1
+                if mgr.switch(index):
+                    # 새로 읽지 않고 그 대상의 마지막 상태를 그대로 그림
+                    sess, worker = mgr.active, mgr.worker
+                    screen.invalidate()
                 else:
-                    target = parts[1]
-                    size = 64
-                    if len(parts) >= 3:
-                        try:
-                            size = int(parts[2], 0)
-                        except ValueError:
-                            size = 64
-
-                    try:
-                        va = int(target, 0)
-                        sess.memdump(va, size)
-                    except ValueError:
-                        sess.status = f"invalid VA for md: {target!r}"
-
-            elif cmd == "":
-                pass
+                    sess.fail(f"target: no target {arg!r} ({len(mgr)} targets)")
+
+            elif cmd == "r all":
+                count = mgr.refresh_all()
+                sess.status = f"refresh all: {count}/{len(mgr)} targets"
 
             else:
-                sess.status = f"unknown cmd: {cmd!r}"
+                run_command(cmd, sess, worker, screen)
+
+        elif ch in (curses.KEY_NPAGE, curses.KEY_PPAGE, curses.KEY_DOWN, curses.KEY_UP):
+            map_rows, mem_rows = screen.map_rows, screen.mem_rows
+            down = ch in (curses.KEY_NPAGE, curses.KEY_DOWN)
+            paging = ch in (curses.KEY_NPAGE, curses.KEY_PPAGE)
+
+            if sess.focus == "map" and sess.map_ranges is not None:
+                step = map_rows if paging else 1
+                sess.scroll_map(step if down else -step)
+            else:
+                step = mem_rows if paging else 1
+                delta = step if down else -step
+                # 이미 읽은 범위 안이면 바로, 끝을 넘으면 뒤쪽을 읽는 작업으로
+                if sess.mem_scroll_fetches(delta, mem_rows):
+                    worker.submit("md (scroll)", lambda: sess.scroll_mem(delta, mem_rows))
+                else:
+                    sess.scroll_mem(delta, mem_rows)
+
+        # ←/→, Home/End: trace 스텝 이동 (Shift 는 100 스텝씩)
+        elif ch in (curses.KEY_LEFT, curses.KEY_RIGHT, curses.KEY_SLEFT, curses.KEY_SRIGHT, curses.KEY_HOME, curses.KEY_END):
+            if sess.trace is not None:
+                if ch == curses.KEY_HOME:
+                    sess.trace_seek(0)
+                elif ch == curses.KEY_END:
+                    sess.trace_seek(len(sess.trace) - 1)
+                else:
+                    step = 100 if ch in (curses.KEY_SLEFT, curses.KEY_SRIGHT) else 1
+                    sess.trace_seek(sess.trace_pos + (step if ch in (curses.KEY_RIGHT, curses.KEY_SRIGHT) else -step))
+
+        # Tab: PgUp/PgDn 대상 패널 전환 (map이 열려 있을 때)
+        elif ch == 9:
+            if sess.map_ranges is not None:
+                sess.focus = "mem" if sess.focus == "map" else "map"
+                sess.status = f"scroll focus: {sess.focus}"
 
         else:
             if 32 <= ch <= 126:
                 cmd_buf += chr(ch)
             else:
-                sess.status = f"unknown keycode: {ch}"
+                sess.fail(f"unknown keycode: {ch}")
 
 if __name__ == "__main__":
-    curses.wrapper(tui_main)
+    parser = argparse.ArgumentParser(description="QEMU based x86_64 Virtual Hardware Debugger")
+    parser.add_argument("--target", default="localhost:1234", help="QEMU gdbstub address (쉼표로 여러 대상: localhost:1234,localhost:1235)")
+    parser.add_argument("--backend", default="mi", choices=("mi", "rsp"), help="mi: gdb/MI, rsp: gdbstub 직접 연결")
+    parser.add_argument("--gdb", default="gdb", help="gdb executable (mi backend)")
+    parser.add_argument("--ram-file", default=None, help="QEMU memory-backend-file path (share=on) - 물리 메모리를 mmap 으로 읽음 (대상별로 쉼표)")
+    parser.add_argument("--machine", default="pc", choices=MACHINES, help="QEMU machine type (RAM 배치 / PCI hole)")
+    parser.add_argument("--qmp", default=None, help="QEMU -qmp unix 소켓 경로 - monitor 명령을 gdb 대신 QMP 로 (대상별로 쉼표)")
+    parser.add_argument("--stats-log", default=None, help="명령별 지연 / 바이트 / 파싱 시간을 JSONL 로 기록 (mi backend, 대상이 여러 개면 대상마다 .<n> 을 붙임)")
+    args = parser.parse_args()
+
+    curses.wrapper(tui_main, args.target, args.backend, args.gdb, args.ram_file, args.machine, args.qmp, args.stats_log)
@@ -0,0 +1,88 @@
+import queue
+import threading
+import time
+
+class SessionWorker:
+    # DebugSession 명령을 백그라운드 스레드 하나에서 순서대로 실행
+    #   - UI는 submit()만 하고 바로 돌아가 화면을 계속 그림 (실행 중 입력은 큐에 쌓임)
+    #   - 끝난 작업은 done 큐로 전달 -> UI가 poll()로 받아 다시 그림
+    #   - cancel(): 대기 중인 작업을 버리고 실행 중인 작업에 취소 요청 (sess.cancel_event)
+    def __init__(self, sess) -> None:
+        self.sess = sess
+        self.jobs = queue.Queue()
+        self.done = queue.Queue()
+
+        # 실행 중인 작업 (label, 시작 시각)
+        self.current = None
+
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def submit(self, label: str, fn) -> None:
+        self.jobs.put((label, fn))
+
+    def run(self) -> None:
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+
+            label, fn = job
+            self.sess.cancel_event.clear()
+            self.sess.progress = None
+            started = time.monotonic()
+            self.current = (label, started)
+
+            error = None
+            try:
+                fn()
+            except Exception as e:
+                error = e
+
+            self.current = None
+            self.done.put((label, time.monotonic() - started, error))
+
+    @property
+    def busy(self) -> bool:
+        return self.current is not None or not self.jobs.empty()
+
+    def pending(self) -> int:
+        return self.jobs.qsize()
+
+    # 실행 중인 작업 -> (label, 경과 시간) / 없으면 None
+    def progress(self):
+        current = self.current
+        if current is None:
+            return None
+        label, started = current
+        return label, time.monotonic() - started
+
+    # 끝난 작업 목록 [(label, 걸린 시간, 예외 또는 None)]
+    def poll(self) -> list:
+        finished = []
+        while True:
+            try:
+                finished.append(self.done.get_nowait())
+            except queue.Empty:
+                return finished
+
+    def cancel(self) -> int:
+        dropped = 0
+        while True:
+            try:
+                job = self.jobs.get_nowait()
+            except queue.Empty:
+                break
+            if job is None:
+                self.jobs.put(None)
+                break
+            dropped += 1
+
+        if self.current is not None:
+            self.sess.cancel_event.set()
+        return dropped
+
+    def stop(self, timeout: float = 2.0) -> None:
+        self.cancel()
+        self.jobs.put(None)
+        self.thread.join(timeout=timeout)
@@ -0,0 +1,4 @@
+#!/usr/bin/env bash
+
+cd "$HOME/qvhd"
+python3 headless.py "$@"
@@ -1,15 +1,41 @@
 #!/usr/bin/env bash
 
 QEMU_BIN="$HOME/qemu/build/qemu-system-x86_64"
-VM_DISK="$HOME/vm/linux_guest.qcow2"
+VM_DISK="${QVHD_VM_DISK:-$HOME/vm/linux_guest.qcow2}"
+RAM_SIZE=2048
+
+# 게스트를 여러 개 띄울 때는 gdbstub / ssh 포트와 디스크를 게스트마다 다르게
+#   QVHD_GDB_PORT=1235 QVHD_SSH_PORT=2223 QVHD_VM_DISK=... ./run_qemu.sh
+GDB_PORT="${QVHD_GDB_PORT:-1234}"
+SSH_PORT="${QVHD_SSH_PORT:-2222}"
+
+# vCPU 수 (QVHD_SMP, 기본 1) - 여러 개면 cpu <n> / cpu grid 로 vCPU 별 레지스터를 봄
+SMP="${QVHD_SMP:-1}"
+
+# QVHD_RAM_FILE 을 지정하면 게스트 RAM 을 그 파일에 두고 공유 (run_ui.sh --ram-file 로 mmap)
+RAM_ARGS=()
+if [ -n "$QVHD_RAM_FILE" ]; then
+  RAM_ARGS=(
+    -object "memory-backend-file,id=ram0,size=${RAM_SIZE}M,mem-path=$QVHD_RAM_FILE,share=on"
+    -machine memory-backend=ram0
+  )
+fi
+
+# QVHD_QMP_SOCK 을 지정하면 QMP 소켓을 엶 (run_ui.sh --qmp 로 monitor 명령을 gdb 대신 QMP 로)
+QMP_ARGS=()
+if [ -n "$QVHD_QMP_SOCK" ]; then
+  QMP_ARGS=(-qmp "unix:$QVHD_QMP_SOCK,server=on,wait=off")
+fi
 
 "$QEMU_BIN" \
   -accel tcg \
   -cpu qemu64 \
-  -m 2048 \
-  -smp 1 \
+  -m "$RAM_SIZE" \
+  "${RAM_ARGS[@]}" \
+  "${QMP_ARGS[@]}" \
+  -smp "$SMP" \
   -drive file="$VM_DISK",if=virtio,format=qcow2 \
-  -netdev user,id=n1,hostfwd=tcp::2222-:22 \
+  -netdev user,id=n1,hostfwd=tcp::${SSH_PORT}-:22 \
   -device e1000,netdev=n1 \
   -display gtk \
-  -s -S
+  -gdb "tcp::$GDB_PORT" -S
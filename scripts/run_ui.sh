@@ -1,4 +1,4 @@
 #!/usr/bin/env bash
 
 cd "$HOME/qvhd"
-python3 ui.py
+python3 ui.py "$@"